@@ -0,0 +1,57 @@
+"""Helpers shared by the benchmarks."""
+import subprocess
+
+
+def percentile(sorted_values, fraction):
+    """Pick the value at a fraction of the way through sorted values."""
+
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def git_commit():
+    """Determine the commit being benchmarked, if we're in a git checkout."""
+
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL).decode("utf-8").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ensure_table(resource, settings):
+    """Create the notes table and its GSIs, as serverless.yml does, unless it exists."""
+
+    import botocore.exceptions
+
+    def index(name, key, projected):
+        return {
+            "IndexName": name,
+            "KeySchema": [
+                {"AttributeName": key, "KeyType": "HASH"},
+                {"AttributeName": "noteId", "KeyType": "RANGE"}
+            ],
+            "Projection": {"NonKeyAttributes": projected, "ProjectionType": "INCLUDE"},
+            "ProvisionedThroughput": {"ReadCapacityUnits": 1, "WriteCapacityUnits": 1}
+        }
+
+    try:
+        return resource.create_table(
+            TableName=settings.table,
+            KeySchema=[{"AttributeName": "noteId", "KeyType": "HASH"}],
+            AttributeDefinitions=[
+                {"AttributeName": "noteId", "AttributeType": "S"},
+                {"AttributeName": "userId", "AttributeType": "S"},
+                {"AttributeName": "notebook", "AttributeType": "S"}
+            ],
+            ProvisionedThroughput={"ReadCapacityUnits": 1, "WriteCapacityUnits": 1},
+            GlobalSecondaryIndexes=[
+                index(settings.user_index, "userId", ["text", "notebook"]),
+                index(settings.notebook_index, "notebook", ["text", "userId"])
+            ]
+        )
+    except botocore.exceptions.ClientError as e:
+        if e.response["Error"]["Code"] != "ResourceInUseException":
+            raise
+
+    return resource.Table(settings.table)
@@ -0,0 +1,298 @@
+"""Drive a mix of API requests through the handlers in-process and measure them.
+
+Events are shaped like API Gateway's, as in the http_event test fixture,
+and requests go to DynamoDB Local (DYNAMODB_HOST, http://localhost:8000 by
+default), so nothing needs deploying. Run from the repo root:
+
+    python -m benchmarks.load_bench --requests 1000 --mix create=20,read=40,update=15,delete=5,search_user=10,search_notebook=10
+
+Pass --memory to use the in-memory table from tests/memorydb.py instead,
+which takes the network out of the numbers; --preload seeds it with notes.
+
+Results are written as JSON, by default to benchmarks/results/load-<commit>.json;
+pass an earlier file to --compare to see what changed.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+# Fake credentials and local config, so nothing here can reach AWS. Log
+# lines and EMF lines would only get in the way of the report.
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+os.environ.setdefault("DYNAMODB_TABLE", "Stoic-Athena-Notes-Bench-Table")
+os.environ.setdefault("DYNAMODB_HOST", "http://localhost:8000")
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+import boto3
+
+import functions.connection as conn
+import functions.metrics as metrics
+import functions.settings as settings
+from benchmarks.common import ensure_table, git_commit, percentile
+from functions.handlers.create import create
+from functions.handlers.delete import delete
+from functions.handlers.read import read
+from functions.handlers.search import search_by_notebook, search_by_user
+from functions.handlers.update import update
+from tests import memorydb
+
+
+DEFAULT_MIX = "create=20,read=40,update=15,delete=5,search_user=10,search_notebook=10"
+OPERATIONS = [part.partition("=")[0] for part in DEFAULT_MIX.split(",")]
+
+# Users and notebooks notes are spread across, so searches return a few pages' worth.
+USERS = ["bench-user-{}".format(index) for index in range(10)]
+NOTEBOOKS = ["bench-notebook-{}".format(index) for index in range(5)]
+
+
+class LambdaContext:
+    aws_request_id = "load-bench"
+
+
+def event(method, resource, note_id=None, body=None, query=None):
+    """Build an API Gateway proxy event, like the http_event test fixture."""
+
+    return {
+        "path": resource.replace("{id}", note_id or ""),
+        "headers": {},
+        "pathParameters": {"id": note_id},
+        "requestContext": {},
+        "resource": resource,
+        "httpMethod": method,
+        "queryStringParameters": query or {},
+        "stageVariables": {},
+        "body": json.dumps(body) if body is not None else None
+    }
+
+
+def note_body(rand):
+    return {
+        "userId": rand.choice(USERS),
+        "notebook": rand.choice(NOTEBOOKS),
+        "text": "Load benchmark note {}.".format(rand.getrandbits(32)) * rand.randint(1, 8)
+    }
+
+
+class Workload:
+    """Pick each next request from the mix, tracking which notes exist."""
+
+    def __init__(self, mix, seed):
+        self.rand = random.Random(seed)
+        self.ops = list(mix)
+        self.weights = [mix[op] for op in self.ops]
+        self.note_ids = []
+
+    def next(self):
+        op = self.rand.choices(self.ops, self.weights)[0]
+
+        # Reads, updates and deletes need a note to act on.
+        if op in ("read", "update", "delete") and not self.note_ids:
+            op = "create"
+
+        rand = self.rand
+        if op == "create":
+            return op, create, event("POST", "/notes", body=note_body(rand))
+        if op == "read":
+            return op, read, event("GET", "/notes/{id}", rand.choice(self.note_ids))
+        if op == "update":
+            return op, update, event("PUT", "/notes/{id}", rand.choice(self.note_ids), note_body(rand))
+        if op == "delete":
+            note_id = self.note_ids.pop(rand.randrange(len(self.note_ids)))
+            return op, delete, event("DELETE", "/notes/{id}", note_id)
+        if op == "search_user":
+            return op, search_by_user, event("GET", "/users/{id}/notes", rand.choice(USERS),
+                                             query={"limit": "50"})
+
+        return op, search_by_notebook, event("GET", "/notebooks/{id}/notes", rand.choice(NOTEBOOKS),
+                                             query={"limit": "50"})
+
+    def created(self, response):
+        if response["statusCode"] == 201:
+            self.note_ids.append(json.loads(response["body"])["noteId"])
+
+
+def preload(workload, count):
+    """Yield notes to seed a table with, for the workload to read, update and delete."""
+
+    rand = workload.rand
+    for number in range(count):
+        note_id = "preload{:015d}".format(number)
+        workload.note_ids.append(note_id)
+
+        note = note_body(rand)
+        note.update({"noteId": note_id, "createdAt": 1536850636242 + number,
+                     "updatedAt": 1536850636242 + number})
+        yield note
+
+
+def parse_mix(spec):
+    """Parse weights like 'create=20,read=80' into {operation: weight}."""
+
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight)
+
+    unknown = set(mix) - set(OPERATIONS)
+    if unknown:
+        raise SystemExit("Unknown operations in --mix: {}".format(", ".join(sorted(unknown))))
+
+    return mix
+
+
+def run(workload, count):
+    """Send count requests, one at a time as a Lambda container would, and time them."""
+
+    samples = {}
+    devnull = open(os.devnull, "w")
+    stdout = sys.stdout
+
+    start = time.perf_counter()
+    for _ in range(count):
+        op, handler, request = workload.next()
+
+        # EMF lines go to stdout; keep them out of the report.
+        sys.stdout = devnull
+        try:
+            began = time.perf_counter()
+            response = handler(request, LambdaContext())
+            elapsed = (time.perf_counter() - began) * 1000
+        finally:
+            sys.stdout = stdout
+
+        if op == "create":
+            workload.created(response)
+
+        sample = samples.setdefault(op, {"latencies": [], "statuses": {}, "phases": {}})
+        sample["latencies"].append(elapsed)
+        status = str(response["statusCode"])
+        sample["statuses"][status] = sample["statuses"].get(status, 0) + 1
+        for name, value in metrics.last_invocation()["timings"].items():
+            sample["phases"][name] = sample["phases"].get(name, 0.0) + value
+
+    wall = time.perf_counter() - start
+    devnull.close()
+
+    return samples, wall
+
+
+def summarize(latencies):
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered), 3),
+        "p50_ms": round(percentile(ordered, 0.50), 3),
+        "p95_ms": round(percentile(ordered, 0.95), 3),
+        "p99_ms": round(percentile(ordered, 0.99), 3),
+        "max_ms": round(ordered[-1], 3)
+    }
+
+
+def report(samples, wall):
+    """Roll samples up into the results we print and save."""
+
+    results = {"overall": summarize([value for sample in samples.values() for value in sample["latencies"]]),
+               "operations": {}}
+    results["overall"]["requests_per_second"] = round(results["overall"]["requests"] / wall, 1)
+
+    for op, sample in sorted(samples.items()):
+        summary = summarize(sample["latencies"])
+        summary["statuses"] = sample["statuses"]
+        summary["errors"] = sum(count for status, count in sample["statuses"].items() if int(status) >= 400)
+        summary["phases_mean_ms"] = {name: round(total / summary["requests"], 3)
+                                     for name, total in sorted(sample["phases"].items())}
+        results["operations"][op] = summary
+
+    results["overall"]["errors"] = sum(summary["errors"] for summary in results["operations"].values())
+
+    return results
+
+
+def show(results, baseline=None):
+    """Print results, with percentage changes from a baseline if given one."""
+
+    def delta(summary, before, key):
+        if not before.get(key):
+            return ""
+        return "({:+.0%})".format(summary[key] / before[key] - 1)
+
+    overall = results["overall"]
+    print("{} requests, {:.1f} req/s".format(overall["requests"], overall["requests_per_second"]))
+    print("  {:<16} {:>8} {:>6} {:>17} {:>17} {:>17}  phases (mean ms)".format(
+        "operation", "requests", "errors", "p50 ms", "p95 ms", "p99 ms"))
+
+    rows = [("all", overall, baseline["overall"] if baseline else {})]
+    for op, summary in results["operations"].items():
+        rows.append((op, summary, baseline["operations"].get(op, {}) if baseline else {}))
+
+    for label, summary, before in rows:
+        phases = ", ".join("{} {:.2f}".format(phase, value)
+                           for phase, value in summary.get("phases_mean_ms", {}).items() if phase != "Total")
+        print("  {:<16} {:>8} {:>6} {:>8.2f} {:<8} {:>8.2f} {:<8} {:>8.2f} {:<8}  {}".format(
+            label, summary["requests"], summary["errors"],
+            summary["p50_ms"], delta(summary, before, "p50_ms"),
+            summary["p95_ms"], delta(summary, before, "p95_ms"),
+            summary["p99_ms"], delta(summary, before, "p99_ms"), phases))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=100, help="untimed requests sent first")
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="where to save results (default benchmarks/results/load-<commit>.json)")
+    parser.add_argument("--compare", help="earlier results to show changes against")
+    parser.add_argument("--memory", action="store_true", help="use an in-memory table, not DynamoDB Local")
+    parser.add_argument("--preload", type=int, default=0, help="notes to seed the in-memory table with")
+    args = parser.parse_args()
+
+    # Time phases the same way deployed handlers would with METRICS_ENABLED.
+    metrics.ENABLED = True
+
+    loaded = settings.get_settings()
+    workload = Workload(parse_mix(args.mix), args.seed)
+
+    if args.memory:
+        memorydb.install()
+        table = conn.get_table(loaded)
+        table.load(preload(workload, args.preload))
+    else:
+        ensure_table(boto3.resource("dynamodb", loaded.region, endpoint_url=loaded.host), loaded)
+
+    run(workload, args.warmup)
+    samples, wall = run(workload, args.requests)
+
+    # Leave the table as we found it, so the next run's searches match.
+    if not args.memory:
+        conn.get_model(loaded).delete_batch(workload.note_ids)
+
+    results = report(samples, wall)
+    results["commit"] = git_commit()
+    results["config"] = {"requests": args.requests, "warmup": args.warmup, "mix": args.mix,
+                         "seed": args.seed, "host": "memory" if args.memory else loaded.host,
+                         "preload": args.preload}
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as infile:
+            baseline = json.load(infile)
+        print("Compared with {} ({})".format(args.compare, baseline.get("commit")))
+
+    show(results, baseline)
+
+    output = args.output or os.path.join("benchmarks", "results", "load-{}.json".format(results["commit"] or "local"))
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as outfile:
+        json.dump(results, outfile, indent=2, sort_keys=True)
+    print("Saved results to {}".format(output))
+
+
+if __name__ == "__main__":
+    main()
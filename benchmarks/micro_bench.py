@@ -0,0 +1,255 @@
+"""Time the functions every request runs through, and catch regressions in them.
+
+Each case runs on payloads of 1 to 10,000 notes and is compared with the
+baseline saved in benchmarks/baselines/micro.json. Run from the repo root:
+
+    python -m benchmarks.micro_bench
+
+The run fails (exits 1) if any case got slower than the baseline by more
+than --threshold percent (MICROBENCH_THRESHOLD, 25 by default). After a
+change that's meant to move the numbers, save new ones with --update.
+A case that looks regressed is timed again (--rechecks) before the run
+fails, since one noisy run shouldn't.
+
+Times are stored relative to a fixed pure-Python workload timed in the
+same run, so a baseline saved on one machine still means something on
+another.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import timeit
+from decimal import Decimal
+
+# Fake credentials, so nothing here can reach AWS, and quiet logs.
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+import functions.beacon as beacon
+import functions.validator as validator
+from benchmarks.common import git_commit
+from functions.decimalencoder import DecimalEncoder
+from functions.models.note import new_note_id
+
+
+BASELINE = os.path.join("benchmarks", "baselines", "micro.json")
+DEFAULT_SIZES = "1,10,100,1000,10000"
+DEFAULT_THRESHOLD = float(os.environ.get("MICROBENCH_THRESHOLD", "25"))
+
+# Runs a new baseline is the median of.
+BASELINE_ROUNDS = 3
+
+
+def build_notes(count):
+    """Build notes as boto3 hands them back, numbers and all as Decimals."""
+
+    return [
+        {
+            "noteId": "note{:018d}".format(index),
+            "userId": "moorenc",
+            "notebook": "standard",
+            "text": "Note number {} about nothing in particular.".format(index),
+            "createdAt": Decimal(1536850636242 + index),
+            "updatedAt": Decimal(1536850788457 + index),
+        }
+        for index in range(count)
+    ]
+
+
+def build_cases(count):
+    """Build each case's callable for a payload of count notes."""
+
+    notes = build_notes(count)
+    bodies = [{"userId": note["userId"], "notebook": note["notebook"], "text": note["text"]} for note in notes]
+    batch_event = {"body": json.dumps({"notes": bodies}), "isBase64Encoded": False}
+    id_events = [{"pathParameters": {"id": note["noteId"]}} for note in notes]
+    timestamps = [int(note["createdAt"]) for note in notes]
+
+    serializer = TypeSerializer()
+    deserializer = TypeDeserializer()
+    marshalled = [{key: serializer.serialize(value) for key, value in note.items()} for note in notes]
+
+    def check_id():
+        for event in id_events:
+            validator.check_id(event)
+
+    def check_props():
+        for body in bodies:
+            validator.check_props(body)
+
+    def is_timestamp():
+        for timestamp in timestamps:
+            validator.is_timestamp(timestamp)
+
+    def note_ids():
+        for _ in range(count):
+            new_note_id()
+
+    def marshal():
+        for note in notes:
+            {key: serializer.serialize(value) for key, value in note.items()}
+
+    def unmarshal():
+        for item in marshalled:
+            {key: deserializer.deserialize(value) for key, value in item.items()}
+
+    return {
+        "check_json": lambda: validator.check_json(batch_event),
+        "check_id": check_id,
+        "check_props": check_props,
+        "is_timestamp": is_timestamp,
+        "respond": lambda: beacon.respond(200, notes),
+        "decimal_encoder": lambda: json.dumps(notes, cls=DecimalEncoder),
+        "new_note_id": note_ids,
+        "marshal": marshal,
+        "unmarshal": unmarshal,
+    }
+
+
+def reference():
+    """Build a fixed pure-Python workload to scale results by, so they compare across machines."""
+
+    data = [{"key": str(index), "value": index * 7 % 1000} for index in range(1000)]
+    return lambda: sorted(data, key=lambda entry: (entry["value"], entry["key"]))
+
+
+def calls_for(timer, seconds=0.02):
+    """Find how many calls make a run long enough to time reliably."""
+
+    number = 1
+    while timer.timeit(number) < seconds:
+        number *= 2
+    return number
+
+
+def best_times(func, repeat):
+    """Time a call and the reference workload in seconds, each the best of repeat runs.
+
+    Runs of the two alternate, so a noisy neighbour slows both alike rather
+    than skewing one against the other.
+    """
+
+    timer, calibration = timeit.Timer(func), timeit.Timer(reference())
+    number, calibration_number = calls_for(timer), calls_for(calibration)
+
+    best = best_calibration = float("inf")
+    for _ in range(repeat):
+        best = min(best, timer.timeit(number) / number)
+        best_calibration = min(best_calibration, calibration.timeit(calibration_number) / calibration_number)
+
+    return best, best_calibration
+
+
+def run(sizes, repeat, only=None):
+    """Time every case at every size, returning {case: {size: (seconds, reference seconds)}}."""
+
+    results = {}
+    for size in sizes:
+        for name, func in build_cases(size).items():
+            if only and name not in only:
+                continue
+            results.setdefault(name, {})[str(size)] = best_times(func, repeat)
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Compare scaled times with a baseline's, returning rows and the regressions among them."""
+
+    rows, regressions = [], []
+    for name, timings in results.items():
+        for size, (seconds, calibration) in timings.items():
+            relative = seconds / calibration
+            before = baseline.get("relative", {}).get(name, {}).get(size) if baseline else None
+            change = relative / before - 1 if before else None
+
+            regressed = change is not None and change * 100 > threshold
+            rows.append((name, size, seconds, change, regressed))
+            if regressed:
+                regressions.append((name, size))
+
+    return rows, regressions
+
+
+def recheck(results, regressions, repeat):
+    """Time regressed cases again, keeping each one's best, to rule out a noisy run."""
+
+    for name, size in regressions:
+        seconds, calibration = best_times(build_cases(int(size))[name], repeat)
+        if seconds / calibration < results[name][size][0] / results[name][size][1]:
+            results[name][size] = (seconds, calibration)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="payload sizes, in notes")
+    parser.add_argument("--repeat", type=int, default=9, help="runs per case, the best of which counts")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="percent slower than baseline that counts as a regression")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--only", help="comma-separated cases to run")
+    parser.add_argument("--rechecks", type=int, default=2,
+                        help="times to re-run a regressed case before believing it")
+    parser.add_argument("--update", action="store_true", help="save this run as the new baseline")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    only = set(args.only.split(",")) if args.only else None
+
+    results = run(sizes, args.repeat, only)
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.update:
+        with open(args.baseline) as infile:
+            baseline = json.load(infile)
+        print("Compared with {} ({}), regression threshold {:.0f}%".format(
+            args.baseline, baseline.get("commit"), args.threshold))
+
+    rows, regressions = compare(results, baseline, args.threshold)
+    for _ in range(args.rechecks):
+        if not regressions:
+            break
+        recheck(results, regressions, args.repeat)
+        rows, regressions = compare(results, baseline, args.threshold)
+
+    print("  {:<16} {:>6} {:>14} {:>8}".format("case", "notes", "time", "change"))
+    for name, size, seconds, change, regressed in rows:
+        print("  {:<16} {:>6} {:>11.3f} us {:>8}{}".format(
+            name, size, seconds * 1e6, "" if change is None else "{:+.0%}".format(change),
+            "  REGRESSED" if regressed else ""))
+
+    if args.update:
+        # Merge, so a run with --only or --sizes doesn't drop the rest.
+        saved = {"relative": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as infile:
+                saved = json.load(infile)
+
+        # Checks keep each case's best of several tries, so save a typical
+        # time rather than a lucky one: the median of a few more runs.
+        rounds = [results] + [run(sizes, args.repeat, only) for _ in range(BASELINE_ROUNDS - 1)]
+        for name, timings in results.items():
+            saved["relative"].setdefault(name, {}).update(
+                {size: float("{:.4g}".format(statistics.median(
+                    round_[name][size][0] / round_[name][size][1] for round_ in rounds)))
+                 for size in timings})
+        saved["commit"] = git_commit()
+
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as outfile:
+            json.dump(saved, outfile, indent=2, sort_keys=True)
+        print("Saved baseline to {}".format(args.baseline))
+
+    if regressions:
+        print("{} case(s) regressed by more than {:.0f}%".format(len(regressions), args.threshold))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
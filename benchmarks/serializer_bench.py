@@ -0,0 +1,61 @@
+"""Compare response serializers on search results shaped like DynamoDB's.
+
+Run from the repo root:
+
+    python -m benchmarks.serializer_bench --notes 5000 --repeat 20
+"""
+import argparse
+import json
+import timeit
+from decimal import Decimal
+
+import functions.serializer as serializer
+from functions.decimalencoder import DecimalEncoder
+
+
+def build_notes(count):
+    """Build notes as boto3 hands them back, numbers and all as Decimals."""
+
+    return [
+        {
+            "noteId": "note{:018d}".format(index),
+            "userId": "moorenc",
+            "notebook": "standard",
+            "text": "Note number {} about nothing in particular.".format(index),
+            "createdAt": Decimal(1536850636242 + index),
+            "updatedAt": Decimal(1536850788457 + index),
+        }
+        for index in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    notes = build_notes(args.notes)
+    c_encoder = serializer.c_encoder()
+
+    cases = [
+        ("json.dumps(cls=DecimalEncoder)", lambda: json.dumps(notes, cls=DecimalEncoder)),
+        ("serializer.dumps (stdlib)", lambda: serializer.dumps(notes)),
+    ]
+    if c_encoder is not None:
+        cases.append(("serializer.dumps (orjson)", lambda: serializer.dumps(notes)))
+
+    print("{} notes, best of {} runs".format(args.notes, args.repeat))
+
+    baseline = None
+    for name, func in cases:
+        serializer.encoder = c_encoder if "orjson" in name else None
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        baseline = baseline or best
+        print("  {:<34} {:8.2f} ms  {:5.2f}x".format(name, best * 1000, baseline / best))
+
+    serializer.encoder = c_encoder
+
+
+if __name__ == "__main__":
+    main()
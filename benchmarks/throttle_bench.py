@@ -0,0 +1,155 @@
+"""Compare tail latency of the default and tuned DynamoDB client profiles under throttling.
+
+Requests go to a local stand-in for DynamoDB that throttles some of them
+and stalls others, like a brownout would. Run from the repo root:
+
+    python -m benchmarks.throttle_bench --requests 200 --throttle 0.1 --stall 0.02
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+# Fake credentials and config, so botocore signs requests to the stand-in.
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("DYNAMODB_TABLE", "Stoic-Athena-Notes-Bench-Table")
+
+import boto3
+from botocore.config import Config
+
+import functions.connection as conn
+import functions.settings as settings
+from benchmarks.common import percentile
+
+
+THROTTLED = json.dumps({
+    "__type": "com.amazonaws.dynamodb.v20120810#ProvisionedThroughputExceededException",
+    "message": "The level of configured provisioned throughput for the table was exceeded."
+}).encode("utf-8")
+
+FOUND = json.dumps({"Item": {"noteId": {"S": "bench"}, "text": {"S": "Benchmark note."}}}).encode("utf-8")
+
+
+class Brownout:
+    """Decide, per request, whether to throttle, stall or answer."""
+
+    def __init__(self, throttle, stall, stall_seconds, seed):
+        self.throttle = throttle
+        self.stall = stall
+        self.stall_seconds = stall_seconds
+        self.seed = seed
+        self.reset()
+
+    def reset(self):
+        self.random = random.Random(self.seed)
+        self.lock = threading.Lock()
+
+    def next(self):
+        with self.lock:
+            roll = self.random.random()
+
+        if roll < self.throttle:
+            return 400, THROTTLED, 0
+        if roll < self.throttle + self.stall:
+            return 200, FOUND, self.stall_seconds
+
+        return 200, FOUND, 0
+
+
+def serve(brownout):
+    """Start the DynamoDB stand-in on a free local port."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        # Send headers and body in one write, so delayed ACKs don't add
+        # 40 ms to every response.
+        wbufsize = 64 * 1024
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            status, body, delay = brownout.next()
+
+            if delay:
+                time.sleep(delay)
+
+            try:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/x-amz-json-1.0")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, *args):
+            pass
+
+    # http.server only has ThreadingHTTPServer from Python 3.7.
+    server = type("ThreadingHTTPServer", (ThreadingMixIn, HTTPServer), {})(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+
+def run(client, table, count):
+    """Time count GetItem calls one after another, counting failures."""
+
+    elapsed = []
+    errors = 0
+    for _ in range(count):
+        start = time.perf_counter()
+        try:
+            client.get_item(TableName=table, Key={"noteId": {"S": "bench"}})
+        except Exception:
+            errors += 1
+        elapsed.append((time.perf_counter() - start) * 1000)
+
+    return sorted(elapsed), errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--throttle", type=float, default=0.1, help="fraction of requests throttled")
+    parser.add_argument("--stall", type=float, default=0.02, help="fraction of requests stalled")
+    parser.add_argument("--stall-seconds", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    brownout = Brownout(args.throttle, args.stall, args.stall_seconds, args.seed)
+    server = serve(brownout)
+    host = "http://127.0.0.1:{}".format(server.server_address[1])
+
+    tuned = settings.load()._replace(host=host)
+    profiles = [
+        ("default (60 s timeouts)", Config()),
+        ("tuned ({:g}/{:g} s timeouts)".format(tuned.connect_timeout, tuned.read_timeout),
+         conn.client_config(tuned)),
+    ]
+
+    print("{} GetItems, {:.0%} throttled, {:.0%} stalled for {:g} s".format(
+        args.requests, args.throttle, args.stall, args.stall_seconds))
+
+    for name, config in profiles:
+        brownout.reset()
+        client = boto3.client("dynamodb", tuned.region, endpoint_url=host, config=config)
+        elapsed, errors = run(client, tuned.table, args.requests)
+
+        print("  {:<34} p50 {:8.1f} ms  p95 {:8.1f} ms  p99 {:8.1f} ms  max {:8.1f} ms  errors {}".format(
+            name, percentile(elapsed, 0.50), percentile(elapsed, 0.95),
+            percentile(elapsed, 0.99), elapsed[-1], errors))
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
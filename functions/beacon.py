@@ -1,15 +1,85 @@
-import json
+import base64
+import os
 
-from functions.decimalencoder import DecimalEncoder
+import functions.metrics as metrics
+from functions.serializer import dumps
 
-def respond(status_code, payload):
+
+# Bodies smaller than this go out as-is; compressing them costs more CPU
+# than it saves on the wire.
+COMPRESSION_MIN_BYTES = int(os.environ.get("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+
+# Encodings we can produce, most preferred first.
+ENCODINGS = ("gzip", "deflate")
+
+
+def choose_encoding(accept_encoding):
+    """Pick the best encoding a client accepts, per its Accept-Encoding header."""
+
+    if not accept_encoding:
+        return None
+
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+
+        accepted[coding.strip().lower()] = quality
+
+    for encoding in ENCODINGS:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+
+    return None
+
+
+def _compress(response, accept_encoding):
+    """Compress a response body in place, if it's big enough and the client agrees."""
+
+    body = response["body"].encode("utf-8")
+    if len(body) < COMPRESSION_MIN_BYTES:
+        return response
+
+    response["headers"]["Vary"] = "Accept-Encoding"
+
+    encoding = choose_encoding(accept_encoding)
+    if encoding is None:
+        return response
+
+    if encoding == "gzip":
+        import gzip
+        body = gzip.compress(body, 6)
+    else:
+        import zlib
+        body = zlib.compress(body, 6)
+
+    response["isBase64Encoded"] = True
+    response["body"] = base64.b64encode(body).decode("ascii")
+    response["headers"]["Content-Encoding"] = encoding
+
+    # The compressed bytes differ, so the validator can only be weak.
+    etag = response["headers"].get("ETag")
+    if etag and not etag.startswith("W/"):
+        response["headers"]["ETag"] = "W/" + etag
+
+    return response
+
+
+@metrics.timed("Response")
+def respond(status_code, payload, headers=None, accept_encoding=None):
     """Wrap up our response for API messaging."""
 
     try:
-        body = json.dumps(payload, cls=DecimalEncoder)
+        body = dumps(payload)
     except TypeError as exc:
         raise exc
-    
+
     response = {
         "isBase64Encoded": False,
         "statusCode": status_code,
@@ -17,4 +87,69 @@ def respond(status_code, payload):
         "body": body
     }
 
-    return response
\ No newline at end of file
+    if headers:
+        response["headers"].update(headers)
+
+    return _compress(response, accept_encoding)
+
+
+def etag_for_item(item):
+    """Build a strong ETag for a single item from its id and last update."""
+
+    if "noteId" not in item or "updatedAt" not in item:
+        return None
+
+    return '"{}-{}"'.format(item["noteId"], item["updatedAt"])
+
+
+def etag_matches(if_none_match, etag):
+    """Determine if an If-None-Match header covers our ETag."""
+
+    if not if_none_match:
+        return False
+
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+
+        # If-None-Match uses weak comparison, so ignore any W/ prefix.
+        if candidate == "*" or candidate.replace("W/", "", 1) == etag:
+            return True
+
+    return False
+
+
+@metrics.timed("Response")
+def respond_conditional(if_none_match, status_code, payload, etag=None, headers=None,
+                        accept_encoding=None):
+    """Wrap up our response with an ETag, or a bodiless 304 if the client is current."""
+
+    try:
+        body = dumps(payload, sort_keys=True)
+    except TypeError as exc:
+        raise exc
+
+    # Lists have no single version to go by, so hash what we'd send.
+    if etag is None:
+        import hashlib
+        etag = '"{}"'.format(hashlib.sha1(body.encode("utf-8")).hexdigest())
+
+    response_headers = {"ETag": etag}
+    if headers:
+        response_headers.update(headers)
+
+    if etag_matches(if_none_match, etag):
+        return {
+            "isBase64Encoded": False,
+            "statusCode": 304,
+            "headers": response_headers,
+            "body": ""
+        }
+
+    response_headers["Content-Type"] = "application/json"
+
+    return _compress({
+        "isBase64Encoded": False,
+        "statusCode": status_code,
+        "headers": response_headers,
+        "body": body
+    }, accept_encoding)
@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import OrderedDict
+
+import functions.metrics as metrics
+
+
+# Returned by get() when nothing usable is cached, since None and {} are
+# both values worth caching.
+MISSING = object()
+
+
+class LRUCache:
+    """Size-bounded, expiring cache of recently used items, with counters.
+
+    Hits, misses and evictions are also counted toward each invocation's
+    metrics, as CacheHits, CacheMisses and CacheEvictions.
+    """
+
+    def __init__(self, maxsize=256, ttl=30.0, negative_ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Fetch a cached value, or MISSING if absent or expired."""
+
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                metrics.count("CacheMisses", 1)
+                return MISSING
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            metrics.count("CacheHits", 1)
+            return entry[1]
+
+    def put(self, key, value):
+        """Cache a value, evicting the least recently used if full."""
+
+        # Empty values are negative entries, e.g. a note that doesn't exist.
+        ttl = self.ttl if value else self.negative_ttl
+
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+                metrics.count("CacheEvictions", 1)
+
+    def invalidate(self, key):
+        """Drop a cached value, if there is one."""
+
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        """Drop every cached value."""
+
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        """Report the cache's size and counters."""
+
+        with self.lock:
+            return {
+                "size": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
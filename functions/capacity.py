@@ -0,0 +1,113 @@
+import heapq
+import threading
+
+import functions.metrics as metrics
+
+
+# Where ConsumedCapacity breaks units down by index.
+INDEX_GROUPS = ("GlobalSecondaryIndexes", "LocalSecondaryIndexes")
+
+# How many of the heaviest users a ledger keeps totals for.
+MAX_USERS = 1000
+
+
+class CapacityLedger:
+    """Running totals of consumed capacity units, by operation, table or index, and user.
+
+    A warm container can see any number of users, so once twice max_users
+    have totals, only the heaviest max_users are kept. A user dropped that
+    way starts over from zero.
+    """
+
+    def __init__(self, max_users=MAX_USERS):
+        self.operations = {}
+        self.indexes = {}
+        self.users = {}
+        self.max_users = max_users
+        self.lock = threading.Lock()
+
+    def record(self, operation, consumed, user_units=None):
+        """Add a response's ConsumedCapacity (one entry or a list) to the totals.
+
+        user_units maps userIds to their share of the units, as a fraction;
+        a single user can be given as a plain userId.
+        """
+
+        if not consumed:
+            return
+
+        if isinstance(consumed, dict):
+            consumed = [consumed]
+
+        if isinstance(user_units, str):
+            user_units = {user_units: 1.0}
+
+        with self.lock:
+            total = 0.0
+            for entry in consumed:
+                units = entry.get("CapacityUnits", 0.0)
+                total += units
+
+                # Writes to a note also write each GSI it's projected into,
+                # so this is where amplification shows up.
+                table = entry.get("Table", {}).get("CapacityUnits")
+                if table is not None:
+                    self._add(self.indexes, "IndexCapacity", entry.get("TableName", "table"), table)
+
+                for group in INDEX_GROUPS:
+                    for name, index in entry.get(group, {}).items():
+                        self._add(self.indexes, "IndexCapacity", name, index.get("CapacityUnits", 0.0))
+
+            self._add(self.operations, "OperationCapacity", operation, total)
+            metrics.count("CapacityUnits", total)
+
+            for user_id, share in (user_units or {}).items():
+                self._add(self.users, "UserCapacity", user_id, total * share)
+
+            if len(self.users) >= 2 * self.max_users:
+                self.users = dict(self._heaviest(self.max_users))
+
+    def _add(self, totals, group, key, units):
+        totals[key] = totals.get(key, 0.0) + units
+        metrics.detail(group, key, units)
+
+    def top_users(self, count=10):
+        """Fetch the users who have consumed the most capacity, most first."""
+
+        with self.lock:
+            return self._heaviest(count)
+
+    def _heaviest(self, count):
+        return heapq.nlargest(count, self.users.items(), key=lambda pair: pair[1])
+
+    def snapshot(self):
+        """Copy the totals so far."""
+
+        with self.lock:
+            return {
+                "operations": dict(self.operations),
+                "indexes": dict(self.indexes),
+                "users": dict(self.users)
+            }
+
+    def reset(self):
+        """Start the totals over."""
+
+        with self.lock:
+            self.operations.clear()
+            self.indexes.clear()
+            self.users.clear()
+
+
+def shares(user_ids):
+    """Split units evenly across the items in a request, by their userId."""
+
+    user_units = {}
+    if not user_ids:
+        return user_units
+
+    share = 1.0 / len(user_ids)
+    for user_id in user_ids:
+        user_units[user_id] = user_units.get(user_id, 0.0) + share
+
+    return user_units
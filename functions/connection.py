@@ -0,0 +1,114 @@
+import os
+import threading
+
+import functions.metrics as metrics
+from functions.cache import LRUCache
+from functions.models.note import NoteModel
+from functions.settings import get_settings
+
+
+# Connection state kept for the life of the container, so warm
+# invocations skip session setup, service model loading and TLS handshakes.
+_state = {
+    "key": None,
+    "resource": None,
+    "table": None,
+    "model": None
+}
+
+_lock = threading.Lock()
+
+
+def client_config(settings):
+    """Build the botocore client profile every handler's connection uses."""
+
+    from botocore.config import Config
+
+    # Short timeouts turn a brownout into a fast retry or error, instead of
+    # a request hanging until the Lambda times out. Only options the botocore
+    # pinned for the python3.6 runtime knows are used: it has neither retry
+    # modes nor tcp_keepalive, and counts retries after the first attempt.
+    return Config(
+        retries={"max_attempts": settings.max_attempts - 1},
+        connect_timeout=settings.connect_timeout,
+        read_timeout=settings.read_timeout,
+        max_pool_connections=settings.max_pool_connections)
+
+
+def _connect(settings):
+    """Connect to DynamoDB, returning the resource and our table."""
+
+    # Deferred so importing a handler never pays for boto3; the first
+    # request to reach the database loads it once for the container.
+    import boto3
+
+    config = client_config(settings)
+
+    resource = boto3.resource(
+        "dynamodb", settings.region, endpoint_url=settings.host, config=config)
+
+    return resource, resource.Table(settings.table)
+
+
+def _build(settings):
+    """Build the DynamoDB resource, table and model for our settings."""
+
+    resource, conn_table = _connect(settings)
+
+    # Optional read-through cache, living as long as the connection.
+    cache = None
+    if settings.cache_size > 0:
+        cache = LRUCache(settings.cache_size, settings.cache_ttl, settings.cache_negative_ttl)
+
+    _state["resource"] = resource
+    _state["table"] = conn_table
+    _state["model"] = NoteModel(conn_table, cache, settings.user_index, settings.notebook_index)
+    _state["key"] = settings
+
+
+def get_table(settings):
+    """Fetch the cached DynamoDB table, rebuilding it if settings changed."""
+
+    if _state["key"] != settings:
+        with _lock:
+            if _state["key"] != settings:
+                with metrics.phase("ClientSetup"):
+                    _build(settings)
+
+    return _state["table"]
+
+
+def get_model(settings):
+    """Fetch the cached note model, rebuilding it if settings changed."""
+
+    get_table(settings)
+
+    return _state["model"]
+
+
+def reset():
+    """Drop the cached connection so the next call rebuilds it."""
+
+    with _lock:
+        _state["key"] = None
+        _state["resource"] = None
+        _state["table"] = None
+        _state["model"] = None
+
+
+def prewarm():
+    """Build the connection during container init, when enabled."""
+
+    if os.environ.get("DYNAMODB_PREWARM", "false").lower() != "true":
+        return
+
+    # Validation is left to the handlers; just skip if config is missing.
+    if "AWS_DEFAULT_REGION" not in os.environ or "DYNAMODB_TABLE" not in os.environ:
+        return
+
+    get_table(get_settings())
+
+
+# Lambda runs module init with a full CPU allocation, so opting in moves
+# boto3 import and service model loading out of the first request.
+prewarm()
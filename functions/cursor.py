@@ -0,0 +1,44 @@
+import functions.exceptions as ex
+import functions.log as log
+
+
+# Get our module logger.
+logger = log.setup_custom_logger("notes")
+
+
+# Cursors are HMAC-signed JWTs, so clients can hand them back but can't
+# forge or edit the DynamoDB key inside them.
+ALGORITHM = "HS256"
+
+
+def encode(last_key, scope, secret):
+    """Wrap a LastEvaluatedKey up in an opaque, signed cursor."""
+
+    import jwt
+
+    token = jwt.encode({"lek": last_key, "scope": scope},
+                       secret, algorithm=ALGORITHM)
+
+    # PyJWT 1.x returns bytes, 2.x returns str.
+    return token.decode("utf-8") if isinstance(token, bytes) else token
+
+
+def decode(token, scope, secret):
+    """Unwrap a cursor back into the ExclusiveStartKey it was issued for."""
+
+    import jwt
+
+    try:
+        claims = jwt.decode(token, secret, algorithms=[ALGORITHM])
+    except jwt.InvalidTokenError:
+        logger.error("Validation failed: 'cursor' is not a valid cursor.")
+        raise ex.RequestCursorInvalidException(
+            "Validation failed: 'cursor' is not a valid cursor.")
+
+    # A cursor is only good for the search that issued it.
+    if claims.get("scope") != scope or not isinstance(claims.get("lek"), dict):
+        logger.error("Validation failed: 'cursor' is not a valid cursor.")
+        raise ex.RequestCursorInvalidException(
+            "Validation failed: 'cursor' is not a valid cursor.")
+
+    return claims["lek"]
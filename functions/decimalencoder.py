@@ -3,9 +3,10 @@ import json
 
 
 # This is a workaround for: http://bugs.python.org/issue16535.
+# Prefer functions.serializer.dumps, which converts in one pass.
 class DecimalEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, decimal.Decimal):
-            return int(obj)
+            return int(obj) if obj == obj.to_integral_value() else float(obj)
 
         return super(DecimalEncoder, self).default(obj)
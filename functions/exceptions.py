@@ -27,3 +27,43 @@ class RequiredPropertiesNotSetException(Exception):
 class RequestUrlIdNotSetException(Exception):
     """Raised when request URI does not specific {id} in the API request."""
     pass
+
+
+class RequestLimitInvalidException(Exception):
+    """Raised when the limit query parameter is not a valid page size in the API request."""
+    pass
+
+
+class RequestCursorInvalidException(Exception):
+    """Raised when the cursor query parameter is malformed or tampered with in the API request."""
+    pass
+
+
+class RequestBatchInvalidException(Exception):
+    """Raised when request body is not a list of a valid batch size in the API request."""
+    pass
+
+
+class RequestIdsInvalidException(Exception):
+    """Raised when the ids query parameter is missing or lists too many ids in the API request."""
+    pass
+
+
+class RequestBodyTooLargeException(Exception):
+    """Raised when request body is larger than allowed in the API request."""
+    pass
+
+
+class RequestPropertiesInvalidException(Exception):
+    """Raised when request body properties are of the wrong type or length in the API request."""
+    pass
+
+
+class RequestReturnValuesInvalidException(Exception):
+    """Raised when the returnValues query parameter isn't one we support in the API request."""
+    pass
+
+
+class RequestFieldsInvalidException(Exception):
+    """Raised when the fields query parameter lists attributes we don't allow in the API request."""
+    pass
@@ -0,0 +1,119 @@
+import functions.connection as conn
+import functions.log as log
+import functions.metrics as metrics
+import functions.exceptions as ex
+import functions.validator as val
+from functions.settings import get_settings
+from functions.beacon import respond
+
+
+# Get our module logger.
+logger = log.setup_custom_logger("notes")
+
+
+@metrics.instrumented
+@log.flushed
+def create_batch(event, context):
+    """Create many items in the collection."""
+
+    try:
+
+        # Fetch our settings, loaded and validated once per container.
+        settings = get_settings()
+
+        # Determine if body is present and small enough, then parse it.
+        data = val.check_request(event, max_bytes=val.MAX_BATCH_BYTES)
+
+        # Determine if body is a list of a valid batch size.
+        val.check_batch(data)
+
+        # Determine if required properties are present and valid, note by note, so
+        # one bad note doesn't sink the rest of the batch.
+        results = [None] * len(data)
+        valid = []
+        for index, props in enumerate(data):
+            try:
+                val.NOTE_SCHEMA(props)
+                valid.append(index)
+            except (ex.RequiredPropertiesNotSetException, ex.RequestPropertiesInvalidException) as exc:
+                results[index] = {"index": index, "statusCode": 400, "error": str(exc)}
+
+        # Fetch our model, reused across warm invocations, and save.
+        note = conn.get_model(settings)
+        items, unprocessed = note.save_batch([data[index] for index in valid])
+
+        created = 0
+        for index, item in zip(valid, items):
+            if item["noteId"] in unprocessed:
+                results[index] = {"index": index, "statusCode": 503,
+                                  "error": "Write not processed, retry this note."}
+            else:
+                results[index] = {"index": index, "statusCode": 201, "item": item}
+                created += 1
+
+        metrics.count("Items", created)
+        logger.info("Notes created in batch: %d of %d", created, len(data))
+        return respond(201 if created == len(data) else 207, {"results": results},
+                       accept_encoding=val.check_accept_encoding(event))
+
+    except ex.AwsRegionNotSetException as exc:
+        return respond(500, {"error": str(exc)})
+
+    except ex.DynamoDbTableNotSetException as exc:
+        return respond(500, {"error": str(exc)})
+
+    except ex.RequestBodyNotSetException as exc:
+        return respond(400, {"error": str(exc)})
+
+    except ex.RequestBodyTooLargeException as exc:
+        return respond(413, {"error": str(exc)})
+
+    except ex.RequestBodyNotJsonException as exc:
+        return respond(400, {"error": str(exc)})
+
+    except ex.RequestBatchInvalidException as exc:
+        return respond(400, {"error": str(exc)})
+
+    except Exception as exc:
+        return respond(500, {"error": str(exc)})
+
+
+@metrics.instrumented
+@log.flushed
+def read_batch(event, context):
+    """Read many items from the collection."""
+
+    try:
+
+        # Fetch our settings, loaded and validated once per container.
+        settings = get_settings()
+
+        # Check for the ids query param.
+        note_ids = val.check_ids(event)
+
+        # Fetch our model, reused across warm invocations, and read.
+        note = conn.get_model(settings)
+        items, unprocessed = note.read_batch(note_ids)
+
+        # Items line up with the requested ids; call out the gaps.
+        missing = [note_id for note_id, item in zip(note_ids, items)
+                   if not item and note_id not in unprocessed]
+
+        found = len(note_ids) - len(missing) - len(unprocessed)
+        metrics.count("Items", found)
+        logger.info("Notes found in batch: %d of %d", found, len(note_ids))
+        return respond(200, {"items": items, "missing": missing,
+                             "unprocessed": sorted(unprocessed)},
+                       accept_encoding=val.check_accept_encoding(event))
+
+    except ex.AwsRegionNotSetException as exc:
+        return respond(500, {"error": str(exc)})
+
+    except ex.DynamoDbTableNotSetException as exc:
+        return respond(500, {"error": str(exc)})
+
+    except ex.RequestIdsInvalidException as exc:
+        return respond(400, {"error": str(exc)})
+
+    except Exception as exc:
+        return respond(500, {"error": str(exc)})
@@ -1,53 +1,36 @@
-import os
-
-import boto3
-
+import functions.connection as conn
 import functions.log as log
+import functions.metrics as metrics
 import functions.exceptions as ex
 import functions.validator as val
+from functions.settings import get_settings
 
 from functions.beacon import respond
-from functions.models.note import NoteModel
 
 # Get our module logger.
 logger = log.setup_custom_logger("notes")
 
 
+@metrics.instrumented
+@log.flushed
 def create(event, context):
     """Create item in the collection."""
 
     try:
 
-        # Determine if required env var for region is present.
-        val.check_region()
-
-        # Determine if required env var for DynamoDB table is present.
-        val.check_dynamodb()
-
-        # Determine if required property body is present.
-        val.check_body(event)
-
-        # Attempt to parse JSON.
-        data = val.check_json(event)
+        # Fetch our settings, loaded and validated once per container.
+        settings = get_settings()
 
-        # Determine if required properties are present.
-        val.check_props(data)
+        # Determine if body is present and small enough, then parse it and
+        # check its properties, in one pass.
+        data = val.check_request(event, val.NOTE_SCHEMA)
 
-        # Set up resource and environment. This is where we keep
-        # *aaS provider resources away from biz logic.
-        region = os.environ["AWS_DEFAULT_REGION"]
-        table = os.environ["DYNAMODB_TABLE"]
-
-        # Determine which DynamoDB host we need (local/remote)?
-        host = val.check_dynamodb_host()
-        conn = boto3.resource("dynamodb", region, endpoint_url=host)
-        conn_table = conn.Table(table)
-
-        # Build our model and save.
-        note = NoteModel(conn_table)
+        # Fetch our model, reused across warm invocations, and save.
+        note = conn.get_model(settings)
         item = note.save(data["userId"], data["notebook"], data["text"])
+        metrics.count("Items", 1)
 
-        logger.info("Note created: {}".format(item))
+        logger.info("Note created: %s", item["noteId"], extra={"note": item})
         return respond(201, item)
 
     except ex.AwsRegionNotSetException as exc:
@@ -59,11 +42,17 @@ def create(event, context):
     except ex.RequestBodyNotSetException as exc:
         return respond(400, {"error": str(exc)})
 
+    except ex.RequestBodyTooLargeException as exc:
+        return respond(413, {"error": str(exc)})
+
     except ex.RequestBodyNotJsonException as exc:
         return respond(400, {"error": str(exc)})
 
     except ex.RequiredPropertiesNotSetException as exc:
         return respond(400, {"error": str(exc)})
 
+    except ex.RequestPropertiesInvalidException as exc:
+        return respond(400, {"error": str(exc)})
+
     except Exception as exc:
         return respond(500, {"error": str(exc)})
@@ -0,0 +1,97 @@
+import functions.connection as conn
+import functions.cursor as cursor
+import functions.log as log
+import functions.metrics as metrics
+import functions.exceptions as ex
+import functions.validator as val
+from functions.settings import get_settings
+from functions.beacon import respond
+from functions.throttle import TokenBucket
+
+
+# Get our module logger.
+logger = log.setup_custom_logger("notes")
+
+# Stop starting new pages once the Lambda has less than this long to go.
+DEADLINE_MARGIN_MS = 2000
+
+
+def _deadline(context):
+    """Build a check for whether waiting this many seconds would blow the deadline."""
+
+    remaining = getattr(context, "get_remaining_time_in_millis", None)
+    if remaining is None:
+        return None
+
+    return lambda wait: remaining() - wait * 1000 < DEADLINE_MARGIN_MS
+
+
+def _purge(event, context, kind):
+    """Delete every item for a user or notebook, resuming from any cursor."""
+
+    try:
+
+        # Fetch our settings, loaded and validated once per container.
+        settings = get_settings()
+
+        # Check for the url {id}.
+        key = val.check_id(event)
+
+        # Check for a cursor left by an earlier, unfinished purge.
+        token = val.check_cursor(event)
+        scope = "purge-{}:{}".format(kind, key)
+        secret = settings.cursor_secret
+        start_key = None
+        if token:
+
+            # An empty key means the purge starts over from the top.
+            start_key = cursor.decode(token, scope, secret) or None
+
+        # Pace deletes to the table's write capacity.
+        limiter = TokenBucket(settings.write_capacity)
+
+        # Fetch our model, reused across warm invocations, and purge.
+        note = conn.get_model(settings)
+        purge = note.purge_by_user if kind == "user" else note.purge_by_notebook
+        deleted, resume_key, complete = purge(
+            key, start_key, limiter, _deadline(context))
+        metrics.count("Items", deleted)
+
+        # Hand back a cursor to carry on from, if we ran out of time.
+        payload = {"deleted": deleted, "complete": complete, "cursor": None}
+        if not complete:
+            payload["cursor"] = cursor.encode(resume_key or {}, scope, secret)
+
+        logger.info("Notes purged for %s: %s [%d, complete: %s]", kind, key, deleted, complete)
+        return respond(200 if complete else 202, payload)
+
+    except ex.AwsRegionNotSetException as exc:
+        return respond(500, {"error": str(exc)})
+
+    except ex.DynamoDbTableNotSetException as exc:
+        return respond(500, {"error": str(exc)})
+
+    except ex.RequestUrlIdNotSetException as exc:
+        return respond(400, {"error": str(exc)})
+
+    except ex.RequestCursorInvalidException as exc:
+        return respond(400, {"error": str(exc)})
+
+    except Exception as exc:
+        return respond(500, {"error": str(exc)})
+
+
+@metrics.instrumented
+@log.flushed
+def purge_by_user(event, context):
+    """Delete the collection of items for a user."""
+
+    return _purge(event, context, "user")
+
+
+@metrics.instrumented
+@log.flushed
+def purge_by_notebook(event, context):
+    """Delete the collection of items for a notebook."""
+
+    return _purge(event, context, "notebook")
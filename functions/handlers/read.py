@@ -1,48 +1,41 @@
-import os
-
-import boto3
-
+import functions.connection as conn
 import functions.log as log
+import functions.metrics as metrics
 import functions.exceptions as ex
 import functions.validator as val
-from functions.beacon import respond
-from functions.models.note import NoteModel
+from functions.settings import get_settings
+from functions.beacon import respond, respond_conditional, etag_for_item
 
 
 # Get our module logger.
 logger = log.setup_custom_logger("notes")
 
 
+@metrics.instrumented
+@log.flushed
 def read(event, context):
     """Read item from the collection."""
 
     try:
         
-        # Determine if required env var for region is present.
-        val.check_region()
-
-        # Determine if required env var for DynamoDB table is present.
-        val.check_dynamodb()
+        # Fetch our settings, loaded and validated once per container.
+        settings = get_settings()
 
-        # Check for the url {id}.
+        # Check for the url {id}, and any fields to narrow the item to.
         note_id = val.check_id(event)
+        fields = val.check_fields(event, val.READ_FIELDS)
 
-        # Set up resource and environment. This is where we keep
-        # *aaS provider resources away from biz logic.
-        region = os.environ["AWS_DEFAULT_REGION"]
-        table = os.environ["DYNAMODB_TABLE"]
-        
-       # Determine which DynamoDB host we need (local/remote)?
-        host = val.check_dynamodb_host()
-        conn = boto3.resource("dynamodb", region, endpoint_url=host)
-        conn_table = conn.Table(table)
+        # Fetch our model, reused across warm invocations, and read.
+        note = conn.get_model(settings)
+        item = note.read(note_id, fields)
+        metrics.count("Items", 1 if item else 0)
 
-        # Build our model and read.
-        note = NoteModel(conn_table)
-        item = note.read(note_id)
+        logger.info("Note found: %s", note_id, extra={"note": item})
 
-        logger.info("Note found: {}".format(item))
-        return respond(200, item)
+        # Let polling clients skip the body if their copy is current.
+        return respond_conditional(val.check_header(event, "If-None-Match"),
+                                   200, item, etag_for_item(item),
+                                   accept_encoding=val.check_accept_encoding(event))
     
     except ex.AwsRegionNotSetException as exc:
         return respond(500, {"error": str(exc)})
@@ -53,5 +46,8 @@ def read(event, context):
     except ex.RequestUrlIdNotSetException as exc:
         return respond(400, {"error": str(exc)})
 
+    except ex.RequestFieldsInvalidException as exc:
+        return respond(400, {"error": str(exc)})
+
     except Exception as exc:
         return respond(500, {"error": str(exc)})
@@ -0,0 +1,46 @@
+import functions.log as log
+from functions.beacon import respond
+from functions.handlers.batch import create_batch, read_batch
+from functions.handlers.create import create
+from functions.handlers.delete import delete
+from functions.handlers.purge import purge_by_notebook, purge_by_user
+from functions.handlers.read import read
+from functions.handlers.search import search_by_notebook, search_by_user
+from functions.handlers.update import patch, update
+
+
+# Get our module logger.
+logger = log.setup_custom_logger("notes")
+
+# API Gateway resource -> HTTP method -> handler, mirroring the per-function
+# events in serverless.yml. Built once per container.
+ROUTES = {
+    "/notes": {"GET": read_batch, "POST": create},
+    "/notes/batch": {"POST": create_batch},
+    "/notes/{id}": {"GET": read, "PUT": update, "PATCH": patch, "DELETE": delete},
+    "/users/{id}/notes": {"GET": search_by_user, "DELETE": purge_by_user},
+    "/notebooks/{id}/notes": {"GET": search_by_notebook, "DELETE": purge_by_notebook},
+}
+
+# Precomputed Allow headers for 405 responses.
+ALLOWED = {resource: ", ".join(sorted(methods)) for resource, methods in ROUTES.items()}
+
+
+@log.flushed
+def route(event, context):
+    """Dispatch a request to its handler, so every route shares one warm container."""
+
+    resource = event.get("resource")
+    methods = ROUTES.get(resource)
+
+    if methods is None:
+        logger.error("No route for resource: %s", resource)
+        return respond(404, {"error": "No route for resource: {}".format(resource)})
+
+    handler = methods.get(event.get("httpMethod"))
+
+    if handler is None:
+        logger.error("Method %s not allowed on resource: %s", event.get("httpMethod"), resource)
+        return respond(405, {"error": "Method not allowed."}, headers={"Allow": ALLOWED[resource]})
+
+    return handler(event, context)
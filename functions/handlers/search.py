@@ -1,50 +1,54 @@
-import json
-import os
-
-import boto3
-
+import functions.connection as conn
+import functions.cursor as cursor
 import functions.log as log
+import functions.metrics as metrics
 import functions.exceptions as ex
 import functions.validator as val
-from functions.beacon import respond
-from functions.models.note import NoteModel
+from functions.settings import get_settings
+from functions.beacon import respond, respond_conditional
 
 
 # Get our module logger.
 logger = log.setup_custom_logger("notes")
 
 
+@metrics.instrumented
+@log.flushed
 def search_by_user(event, context):
     """Return the collection of items based on query."""
 
     try:
 
-        # Determine if required env var for region is present.
-        val.check_region()
-
-        # Determine if required env var for DynamoDB table is present.
-        val.check_dynamodb()
+        # Fetch our settings, loaded and validated once per container.
+        settings = get_settings()
 
         # Check for the url {id}.
         user_id = val.check_id(event)
 
-        # Set up resource and environment. This is where we keep
-        # *aaS provider resources away from biz logic.
-        region = os.environ["AWS_DEFAULT_REGION"]
-        table = os.environ["DYNAMODB_TABLE"]
+        # Check for optional paging and fields query params, unwrapping any cursor.
+        limit = val.check_limit(event)
+        fields = val.check_fields(event, val.SEARCH_FIELDS)
+        token = val.check_cursor(event)
+        scope = "user:{}".format(user_id)
+        secret = settings.cursor_secret
+        start_key = cursor.decode(token, scope, secret) if token else None
 
-        # Determine which DynamoDB host we need (local/remote)?
-        host = val.check_dynamodb_host()
-        conn = boto3.resource("dynamodb", region, endpoint_url=host)
-        conn_table = conn.Table(table)
+        # Fetch our model, reused across warm invocations, and read.
+        note = conn.get_model(settings)
+        items, last_key = note.search_by_user_page(user_id, limit, start_key, fields)
+        metrics.count("Items", len(items))
 
-        # Build our model and read.
-        note = NoteModel(conn_table)
-        items = note.search_by_user(user_id)
+        # Hand back a cursor for the next page, if there is one.
+        headers = {}
+        if last_key is not None:
+            headers["X-Next-Cursor"] = cursor.encode(last_key, scope, secret)
 
-        logger.info("Notes for user found: {} [{}]".format(
-            user_id, len(items)))
-        return respond(200, items)
+        logger.info("Notes for user found: %s [%d]", user_id, len(items))
+
+        # Let polling clients skip the body if the results haven't changed.
+        return respond_conditional(val.check_header(event, "If-None-Match"),
+                                   200, items, headers=headers,
+                                   accept_encoding=val.check_accept_encoding(event))
 
     except ex.AwsRegionNotSetException as exc:
         return respond(500, {"error": str(exc)})
@@ -55,41 +59,56 @@ def search_by_user(event, context):
     except ex.RequestUrlIdNotSetException as exc:
         return respond(400, {"error": str(exc)})
 
+    except ex.RequestLimitInvalidException as exc:
+        return respond(400, {"error": str(exc)})
+
+    except ex.RequestCursorInvalidException as exc:
+        return respond(400, {"error": str(exc)})
+
+    except ex.RequestFieldsInvalidException as exc:
+        return respond(400, {"error": str(exc)})
+
     except Exception as exc:
         return respond(500, {"error": str(exc)})
 
 
+@metrics.instrumented
+@log.flushed
 def search_by_notebook(event, context):
     """Return the collection of items based on query."""
 
     try:
 
-        # Determine if required env var for region is present.
-        val.check_region()
-
-        # Determine if required env var for DynamoDB table is present.
-        val.check_dynamodb()
+        # Fetch our settings, loaded and validated once per container.
+        settings = get_settings()
 
         # Check for the url {id}.
         notebook = val.check_id(event)
 
-        # Set up resource and environment. This is where we keep
-        # *aaS provider resources away from biz logic.
-        region = os.environ["AWS_DEFAULT_REGION"]
-        table = os.environ["DYNAMODB_TABLE"]
+        # Check for optional paging and fields query params, unwrapping any cursor.
+        limit = val.check_limit(event)
+        fields = val.check_fields(event, val.SEARCH_FIELDS)
+        token = val.check_cursor(event)
+        scope = "notebook:{}".format(notebook)
+        secret = settings.cursor_secret
+        start_key = cursor.decode(token, scope, secret) if token else None
+
+        # Fetch our model, reused across warm invocations, and read.
+        note = conn.get_model(settings)
+        items, last_key = note.search_by_notebook_page(notebook, limit, start_key, fields)
+        metrics.count("Items", len(items))
 
-        # Determine which DynamoDB host we need (local/remote)?
-        host = val.check_dynamodb_host()
-        conn = boto3.resource("dynamodb", region, endpoint_url=host)
-        conn_table = conn.Table(table)
+        # Hand back a cursor for the next page, if there is one.
+        headers = {}
+        if last_key is not None:
+            headers["X-Next-Cursor"] = cursor.encode(last_key, scope, secret)
 
-        # Build our model and read.
-        note = NoteModel(conn_table)
-        items = note.search_by_notebook(notebook)
+        logger.info("Notes for notebook found: %s [%d]", notebook, len(items))
 
-        logger.info("Notes for notebook found: {} [{}]".format(
-            notebook, len(items)))
-        return respond(200, items)
+        # Let polling clients skip the body if the results haven't changed.
+        return respond_conditional(val.check_header(event, "If-None-Match"),
+                                   200, items, headers=headers,
+                                   accept_encoding=val.check_accept_encoding(event))
 
     except ex.AwsRegionNotSetException as exc:
         return respond(500, {"error": str(exc)})
@@ -100,5 +119,14 @@ def search_by_notebook(event, context):
     except ex.RequestUrlIdNotSetException as exc:
         return respond(400, {"error": str(exc)})
 
+    except ex.RequestLimitInvalidException as exc:
+        return respond(400, {"error": str(exc)})
+
+    except ex.RequestCursorInvalidException as exc:
+        return respond(400, {"error": str(exc)})
+
+    except ex.RequestFieldsInvalidException as exc:
+        return respond(400, {"error": str(exc)})
+
     except Exception as exc:
         return respond(500, {"error": str(exc)})
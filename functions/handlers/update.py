@@ -1,56 +1,93 @@
-import os
-
-import boto3
-
+import functions.connection as conn
 import functions.log as log
+import functions.metrics as metrics
 import functions.exceptions as ex
 import functions.validator as val
+from functions.settings import get_settings
 from functions.beacon import respond
-from functions.models.note import NoteModel
 
 
 # Get our module logger.
 logger = log.setup_custom_logger("notes")
 
 
+@metrics.instrumented
+@log.flushed
 def update(event, context):
     """Update item in the collection."""
 
     try:
 
-        # Determine if required env var for region is present.
-        val.check_region()
-
-        # Determine if required env var for DynamoDB table is present.
-        val.check_dynamodb()
+        # Fetch our settings, loaded and validated once per container.
+        settings = get_settings()
 
         # Check for the url {id}.
         note_id = val.check_id(event)
 
-        # Determine if required property body is present.
-        val.check_body(event)
+        # Determine if body is present and small enough, then parse it and
+        # check its properties, in one pass.
+        data = val.check_request(event, val.NOTE_SCHEMA)
 
-        # Attempt to parse JSON.
-        data = val.check_json(event)
+        # Fetch our model, reused across warm invocations, and update.
+        note = conn.get_model(settings)
+        item = note.update(note_id, data)
+        metrics.count("Items", 1 if item else 0)
 
-        # Determine if required properties are present.
-        val.check_props(data)
+        logger.info("Note updated: %s", note_id, extra={"note": item})
+        return respond(200, item)
 
-        # Set up resource and environment. This is where we keep
-        # *aaS provider resources away from biz logic.
-        region = os.environ["AWS_DEFAULT_REGION"]
-        table = os.environ["DYNAMODB_TABLE"]
+    except ex.AwsRegionNotSetException as exc:
+        return respond(500, {"error": str(exc)})
 
-        # Determine which DynamoDB host we need (local/remote)?
-        host = val.check_dynamodb_host()
-        conn = boto3.resource("dynamodb", region, endpoint_url=host)
-        conn_table = conn.Table(table)
+    except ex.DynamoDbTableNotSetException as exc:
+        return respond(500, {"error": str(exc)})
 
-        # Build our model and update.
-        note = NoteModel(conn_table)
-        item = note.update(note_id, data)
+    except ex.RequestUrlIdNotSetException as exc:
+        return respond(400, {"error": str(exc)})
+
+    except ex.RequestBodyNotSetException as exc:
+        return respond(400, {"error": str(exc)})
+
+    except ex.RequestBodyTooLargeException as exc:
+        return respond(413, {"error": str(exc)})
 
-        logger.info("Note updated: {}".format(item))
+    except ex.RequestBodyNotJsonException as exc:
+        return respond(400, {"error": str(exc)})
+
+    except ex.RequiredPropertiesNotSetException as exc:
+        return respond(400, {"error": str(exc)})
+
+    except ex.RequestPropertiesInvalidException as exc:
+        return respond(400, {"error": str(exc)})
+
+    except Exception as exc:
+        return respond(500, {"error": str(exc)})
+
+
+@metrics.instrumented
+@log.flushed
+def patch(event, context):
+    """Update only the given properties of an item in the collection."""
+
+    try:
+
+        # Fetch our settings, loaded and validated once per container.
+        settings = get_settings()
+
+        # Check for the url {id}, and what the client wants back.
+        note_id = val.check_id(event)
+        return_values = val.check_return_values(event)
+
+        # Determine if body is present and small enough, then parse it and
+        # check whichever properties it has, in one pass.
+        data = val.check_request(event, val.PATCH_SCHEMA)
+
+        # Fetch our model, reused across warm invocations, and update.
+        note = conn.get_model(settings)
+        item = note.patch(note_id, data, return_values)
+        metrics.count("Items", 1 if item else 0)
+
+        logger.info("Note patched: %s", note_id, extra={"note": item})
         return respond(200, item)
 
     except ex.AwsRegionNotSetException as exc:
@@ -62,14 +99,23 @@ def update(event, context):
     except ex.RequestUrlIdNotSetException as exc:
         return respond(400, {"error": str(exc)})
 
+    except ex.RequestReturnValuesInvalidException as exc:
+        return respond(400, {"error": str(exc)})
+
     except ex.RequestBodyNotSetException as exc:
         return respond(400, {"error": str(exc)})
 
+    except ex.RequestBodyTooLargeException as exc:
+        return respond(413, {"error": str(exc)})
+
     except ex.RequestBodyNotJsonException as exc:
         return respond(400, {"error": str(exc)})
 
     except ex.RequiredPropertiesNotSetException as exc:
         return respond(400, {"error": str(exc)})
 
+    except ex.RequestPropertiesInvalidException as exc:
+        return respond(400, {"error": str(exc)})
+
     except Exception as exc:
         return respond(500, {"error": str(exc)})
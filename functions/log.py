@@ -1,20 +1,219 @@
+import functools
+import json
 import logging
+import os
+import queue
+import random
+import threading
+
+import functions.metrics as metrics
+
+
+# Attributes every LogRecord has; anything else came in through extra=
+# and is logged as a structured field.
+RESERVED_ATTRS = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime"}
+
+# Note text longer than this many characters is cut short in logs, and
+# left out entirely at 0, so logs never carry whole notes.
+TEXT_PREVIEW_CHARS = int(os.environ.get("LOG_TEXT_PREVIEW_CHARS", "64"))
+
+# Keys whose values are note text.
+TEXT_KEYS = frozenset(["text"])
+
+# Set to "true" to hand records to a background thread for formatting and
+# writing, with at most this many waiting before new ones are dropped.
+ASYNC_LOGGING = os.environ.get("LOG_ASYNC", "false").lower() == "true"
+QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "1000"))
+
+# Background logging state, kept for the life of the container.
+_state = {
+    "handler": None,
+    "listener": None,
+    "output": None,
+    "reported": 0
+}
+
+
+def redact(value):
+    """Truncate, or drop, note text anywhere in a logged value."""
+
+    if isinstance(value, dict):
+        return {key: _redact_text(item) if key in TEXT_KEYS else redact(item)
+                for key, item in value.items()}
+
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+
+    return value
+
+
+def _redact_text(text):
+    if not isinstance(text, str):
+        return redact(text)
+
+    if TEXT_PREVIEW_CHARS <= 0:
+        return "[{} chars]".format(len(text))
+
+    if len(text) <= TEXT_PREVIEW_CHARS:
+        return text
+
+    return "{}...[{} chars]".format(text[:TEXT_PREVIEW_CHARS], len(text))
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single JSON lines, with any extra= fields redacted."""
+
+    def format(self, record):
+
+        # The message is only built here, for records we actually emit.
+        entry = {
+            "timestamp": int(record.created * 1000),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+
+        for key, value in record.__dict__.items():
+            if key not in RESERVED_ATTRS:
+                entry[key] = redact(value)
+
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Let through only a fraction of records at the levels given a rate."""
+
+    def __init__(self, rates):
+        super(SamplingFilter, self).__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        rate = self.rates.get(record.levelno)
+
+        return rate is None or random.random() < rate
+
+
+class DroppingQueueHandler(logging.Handler):
+    """Queue records for the listener thread, dropping and counting them when full."""
+
+    def __init__(self, record_queue):
+        super(DroppingQueueHandler, self).__init__()
+        self.queue = record_queue
+        self.dropped = 0
+
+    def emit(self, record):
+
+        # Formatting is left to the listener thread. Handlers only log
+        # values they're done changing, so the record is safe to hand over.
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _listen(record_queue, output):
+    """Write queued records, for the life of the container."""
+
+    while True:
+        record = record_queue.get()
+
+        # If this thread died, flush() would wait on the queue forever.
+        try:
+            output.handle(record)
+        except Exception:
+            pass
+        finally:
+            record_queue.task_done()
+
+
+def _start_listener(output):
+    """Route records through a bounded queue to a background thread."""
+
+    record_queue = queue.Queue(QUEUE_SIZE)
+    handler = DroppingQueueHandler(record_queue)
+
+    listener = threading.Thread(target=_listen, args=(record_queue, output), name="log-listener")
+    listener.daemon = True
+    listener.start()
+
+    _state["handler"] = handler
+    _state["listener"] = listener
+    _state["output"] = output
+
+    return handler
+
+
+def flush():
+    """Wait for queued records to be written, reporting any that were dropped."""
+
+    handler = _state["handler"]
+    if handler is None:
+        return
+
+    handler.queue.join()
+
+    dropped = handler.dropped - _state["reported"]
+    if dropped > 0:
+        _state["reported"] = handler.dropped
+        _state["output"].handle(logging.makeLogRecord({
+            "name": "notes.log", "levelno": logging.WARNING, "levelname": "WARNING",
+            "msg": "Log queue full, dropped records: %d", "args": (dropped,)}))
+
+    _state["output"].flush()
+
+
+def flushed(handler):
+    """Decorate a Lambda handler to flush queued logs before it returns, and the container freezes."""
+
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        try:
+            return handler(event, context)
+        finally:
+            with metrics.phase("LogFlush"):
+                flush()
+
+    return wrapper
+
+
+def parse_sample_rates(spec):
+    """Parse rates like 'INFO=0.1,DEBUG=0' into {level number: rate}."""
+
+    rates = {}
+    for part in (spec or "").split(","):
+        name, _, rate = part.partition("=")
+        if name.strip() and rate.strip():
+            rates[logging.getLevelName(name.strip().upper())] = float(rate)
+
+    return rates
+
 
 def setup_custom_logger(name):
-    """Set up custom logger for specified namespace."""
+    """Set up custom logger for specified namespace, once per container."""
 
-    # Set up module logging levels and handlers.
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
+
+    # Every handler module calls this on import; only the first does any work.
+    if getattr(logger, "configured", False):
+        return logger
+
+    # Set up module logging levels and handlers.
+    logger.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
     logging.getLogger("boto").setLevel(logging.ERROR)
     logging.getLogger("botocore").setLevel(logging.ERROR)
 
     ch = logging.StreamHandler()
-    ch.setLevel(logging.INFO)
+    ch.setFormatter(JsonFormatter())
+
+    # Sample on the logger, so dropped records never reach a formatter.
+    logger.addFilter(SamplingFilter(parse_sample_rates(os.environ.get("LOG_SAMPLE_RATES"))))
+    logger.addHandler(_start_listener(ch) if ASYNC_LOGGING else ch)
 
-    formatter = logging.Formatter(
-        "%(asctime)s | %(name)s | %(levelname)s | %(message)s")
-    ch.setFormatter(formatter)
-    logger.addHandler(ch)
+    # Lambda's root handler would print every line a second time.
+    logger.propagate = False
+    logger.configured = True
 
-    return logger
\ No newline at end of file
+    return logger
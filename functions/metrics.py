@@ -0,0 +1,163 @@
+import functools
+import json
+import os
+import sys
+import time
+
+
+# Set to "true" to time handler phases and emit them as CloudWatch
+# Embedded Metric Format. Off, every hook is a flag check and nothing more.
+ENABLED = os.environ.get("METRICS_ENABLED", "false").lower() == "true"
+
+# CloudWatch namespace the metrics land in.
+NAMESPACE = os.environ.get("METRICS_NAMESPACE", "Stoic/Athena/Notes")
+
+# Per-invocation measurements; "cold" flips once the first invocation ends.
+_state = {
+    "cold": True,
+    "timings": {},
+    "counts": {},
+    "details": {}
+}
+
+
+class _Phase:
+    """Add the time spent inside a with block to a named phase."""
+
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        timings = _state["timings"]
+        timings[self.name] = timings.get(self.name, 0.0) + (time.perf_counter() - self.start) * 1000
+        return False
+
+
+class _NoPhase:
+    """Stands in for _Phase when metrics are off."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+def phase(name):
+    """Time a with block as part of a named phase, e.g. ClientSetup."""
+
+    return _Phase(name) if ENABLED else _NO_PHASE
+
+
+def timed(name):
+    """Decorate a function to time its calls as part of a named phase."""
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+
+            with _Phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def count(name, value):
+    """Add to a named count for this invocation, e.g. Items."""
+
+    if ENABLED:
+        counts = _state["counts"]
+        counts[name] = counts.get(name, 0) + value
+
+
+def detail(group, key, value):
+    """Add to a keyed total within a named group for this invocation, e.g. UserCapacity.
+
+    Groups are logged as properties rather than metrics, so high-cardinality
+    keys like userIds never become CloudWatch dimensions.
+    """
+
+    if ENABLED:
+        totals = _state["details"].setdefault(group, {})
+        totals[key] = totals.get(key, 0) + value
+
+
+def last_invocation():
+    """Copy the timings and counts of the latest instrumented invocation."""
+
+    return {"timings": dict(_state["timings"]), "counts": dict(_state["counts"])}
+
+
+def _emit(handler, context, cold, response):
+    """Write this invocation's measurements as one EMF JSON line."""
+
+    timings = _state["timings"]
+    counts = _state["counts"]
+
+    body = response.get("body") if isinstance(response, dict) else None
+    counts["ResponseBytes"] = len(body) if body else 0
+
+    document = {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": NAMESPACE,
+                "Dimensions": [["Handler"]],
+                "Metrics": [{"Name": "ColdStart", "Unit": "Count"}]
+                + [{"Name": name + "Time", "Unit": "Milliseconds"} for name in timings]
+                + [{"Name": name, "Unit": "Bytes" if name.endswith("Bytes") else "Count"} for name in counts]
+            }]
+        },
+        "Handler": handler,
+        "ColdStart": 1 if cold else 0,
+        "StatusCode": response.get("statusCode") if isinstance(response, dict) else None,
+        "RequestId": getattr(context, "aws_request_id", None)
+    }
+
+    for name, elapsed in timings.items():
+        document[name + "Time"] = round(elapsed, 3)
+    document.update(counts)
+    document.update(_state["details"])
+
+    sys.stdout.write(json.dumps(document) + "\n")
+    sys.stdout.flush()
+
+
+def instrumented(handler):
+    """Decorate a Lambda handler to time it and emit its metrics when it returns."""
+
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        if not ENABLED:
+            return handler(event, context)
+
+        cold = _state["cold"]
+        _state["cold"] = False
+        _state["timings"] = {}
+        _state["counts"] = {}
+        _state["details"] = {}
+
+        response = None
+        try:
+            with _Phase("Total"):
+                response = handler(event, context)
+            return response
+        finally:
+            _emit(handler.__name__, context, cold, response)
+
+    return wrapper
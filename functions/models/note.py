@@ -1,55 +1,348 @@
-import json
+import random
 import time
 
-import boto3
-from boto3.dynamodb.conditions import Key
-import botocore
-from smalluuid import SmallUUID
+import functions.metrics as metrics
+from functions.cache import MISSING
+from functions.capacity import CapacityLedger, shares
 
 
+# GSI names used when none are given, i.e. Dev's. Deployed stages pass
+# in their own, from settings.
+USER_INDEX = "Stoic-Athena-Notes-UserIdNoteId-Dev-Index"
+NOTEBOOK_INDEX = "Stoic-Athena-Notes-NotebookNoteId-Dev-Index"
+
+# BatchWriteItem takes at most 25 requests per call, BatchGetItem 100 keys.
+BATCH_WRITE_SIZE = 25
+BATCH_GET_SIZE = 100
+
+# Most BatchGetItem or BatchWriteItem chunks we'll have in flight at once.
+BATCH_GET_WORKERS = 4
+BATCH_WRITE_WORKERS = 4
+
+# Most items a purge reads and deletes per page.
+PURGE_PAGE_SIZE = 100
+
+# Attempts per chunk before unprocessed items are given up on, and the
+# base and cap (in seconds) of the jittered backoff between attempts.
+BATCH_MAX_ATTEMPTS = 5
+BATCH_BACKOFF_BASE = 0.05
+BATCH_BACKOFF_CAP = 1.0
+
+# Attributes a partial update may change, and the names they go by in
+# expressions; "text" is a DynamoDB reserved word.
+PATCH_NAMES = {"notebook": "#notebook", "text": "#note_text"}
+
+# Attributes searches return when not asked for particular ones.
+SEARCH_FIELDS = ("userId", "noteId", "notebook", "text")
+
+# Attributes stored for the model's own use, never handed back.
+INTERNAL_FIELDS = ("contentHash",)
+
+# Errors that mean a whole batch was throttled and is worth retrying.
+THROTTLING_ERRORS = ("ProvisionedThroughputExceededException",
+                     "ThrottlingException", "RequestLimitExceeded")
+
+
+def backoff(attempt):
+    """Determine how long to sleep before a retry, with full jitter."""
+
+    return random.uniform(0, min(BATCH_BACKOFF_CAP, BATCH_BACKOFF_BASE * 2 ** attempt))
+
+
+def public(item):
+    """Drop internal attributes from an item, in place, and return it."""
+
+    for field in INTERNAL_FIELDS:
+        item.pop(field, None)
+    return item
+
+
+def content_hash(notebook, text):
+    """Hash a note's content compactly, so unchanged rewrites can be told apart."""
+
+    import hashlib
+
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(notebook.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+
+    return digest.hexdigest()
+
+
+def request_shares(requests, owners=None):
+    """Split a batch write's units across the users of its puts and, where owners knows them, deletes."""
+
+    user_ids = []
+    for req in requests:
+        if "PutRequest" in req:
+            user_ids.append(req["PutRequest"]["Item"]["userId"])
+        else:
+            user_ids.append((owners or {}).get(req["DeleteRequest"]["Key"]["noteId"]))
+
+    # Deletes of notes whose owner is unknown keep their share unattributed.
+    user_units = shares(user_ids)
+    user_units.pop(None, None)
+    return user_units
+
+
+def projection(fields):
+    """Build a ProjectionExpression and its attribute names for fields."""
+
+    # Every name goes through a placeholder, since "text" is a reserved word.
+    names = {"#" + field: field for field in fields}
+
+    return ", ".join(names), names
+
+
+def new_note_id():
+    """Generate an id for a new note, a short URL-safe UUID."""
+
+    from smalluuid import SmallUUID
+
+    return str(SmallUUID())
+
+
+# Note that boto3, botocore and smalluuid are imported inside the methods
+# that need them, keeping them off the cold start path for handlers that
+# fail validation before ever touching the database.
 class NoteModel:
-    def __init__(self, table):
+    def __init__(self, table, cache=None, user_index=USER_INDEX, notebook_index=NOTEBOOK_INDEX):
         self.table = table
+        self.user_index = user_index
+        self.notebook_index = notebook_index
+
+        # Optional read-through cache for read(), kept per container and
+        # invalidated by every write this model makes.
+        self.cache = cache
+
+        # Capacity every call has consumed, for the life of the container.
+        self.capacity = CapacityLedger()
+
+    def _invalidate(self, note_ids):
+        """Drop items from the read cache, if we have one."""
 
+        if self.cache is not None:
+            for note_id in note_ids:
+                self.cache.invalidate(note_id)
+
+    @metrics.timed("DynamoDB")
     def save(self, user_id, notebook, text):
         """Write an item to the database."""
 
         timestamp = int(time.time() * 1000)
         item = {
-            "noteId": str(SmallUUID()),
+            "noteId": new_note_id(),
             "userId": user_id,
             "notebook": notebook,
             "text": text,
+            "contentHash": content_hash(notebook, text),
             "createdAt": timestamp,
             "updatedAt": timestamp,
         }
 
-        self.table.put_item(Item=item)
+        result = self.table.put_item(Item=item, ReturnConsumedCapacity="INDEXES")
+        self.capacity.record("save", result.get("ConsumedCapacity"), user_id)
+        self._invalidate([item["noteId"]])
 
-        return item
+        return public(item)
+
+    @metrics.timed("DynamoDB")
+    def save_batch(self, notes):
+        """Write many items to the database, noting any that weren't written."""
+
+        timestamp = int(time.time() * 1000)
+        items = []
+        for note in notes:
+            items.append({
+                "noteId": new_note_id(),
+                "userId": note["userId"],
+                "notebook": note["notebook"],
+                "text": note["text"],
+                "contentHash": content_hash(note["notebook"], note["text"]),
+                "createdAt": timestamp,
+                "updatedAt": timestamp,
+            })
 
-    def read(self, note_id):
-        """Fetch item from the database."""
+        leftover = self._batch_write(
+            [{"PutRequest": {"Item": item}} for item in items], "save_batch")
+        self._invalidate([item["noteId"] for item in items])
+        for item in items:
+            public(item)
+
+        # Items come back in request order, with the ids of any that
+        # were still unprocessed after retrying.
+        return items, set(req["PutRequest"]["Item"]["noteId"] for req in leftover)
+
+    def _batch_write(self, requests, operation, user_id=None, owners=None):
+        """Run write requests in chunks, retrying unprocessed ones; return any left over.
+
+        Capacity goes to user_id when given, else is split across the users
+        of the items being put and, where owners (noteId to userId) knows
+        them, of the items being deleted.
+        """
+
+        import botocore.exceptions
+
+        client = self.table.meta.client
+        leftover = []
+
+        for start in range(0, len(requests), BATCH_WRITE_SIZE):
+            pending = requests[start:start + BATCH_WRITE_SIZE]
+            attempt = 0
+
+            while pending:
+                try:
+                    result = client.batch_write_item(
+                        RequestItems={self.table.name: pending},
+                        ReturnConsumedCapacity="INDEXES")
+                    self.capacity.record(operation, result.get("ConsumedCapacity"),
+                                         user_id or request_shares(pending, owners))
+                    pending = result.get("UnprocessedItems", {}).get(self.table.name, [])
+                except botocore.exceptions.ClientError as e:
+                    if e.response["Error"]["Code"] not in THROTTLING_ERRORS:
+                        raise
+
+                if not pending:
+                    break
+
+                attempt += 1
+                if attempt >= BATCH_MAX_ATTEMPTS:
+                    leftover.extend(pending)
+                    break
+
+                time.sleep(backoff(attempt))
+
+        return leftover
+
+    @metrics.timed("DynamoDB")
+    def read(self, note_id, fields=None):
+        """Fetch item from the database, or just some of its attributes."""
+
+        # A read costs the same whatever it projects, so with a cache we
+        # fetch and keep the whole item, and pick the fields from that.
+        if self.cache is not None:
+            cached = self.cache.get(note_id)
+            # Cache misses too, so repeated reads of a bad id stay cheap.
+            if cached is MISSING:
+                cached = self._get(note_id)
+                self.cache.put(note_id, dict(cached))
+
+            if fields is None:
+                return dict(cached)
+            return {field: cached[field] for field in fields if field in cached}
+
+        return self._get(note_id, fields)
+
+    def _get(self, note_id, fields=None):
+        """Fetch item from the database, projecting fields if given."""
+
+        # Reads are charged to the note's user, so fetch userId regardless.
+        params = {}
+        if fields is not None:
+            fetched = fields if "userId" in fields else list(fields) + ["userId"]
+            params["ProjectionExpression"], params["ExpressionAttributeNames"] = projection(fetched)
 
         item = self.table.get_item(
             Key={
                 "noteId": note_id
-            }
+            },
+            ReturnConsumedCapacity="INDEXES",
+            **params
         )
+        self.capacity.record("read", item.get("ConsumedCapacity"), item.get("Item", {}).get("userId"))
+        item = public(item["Item"]) if "Item" in item else {}
 
-        return item["Item"] if "Item" in item else {}
+        if fields is not None and "userId" not in fields:
+            item.pop("userId", None)
+
+        return item
+
+    @metrics.timed("DynamoDB")
+    def read_batch(self, note_ids):
+        """Fetch many items from the database, in request order, noting any not fetched."""
+
+        # BatchGetItem rejects duplicate keys, so ask for each id once.
+        unique = list(dict.fromkeys(note_ids))
+        chunks = [unique[start:start + BATCH_GET_SIZE]
+                  for start in range(0, len(unique), BATCH_GET_SIZE)]
+
+        if len(chunks) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            # Low level clients are thread safe, unlike resources, and
+            # _batch_get only ever goes through the client.
+            with ThreadPoolExecutor(max_workers=min(BATCH_GET_WORKERS, len(chunks))) as pool:
+                results = list(pool.map(self._batch_get, chunks))
+        else:
+            results = [self._batch_get(chunk) for chunk in chunks]
+
+        found = {}
+        unprocessed = set()
+        for items, leftover in results:
+            for item in items:
+                found[item["noteId"]] = item
+            unprocessed.update(key["noteId"] for key in leftover)
+
+        return [found.get(note_id, {}) for note_id in note_ids], unprocessed
+
+    def _batch_get(self, note_ids):
+        """Fetch a chunk of items, retrying unprocessed keys; return items and keys left over."""
+
+        import botocore.exceptions
+
+        client = self.table.meta.client
+        pending = [{"noteId": note_id} for note_id in note_ids]
+        items = []
+        attempt = 0
 
+        while pending:
+            try:
+                result = client.batch_get_item(
+                    RequestItems={self.table.name: {"Keys": pending}},
+                    ReturnConsumedCapacity="INDEXES")
+                fetched = result.get("Responses", {}).get(self.table.name, [])
+                self.capacity.record("read_batch", result.get("ConsumedCapacity"),
+                                     shares([item["userId"] for item in fetched if "userId" in item]))
+                items.extend(public(item) for item in fetched)
+                pending = result.get("UnprocessedKeys", {}).get(
+                    self.table.name, {}).get("Keys", [])
+            except botocore.exceptions.ClientError as e:
+                if e.response["Error"]["Code"] not in THROTTLING_ERRORS:
+                    raise
+
+            if not pending:
+                break
+
+            attempt += 1
+            if attempt >= BATCH_MAX_ATTEMPTS:
+                break
+
+            time.sleep(backoff(attempt))
+
+        return items, pending
+
+    @metrics.timed("DynamoDB")
     def update(self, note_id, data):
-        """Update item in the database."""
+        """Update item in the database, unless it already holds the same content.
+
+        An unchanged note fails the write's condition instead, which costs
+        no index writes and leaves updatedAt alone. One consistent read
+        then tells an unchanged note, returned as it is, from a missing one.
+        """
+
+        import botocore.exceptions
 
         timestamp = int(time.time() * 1000)
+        digest = content_hash(data["notebook"], data["text"])
         
         try:
             item = self.table.update_item(
                 Key={
                     "noteId": note_id
                 },
-                UpdateExpression="SET #notebook = :notebook, #note_text = :text, updatedAt = :updatedAt",
+                UpdateExpression="SET #notebook = :notebook, #note_text = :text, contentHash = :hash, "
+                                 "updatedAt = :updatedAt",
                 ExpressionAttributeNames={
                     "#notebook": "notebook",
                     "#note_text": "text"
@@ -57,62 +350,371 @@ class NoteModel:
                 ExpressionAttributeValues={
                     ":notebook": data["notebook"],
                     ":text": data["text"],
+                    ":hash": digest,
                     ":updatedAt": timestamp,
                 },
-                # Only update if item already exists in database.
-                ConditionExpression="attribute_exists(noteId)",
+                # Only update if item already exists in database, and has
+                # different content (or predates content hashes).
+                ConditionExpression="attribute_exists(noteId) AND "
+                                    "(attribute_not_exists(contentHash) OR contentHash <> :hash)",
                 ReturnValues="ALL_NEW",
+                ReturnConsumedCapacity="INDEXES",
             )
         except botocore.exceptions.ClientError as e:
             if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return self._unchanged(note_id, digest)
+            raise
+        finally:
+            self._invalidate([note_id])
+
+        self.capacity.record("update", item.get("ConsumedCapacity"), item.get("Attributes", {}).get("userId"))
+
+        return public(item["Attributes"]) if "Attributes" in item else {}
+
+    def _unchanged(self, note_id, digest, operation="update"):
+        """Fetch the item a conditional update failed on, if it's there with the same content.
+
+        botocore 1.12 has no ReturnValuesOnConditionCheckFailure to hand the
+        item back with the failure, so it takes a read.
+        """
+
+        result = self.table.get_item(
+            Key={
+                "noteId": note_id
+            },
+            ConsistentRead=True,
+            ReturnConsumedCapacity="INDEXES"
+        )
+        item = result.get("Item", {})
+        self.capacity.record(operation, result.get("ConsumedCapacity"), item.get("userId"))
+
+        if item.get("contentHash") != digest:
+            return {}
+
+        metrics.count("SkippedWrites", 1)
+        return public(item)
+
+    @metrics.timed("DynamoDB")
+    def patch(self, note_id, data, return_values="UPDATED_NEW"):
+        """Update only the attributes present in data, returning the id and those changed.
+
+        Attributes the read cache says already hold their new value are left
+        out of the write, on condition that they still do: notebook keys an
+        index and both indexes project text, so leaving them out spares the
+        index writes. If the cache was stale, the write is retried in full.
+        Given both, the write is skipped like update()'s if the content hash
+        matches, cache or not.
+        """
+
+        import botocore.exceptions
+
+        fields = [field for field in PATCH_NAMES if field in data]
+
+        # Capacity goes to the note's user when the cache knows who that is;
+        # otherwise only to the operation, as with batch deletes.
+        cached = self.cache.get(note_id) if self.cache is not None else MISSING
+        unchanged = []
+        user_id = None
+        if cached is not MISSING and cached:
+            unchanged = [field for field in fields if cached.get(field) == data[field]]
+            user_id = cached.get("userId")
+
+        timestamp = int(time.time() * 1000)
+        digest = content_hash(data["notebook"], data["text"]) if len(fields) == len(PATCH_NAMES) else None
+
+        try:
+            for skipped in ([unchanged, []] if unchanged else [[]]):
+                try:
+                    result = self.table.update_item(
+                        Key={"noteId": note_id},
+                        ReturnValues=return_values,
+                        ReturnConsumedCapacity="INDEXES",
+                        **self._patch_expressions(data, fields, skipped, timestamp, digest))
+                    break
+                except botocore.exceptions.ClientError as e:
+                    if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                        raise
+            else:
+                # Nothing changed if the content matched; the note may also be gone.
+                if digest is not None and self._unchanged(note_id, digest, "patch"):
+                    return {"noteId": note_id}
                 return {}
+        finally:
+            self._invalidate([note_id])
+
+        self.capacity.record("patch", result.get("ConsumedCapacity"), user_id)
+
+        item = {"noteId": note_id}
+        item.update(result.get("Attributes", {}))
+        return public(item)
+
+    @staticmethod
+    def _patch_expressions(data, fields, skipped, timestamp, digest=None):
+        """Build a partial update's expressions, setting fields but those skipped.
+
+        With both notebook and text given, their digest is stored and must
+        differ from the stored one, as in update(). With one, the hash is
+        dropped if that one is written, so the next update can't match it.
+        """
 
-        return item["Attributes"] if "Attributes" in item else {}
+        names = {PATCH_NAMES[field]: field for field in fields}
+        values = {":" + field: data[field] for field in fields}
+        values[":updatedAt"] = timestamp
 
+        written = [field for field in fields if field not in skipped]
+        updates = ["{} = :{}".format(PATCH_NAMES[field], field) for field in written]
+        updates.append("updatedAt = :updatedAt")
+
+        # Only update if item already exists in database, and the skipped
+        # attributes really do hold their new values.
+        conditions = ["attribute_exists(noteId)"]
+        conditions.extend("{} = :{}".format(PATCH_NAMES[field], field) for field in skipped)
+
+        if digest is not None:
+            updates.append("contentHash = :hash")
+            values[":hash"] = digest
+            conditions.append("(attribute_not_exists(contentHash) OR contentHash <> :hash)")
+            expression = "SET " + ", ".join(updates)
+        elif written:
+            expression = "SET " + ", ".join(updates) + " REMOVE contentHash"
+        else:
+            # Nothing the hash covers changes, so it still holds.
+            expression = "SET " + ", ".join(updates)
+
+        expressions = {
+            "UpdateExpression": expression,
+            "ConditionExpression": " AND ".join(conditions),
+            "ExpressionAttributeValues": values,
+        }
+        if names:
+            expressions["ExpressionAttributeNames"] = names
+
+        return expressions
+
+    @metrics.timed("DynamoDB")
     def delete(self, note_id):
         """Delete item from the database."""
 
         item = self.table.delete_item(
             Key={
                 "noteId": note_id
-            }
+            },
+            ReturnValues="ALL_OLD",
+            ReturnConsumedCapacity="INDEXES"
         )
+        self.capacity.record("delete", item.get("ConsumedCapacity"), item.get("Attributes", {}).get("userId"))
+        self._invalidate([note_id])
 
         return item["Item"] if "Item" in item else {}
 
+    @metrics.timed("DynamoDB")
+    def delete_batch(self, note_ids):
+        """Delete many items from the database in parallel chunks, returning ids not deleted."""
+
+        # Deletes don't hand back whose notes they were, so charge the
+        # owners the read cache knows of.
+        owners = {}
+        if self.cache is not None:
+            for note_id in note_ids:
+                cached = self.cache.get(note_id)
+                if cached is not MISSING and cached and "userId" in cached:
+                    owners[note_id] = cached["userId"]
+
+        return self._delete_batch(note_ids, "delete_batch", owners=owners)
+
+    def _delete_batch(self, note_ids, operation, user_id=None, owners=None):
+        """Delete items in parallel chunks, recording capacity under an operation."""
+
+        import functools
+
+        write = functools.partial(self._batch_write, operation=operation, user_id=user_id, owners=owners)
+        requests = [{"DeleteRequest": {"Key": {"noteId": note_id}}} for note_id in note_ids]
+        chunks = [requests[start:start + BATCH_WRITE_SIZE]
+                  for start in range(0, len(requests), BATCH_WRITE_SIZE)]
+
+        if len(chunks) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=min(BATCH_WRITE_WORKERS, len(chunks))) as pool:
+                results = list(pool.map(write, chunks))
+        else:
+            results = [write(chunk) for chunk in chunks]
+
+        self._invalidate(note_ids)
+
+        return set(req["DeleteRequest"]["Key"]["noteId"]
+                   for leftover in results for req in leftover)
+
+    def _query_page(self, index, key, value, limit=None, start_key=None, keys_only=False, operation="query",
+                    fields=None):
+        """Fetch a single page of items from an index, recording capacity under an operation.
+
+        Items have just the given fields, if any; otherwise SEARCH_FIELDS.
+        """
+
+        from boto3.dynamodb.conditions import Key
+
+        # Skip the note text entirely when all we need are ids. Capacity is
+        # split by userId, so fetch it even when it won't be handed back.
+        if keys_only:
+            wanted = ["noteId"]
+        else:
+            wanted = list(fields or SEARCH_FIELDS)
+        fetched = wanted if keys_only or key == "userId" or "userId" in wanted else wanted + ["userId"]
+        expression, names = projection(fetched)
+
+        params = {
+            "IndexName": index,
+            "ExpressionAttributeNames": names,
+            "ProjectionExpression": expression,
+            "KeyConditionExpression": Key(key).eq(value),
+            "ScanIndexForward": True,
+            "ReturnConsumedCapacity": "INDEXES"
+        }
+
+        if limit is not None:
+            params["Limit"] = limit
+
+        if start_key is not None:
+            params["ExclusiveStartKey"] = start_key
+
+        page = self.table.query(**params)
+
+        # Queries by user are that user's; by notebook, they're split across
+        # whoever owns the items that came back.
+        if key == "userId":
+            user_units = value
+        else:
+            user_units = shares([item["userId"] for item in page.get("Items", []) if "userId" in item])
+        self.capacity.record(operation, page.get("ConsumedCapacity"), user_units)
+
+        if fetched is not wanted:
+            for item in page.get("Items", []):
+                item.pop("userId", None)
+
+        return page
+
+    def _iter_query(self, index, key, value, page_size=100, max_items=None, operation="query"):
+        """Lazily yield items from an index, fetching one page at a time."""
+
+        start_key = None
+        count = 0
+
+        while True:
+
+            # Never ask for more than we're still allowed to hand back.
+            limit = page_size
+            if max_items is not None:
+                limit = min(page_size, max_items - count)
+                if limit <= 0:
+                    return
+
+            page = self._query_page(index, key, value, limit, start_key, operation=operation)
+
+            for item in page.get("Items", []):
+                yield item
+                count += 1
+
+            start_key = page.get("LastEvaluatedKey")
+            if start_key is None:
+                return
+
+    def _purge(self, index, key, value, start_key=None, limiter=None, should_stop=None, operation="purge"):
+        """Delete every item under an index key, page by page, until done or told to stop."""
+
+        deleted = 0
+        page_size = PURGE_PAGE_SIZE
+
+        # Keep each page to about a second's worth of write capacity.
+        if limiter is not None:
+            page_size = max(1, min(PURGE_PAGE_SIZE, int(limiter.rate)))
+
+        while True:
+            # Purges by notebook are charged to each note's user, so fetch
+            # userId along with the ids.
+            page = self._query_page(index, key, value, page_size, start_key, keys_only=key == "userId",
+                                    operation=operation, fields=["noteId", "userId"])
+            note_ids = [item["noteId"] for item in page.get("Items", [])]
+            owners = {item["noteId"]: item["userId"] for item in page.get("Items", []) if "userId" in item}
+
+            # Stop before starting a page we couldn't finish in time; the
+            # caller resumes from the start of this page.
+            wait = limiter.delay(len(note_ids)) if limiter is not None else 0
+            if should_stop is not None and should_stop(wait):
+                return deleted, start_key, False
+
+            if limiter is not None:
+                limiter.take(len(note_ids))
+
+            unprocessed = self._delete_batch(note_ids, operation, value if key == "userId" else None, owners)
+            deleted += len(note_ids) - len(unprocessed)
+
+            # Go back over this page if any deletes never went through.
+            if unprocessed:
+                return deleted, start_key, False
+
+            start_key = page.get("LastEvaluatedKey")
+            if start_key is None:
+                return deleted, None, True
+
+    @metrics.timed("DynamoDB")
+    def purge_by_user(self, user_id, start_key=None, limiter=None, should_stop=None):
+        """Delete all items in the database for a user, returning progress."""
+
+        return self._purge(self.user_index, "userId", user_id, start_key, limiter, should_stop,
+                           "purge_by_user")
+
+    @metrics.timed("DynamoDB")
+    def purge_by_notebook(self, notebook, start_key=None, limiter=None, should_stop=None):
+        """Delete all items in the database for a notebook, returning progress."""
+
+        return self._purge(self.notebook_index, "notebook", notebook, start_key, limiter, should_stop,
+                           "purge_by_notebook")
+
+    @metrics.timed("DynamoDB")
     def search_by_user(self, user_id):
         """Search for items in the database based on user."""
 
-        # Fetch all items from the database by index.
-        items = self.table.query(
-            
-            # @todo Make this dynamically pull from config
-            IndexName="Stoic-Athena-Notes-UserIdNoteId-Dev-Index",
-            ExpressionAttributeNames={
-                "#note_text": "text"
-            },
-            ProjectionExpression="userId, noteId, notebook, #note_text",
-            KeyConditionExpression=Key("userId").eq(user_id),
-            ScanIndexForward=True
-        )
+        # Fetch all items from the database by index, across every page.
+        return list(self._iter_query(self.user_index, "userId", user_id, operation="search_by_user"))
+
+    def iter_by_user(self, user_id, page_size=100, max_items=None):
+        """Lazily yield items based on user, page by page."""
+
+        return self._iter_query(
+            self.user_index, "userId", user_id,
+            page_size, max_items)
+
+    @metrics.timed("DynamoDB")
+    def search_by_user_page(self, user_id, limit=None, start_key=None, fields=None):
+        """Search for a page of items based on user, with the key to resume from."""
+
+        items = self._query_page(
+            self.user_index, "userId", user_id,
+            limit, start_key, operation="search_by_user", fields=fields)
 
-        return items["Items"] if "Items" in items else {}
+        return items.get("Items", []), items.get("LastEvaluatedKey")
 
+    @metrics.timed("DynamoDB")
     def search_by_notebook(self, notebook):
         """Search for items in the database based on notebook."""
 
-        # Fetch all items from the database by index.
-        items = self.table.query(
+        # Fetch all items from the database by index, across every page.
+        return list(self._iter_query(self.notebook_index, "notebook", notebook, operation="search_by_notebook"))
 
-            # @todo Make this dynamically pull from config
-            IndexName="Stoic-Athena-Notes-NotebookNoteId-Dev-Index",
-            ExpressionAttributeNames={
-                "#note_text": "text"
-            },
-            ProjectionExpression="userId, noteId, notebook, #note_text",
-            KeyConditionExpression=Key("notebook").eq(notebook),
-            ScanIndexForward=True
-        )
+    def iter_by_notebook(self, notebook, page_size=100, max_items=None):
+        """Lazily yield items based on notebook, page by page."""
+
+        return self._iter_query(
+            self.notebook_index, "notebook", notebook,
+            page_size, max_items)
+
+    @metrics.timed("DynamoDB")
+    def search_by_notebook_page(self, notebook, limit=None, start_key=None, fields=None):
+        """Search for a page of items based on notebook, with the key to resume from."""
+
+        items = self._query_page(
+            self.notebook_index, "notebook", notebook,
+            limit, start_key, operation="search_by_notebook", fields=fields)
 
-        return items["Items"] if "Items" in items else {}
-    
+        return items.get("Items", []), items.get("LastEvaluatedKey")
@@ -0,0 +1,89 @@
+import decimal
+import json
+
+# How dumps encodes, worked out on its first call rather than at import to
+# keep orjson out of cold starts: orjson's dumps, its default hook and its
+# options for unsorted and sorted keys, or None to use the stdlib.
+NOT_LOADED = object()
+encoder = NOT_LOADED
+
+# orjson.Fragment, which embeds JSON text as given, if orjson has it (3.9+).
+Fragment = None
+
+# The stdlib writes what orjson does: compact, and UTF-8 rather than
+# escapes, so bodies and the ETags hashed from them don't depend on which
+# one ran.
+STDLIB_OPTIONS = {"separators": (",", ":"), "ensure_ascii": False}
+
+
+def c_encoder():
+    """Work out how dumps encodes, importing orjson the first time; None if it isn't installed."""
+
+    global encoder, Fragment
+
+    if encoder is NOT_LOADED:
+        try:
+            import orjson
+        except ImportError:  # pragma: no cover - depends on the build
+            encoder = None
+        else:
+            Fragment = getattr(orjson, "Fragment", None)
+            default = to_native if Fragment is None else to_exact
+            encoder = (orjson.dumps, default, (0, orjson.OPT_SORT_KEYS))
+
+    return encoder
+
+
+def to_native(obj):
+    """Convert a DynamoDB type boto3 hands back (Decimal, set) into a JSON-ready one.
+
+    Used as the encoder's default hook, so values are converted as they're
+    encoded rather than in a separate pass over the payload.
+    """
+
+    kind = type(obj)
+
+    # Whole numbers stay ints of any size. Fractions become floats, which
+    # hold up to 15 significant digits exactly; past that, they're rounded
+    # to the nearest one unless the encoder can take the exact text.
+    if kind is decimal.Decimal:
+        whole = int(obj)
+        return whole if whole == obj else float(obj)
+
+    # String and number sets; sorted so equal sets serialize (and ETag) alike.
+    if kind is set:
+        return sorted(obj)
+
+    raise TypeError("Object of type {} is not JSON serializable".format(kind.__name__))
+
+
+def to_exact(obj):
+    """Convert like to_native, but keep fractions a float can't hold as their exact text.
+
+    Needs orjson.Fragment (orjson 3.9 and later).
+    """
+
+    if type(obj) is decimal.Decimal and int(obj) != obj:
+        number = float(obj)
+        if decimal.Decimal(repr(number)) != obj:
+            return Fragment(str(obj))
+        return number
+
+    return to_native(obj)
+
+
+def dumps(payload, sort_keys=False):
+    """Serialize a payload with DynamoDB types to a JSON string."""
+
+    fast = encoder if encoder is not NOT_LOADED else c_encoder()
+    if fast is not None:
+        encode, default, options = fast
+
+        # orjson stops at 64-bit ints, which DynamoDB numbers can exceed, so
+        # anything it refuses gets a second opinion from the stdlib.
+        try:
+            return encode(payload, default=default, option=options[sort_keys]).decode("utf-8")
+        except TypeError:
+            pass
+
+    return json.dumps(payload, default=to_native, sort_keys=sort_keys, **STDLIB_OPTIONS)
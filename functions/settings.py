@@ -0,0 +1,110 @@
+import os
+import threading
+from collections import namedtuple
+
+import functions.validator as val
+
+
+# Everything the handlers and model need from the environment, validated
+# together and never changed once built.
+Settings = namedtuple("Settings", [
+    "region",
+    "table",
+    "host",
+    "user_index",
+    "notebook_index",
+    "cursor_secret",
+    "write_capacity",
+    "cache_size",
+    "cache_ttl",
+    "cache_negative_ttl",
+    "max_attempts",
+    "connect_timeout",
+    "read_timeout",
+    "max_pool_connections",
+])
+
+# Env vars the settings are built from. Tests and local runs change them,
+# so outside Lambda a change triggers a reload.
+ENV_VARS = (
+    "AWS_DEFAULT_REGION",
+    "DYNAMODB_TABLE",
+    "DYNAMODB_HOST",
+    "DYNAMODB_GSI_USERID_NOTEID",
+    "DYNAMODB_GSI_NOTEBOOK_NOTEID",
+    "CURSOR_SECRET",
+    "DYNAMODB_WRITE_CAPACITY",
+    "NOTE_CACHE_SIZE",
+    "NOTE_CACHE_TTL",
+    "NOTE_CACHE_NEGATIVE_TTL",
+    "DYNAMODB_MAX_ATTEMPTS",
+    "DYNAMODB_CONNECT_TIMEOUT",
+    "DYNAMODB_READ_TIMEOUT",
+    "DYNAMODB_MAX_POOL_CONNECTIONS",
+)
+
+# Lambda never changes env vars within a container, so there settings are
+# loaded once for good, without even checking the env again.
+FROZEN = "AWS_LAMBDA_FUNCTION_NAME" in os.environ
+
+# The env fingerprint and the settings built from it, swapped as one.
+_state = {"current": (None, None)}
+
+_lock = threading.Lock()
+
+
+def load():
+    """Build and validate settings from the environment."""
+
+    # Determine if required env vars for region and DynamoDB table are present.
+    val.check_region()
+    val.check_dynamodb()
+
+    ttl, negative_ttl = val.check_cache_ttl()
+    max_attempts, connect_timeout, read_timeout, pool = val.check_client_profile()
+
+    return Settings(
+        region=os.environ["AWS_DEFAULT_REGION"],
+        table=os.environ["DYNAMODB_TABLE"],
+        host=val.check_dynamodb_host(),
+        user_index=val.check_user_index(),
+        notebook_index=val.check_notebook_index(),
+        cursor_secret=val.check_cursor_secret(),
+        write_capacity=val.check_write_capacity(),
+        cache_size=val.check_cache_size(),
+        cache_ttl=ttl,
+        cache_negative_ttl=negative_ttl,
+        max_attempts=max_attempts,
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        max_pool_connections=pool,
+    )
+
+
+def get_settings():
+    """Fetch the settings, loaded once per container, or again if the env changes."""
+
+    current = _state["current"]
+    if FROZEN and current[1] is not None:
+        return current[1]
+
+    environ = os.environ
+    fingerprint = tuple([environ.get(name) for name in ENV_VARS])
+
+    if current[0] != fingerprint:
+        with _lock:
+            current = _state["current"]
+            if current[0] != fingerprint:
+
+                # Invalid config raises here and leaves nothing cached.
+                current = (fingerprint, load())
+                _state["current"] = current
+
+    return current[1]
+
+
+def reset():
+    """Drop the cached settings so the next call reloads them."""
+
+    with _lock:
+        _state["current"] = (None, None)
@@ -0,0 +1,36 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """Pace work to a steady rate of units per second, e.g. write capacity."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.tokens = self.capacity
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def delay(self, units):
+        """Determine how many seconds until we may spend this many units."""
+
+        with self.lock:
+            self._refill()
+            return max(0.0, (units - self.tokens) / self.rate)
+
+    def take(self, units):
+        """Spend units, sleeping first if the bucket doesn't hold enough yet."""
+
+        wait = self.delay(units)
+        if wait > 0:
+            time.sleep(wait)
+
+        with self.lock:
+            self._refill()
+            self.tokens -= units
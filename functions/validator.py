@@ -1,17 +1,125 @@
+import base64
 import json
 import logging
 import os
 import re
 import time
-from datetime import datetime
 
 import functions.exceptions as ex
 import functions.log as log
+import functions.metrics as metrics
 
 
 # Get our module logger.
 logger = log.setup_custom_logger("notes")
 
+# Compiled once per container rather than on every check.
+TIMESTAMP_PATTERN = re.compile("^[0-9]{13,13}$")
+
+# Largest page size a client may ask a search for.
+MAX_PAGE_LIMIT = 1000
+
+# Most notes a client may send in a single batch request.
+MAX_BATCH_SIZE = 100
+
+# Most notes a client may fetch by id in a single request.
+MAX_BATCH_IDS = 500
+
+# Largest note body we'll parse; a note can't outgrow DynamoDB's 400 KB
+# item limit anyway.
+MAX_NOTE_BYTES = 400 * 1024
+
+# Largest batch body we'll parse.
+MAX_BATCH_BYTES = 4 * 1024 * 1024
+
+# Longest values, in UTF-8 bytes, we'll store per property. userId and
+# notebook key the indexes, so they can't be empty either.
+MAX_KEY_BYTES = 1024
+MAX_TEXT_BYTES = 350 * 1024
+
+
+def compile_schema(fields, partial=False):
+    """Build a one-pass validator for required string properties and their byte lengths.
+
+    Each field is a (name, min_length, max_bytes) tuple. Error messages are
+    built here, once, rather than on every request. A partial schema needs
+    only one of its fields present, and checks whichever are.
+    """
+
+    if partial:
+        missing = "Validation failed: at least one of ({}) must be present in request body.".format(
+            ", ".join(name for name, _, _ in fields))
+    else:
+        missing = "Validation failed: required properties ({}) not present in request body.".format(
+            ", ".join(name for name, _, _ in fields))
+
+    rules = tuple(
+        (name, min_length, max_bytes,
+         "Validation failed: '{}' must be a string of {} to {} bytes.".format(name, min_length, max_bytes))
+        for name, min_length, max_bytes in fields)
+
+    def validate(data):
+        if not isinstance(data, dict):
+            logger.error(missing)
+            raise ex.RequiredPropertiesNotSetException(missing)
+
+        present = 0
+        for name, min_length, max_bytes, invalid in rules:
+            if name not in data:
+                if partial:
+                    continue
+                logger.error(missing)
+                raise ex.RequiredPropertiesNotSetException(missing)
+
+            present += 1
+
+            value = data[name]
+            if type(value) is not str:
+                logger.error(invalid)
+                raise ex.RequestPropertiesInvalidException(invalid)
+
+            # Only encode when the character count alone can't settle it.
+            length = len(value)
+            if length < min_length or length > max_bytes or (
+                    length * 4 > max_bytes and len(value.encode("utf-8")) > max_bytes):
+                logger.error(invalid)
+                raise ex.RequestPropertiesInvalidException(invalid)
+
+        if not present:
+            logger.error(missing)
+            raise ex.RequiredPropertiesNotSetException(missing)
+
+        return data
+
+    return validate
+
+
+# Properties every note we create or update must have.
+NOTE_SCHEMA = compile_schema((
+    ("userId", 1, MAX_KEY_BYTES),
+    ("notebook", 1, MAX_KEY_BYTES),
+    ("text", 0, MAX_TEXT_BYTES),
+))
+
+# Properties a partial update may change; userId stays put, as with PUT.
+PATCH_SCHEMA = compile_schema((
+    ("notebook", 1, MAX_KEY_BYTES),
+    ("text", 0, MAX_TEXT_BYTES),
+), partial=True)
+
+# What a partial update may send back: the attributes it changed, or nothing.
+RETURN_VALUES = ("UPDATED_NEW", "NONE")
+
+# Attributes a client may ask a read for with fields=, and a search; the
+# indexes only project these.
+READ_FIELDS = ("noteId", "userId", "notebook", "text", "createdAt", "updatedAt")
+SEARCH_FIELDS = ("noteId", "userId", "notebook", "text")
+
+# Media types API Gateway treats as binary, per BinaryMediaTypes in
+# serverless.yml. It only passes a compressed body back when the first type
+# a request's Accept header names is one of these.
+BINARY_MEDIA_TYPES = ("application/json",)
+
 
 def check_region():
     """Determine if required env var for region is present."""
@@ -46,13 +154,44 @@ def check_json(event):
     """Attempt to parse JSON."""
 
     try:
-        return json.loads(event["body"])
+        body = event["body"]
+
+        # Binary media types are on for compressed responses, so API
+        # Gateway may hand request bodies over base64 encoded.
+        if event.get("isBase64Encoded"):
+            body = base64.b64decode(body)
+
+        return json.loads(body)
     except ValueError:
         logger.error("Validation failed: Could not parse JSON body.")
         raise ex.RequestBodyNotJsonException(
             "Validation failed: Could not parse JSON body.")
 
 
+@metrics.timed("Validation")
+def check_request(event, schema=None, max_bytes=MAX_NOTE_BYTES):
+    """Determine if request body is present, not too large, JSON and valid, in one pass."""
+
+    if "body" not in event or event["body"] is None:
+        logger.error("Validation failed: 'body' not present in http event.")
+        raise ex.RequestBodyNotSetException(
+            "Validation failed: 'body' not present in http event.")
+
+    # Size it up before spending time decoding or parsing it.
+    body = event["body"]
+    size = len(body) * 3 // 4 if event.get("isBase64Encoded") else len(body)
+    if size > max_bytes:
+        logger.error(
+            "Validation failed: request body larger than %s bytes.", max_bytes)
+        raise ex.RequestBodyTooLargeException(
+            "Validation failed: request body larger than {} bytes.".format(max_bytes))
+
+    data = check_json(event)
+
+    return schema(data) if schema is not None else data
+
+
+@metrics.timed("Validation")
 def check_id(event):
     """Determine if URI path {id} present."""
 
@@ -81,13 +220,182 @@ def check_id(event):
 def check_props(data):
     """Determine if required properties are present."""
 
-    if "userId" not in data or "notebook" not in data or "text" not in data:
+    if not isinstance(data, dict) or "userId" not in data or "notebook" not in data or "text" not in data:
         logger.error(
             "Validation failed: required properties (userId, notebook, text) not present in request body.")
         raise ex.RequiredPropertiesNotSetException(
             "Validation failed: required properties (userId, notebook, text) not present in request body.")
 
 
+def check_header(event, name):
+    """Fetch an optional request header, ignoring case."""
+
+    headers = event.get("headers") or {}
+    name = name.lower()
+
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+
+    return None
+
+
+def check_accept_encoding(event):
+    """Fetch the Accept-Encoding header, or None if API Gateway couldn't pass a compressed body back."""
+
+    accept = check_header(event, "Accept") or ""
+    if accept.split(",")[0].partition(";")[0].strip().lower() not in BINARY_MEDIA_TYPES:
+        return None
+
+    return check_header(event, "Accept-Encoding")
+
+
+@metrics.timed("Validation")
+def check_batch(data):
+    """Determine if request body is a list of a valid batch size."""
+
+    if not isinstance(data, list) or not 1 <= len(data) <= MAX_BATCH_SIZE:
+        logger.error(
+            "Validation failed: request body must be a list of 1 to %s notes.", MAX_BATCH_SIZE)
+        raise ex.RequestBatchInvalidException(
+            "Validation failed: request body must be a list of 1 to {} notes.".format(MAX_BATCH_SIZE))
+
+
+@metrics.timed("Validation")
+def check_ids(event):
+    """Determine if query param ids is a valid comma separated list of ids."""
+
+    params = event.get("queryStringParameters") or {}
+    ids = [note_id.strip() for note_id in (params.get("ids") or "").split(",")]
+    ids = [note_id for note_id in ids if note_id]
+
+    if not 1 <= len(ids) <= MAX_BATCH_IDS:
+        logger.error(
+            "Validation failed: 'ids' must list 1 to %s note ids.", MAX_BATCH_IDS)
+        raise ex.RequestIdsInvalidException(
+            "Validation failed: 'ids' must list 1 to {} note ids.".format(MAX_BATCH_IDS))
+
+    return ids
+
+
+@metrics.timed("Validation")
+def check_limit(event):
+    """Determine if optional query param limit is a valid page size."""
+
+    params = event.get("queryStringParameters") or {}
+    if params.get("limit") is None:
+        return None
+
+    try:
+        limit = int(params["limit"])
+    except ValueError:
+        limit = 0
+
+    if not 1 <= limit <= MAX_PAGE_LIMIT:
+        logger.error(
+            "Validation failed: 'limit' must be between 1 and %s.", MAX_PAGE_LIMIT)
+        raise ex.RequestLimitInvalidException(
+            "Validation failed: 'limit' must be between 1 and {}.".format(MAX_PAGE_LIMIT))
+
+    return limit
+
+
+@metrics.timed("Validation")
+def check_return_values(event):
+    """Determine if optional query param returnValues is one a partial update supports."""
+
+    params = event.get("queryStringParameters") or {}
+    return_values = params.get("returnValues") or RETURN_VALUES[0]
+
+    if return_values not in RETURN_VALUES:
+        logger.error(
+            "Validation failed: 'returnValues' must be one of (%s).", ", ".join(RETURN_VALUES))
+        raise ex.RequestReturnValuesInvalidException(
+            "Validation failed: 'returnValues' must be one of ({}).".format(", ".join(RETURN_VALUES)))
+
+    return return_values
+
+
+@metrics.timed("Validation")
+def check_fields(event, allowed):
+    """Determine if optional query param fields lists only allowed attributes.
+
+    Returns them in allow-list order, always with noteId, or None if not set.
+    """
+
+    params = event.get("queryStringParameters") or {}
+    requested = set(field.strip() for field in (params.get("fields") or "").split(","))
+    requested.discard("")
+
+    if not requested:
+        return None
+
+    if not requested.issubset(allowed):
+        logger.error(
+            "Validation failed: 'fields' may only list (%s).", ", ".join(allowed))
+        raise ex.RequestFieldsInvalidException(
+            "Validation failed: 'fields' may only list ({}).".format(", ".join(allowed)))
+
+    requested.add("noteId")
+    return [field for field in allowed if field in requested]
+
+
+def check_cursor(event):
+    """Fetch optional query param cursor, if present."""
+
+    params = event.get("queryStringParameters") or {}
+    cursor = params.get("cursor")
+
+    return cursor if cursor else None
+
+
+def check_cursor_secret():
+    """Determine the secret used to sign paging cursors."""
+
+    if "CURSOR_SECRET" not in os.environ:
+        return "local-dev-cursor-secret-not-for-deployed-stages"
+    else:
+        return os.environ["CURSOR_SECRET"]
+
+
+def check_write_capacity():
+    """Determine the table's provisioned write capacity, to pace bulk writes."""
+
+    if "DYNAMODB_WRITE_CAPACITY" not in os.environ:
+        return 1.0
+    else:
+        return float(os.environ["DYNAMODB_WRITE_CAPACITY"])
+
+
+def check_cache_size():
+    """Determine how many notes the read cache may hold; 0 turns it off."""
+
+    if "NOTE_CACHE_SIZE" not in os.environ:
+        return 0
+    else:
+        return int(os.environ["NOTE_CACHE_SIZE"])
+
+
+def check_cache_ttl():
+    """Determine how many seconds notes, and misses, stay in the read cache."""
+
+    ttl = float(os.environ.get("NOTE_CACHE_TTL", "30"))
+    negative_ttl = float(os.environ.get("NOTE_CACHE_NEGATIVE_TTL", ttl))
+
+    return ttl, negative_ttl
+
+
+def check_client_profile():
+    """Determine the DynamoDB client's total attempts, timeouts in seconds and pool size."""
+
+    return (
+        int(os.environ.get("DYNAMODB_MAX_ATTEMPTS", "3")),
+        float(os.environ.get("DYNAMODB_CONNECT_TIMEOUT", "1")),
+        float(os.environ.get("DYNAMODB_READ_TIMEOUT", "2")),
+        int(os.environ.get("DYNAMODB_MAX_POOL_CONNECTIONS", "10")),
+    )
+
+
 def check_dynamodb_host():
     """Determine the right DynamoDB host to use, local or remote."""
 
@@ -97,6 +405,24 @@ def check_dynamodb_host():
         return os.environ["DYNAMODB_HOST"]
 
 
+def check_user_index():
+    """Determine the name of the userId GSI, defaulting to Dev's."""
+
+    if "DYNAMODB_GSI_USERID_NOTEID" not in os.environ:
+        return "Stoic-Athena-Notes-UserIdNoteId-Dev-Index"
+    else:
+        return os.environ["DYNAMODB_GSI_USERID_NOTEID"]
+
+
+def check_notebook_index():
+    """Determine the name of the notebook GSI, defaulting to Dev's."""
+
+    if "DYNAMODB_GSI_NOTEBOOK_NOTEID" not in os.environ:
+        return "Stoic-Athena-Notes-NotebookNoteId-Dev-Index"
+    else:
+        return os.environ["DYNAMODB_GSI_NOTEBOOK_NOTEID"]
+
+
 def is_now(timestamp):
     """Determine if timestamp is +/- 10 seconds of now."""
 
@@ -107,7 +433,7 @@ def is_now(timestamp):
 def is_timestamp(timestamp):
     """Determine if timestamp is truly a valid timestamp in milliseconds."""
 
-    if re.match("^[0-9]{13,13}$", str(timestamp)):
+    if TIMESTAMP_PATTERN.match(str(timestamp)):
         return True
     else:
         return False
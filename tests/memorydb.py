@@ -0,0 +1,1200 @@
+"""An in-memory stand-in for a boto3 DynamoDB Table, for tests and benchmarks.
+
+It covers the surface NoteModel uses:
+
+* put_item, get_item, update_item and delete_item, with conditions and ReturnValues
+* query on the table or a GSI, with projections, filters and paging
+* batch_write_item and batch_get_item, through table.meta.client
+* ReturnConsumedCapacity, worked out from item sizes the way DynamoDB does
+
+Items are kept in a dict by key, and each GSI keeps every partition's
+(range key, table key) pairs in a sorted list, so queries are a bisect away
+even with millions of items. Values are stored and returned as boto3 would
+hand them back: numbers as Decimals, floats refused.
+
+To run the unit tests against it rather than DynamoDB Local:
+
+    python -m pytest -p tests.memorydb tests/unit
+"""
+import bisect
+import decimal
+import functools
+import re
+import threading
+
+import botocore.exceptions
+import botocore.session
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+from boto3.dynamodb.types import TypeSerializer
+
+
+# DynamoDB's item size limit, and the sizes reads and writes are billed in.
+MAX_ITEM_BYTES = 400 * 1024
+READ_UNIT_BYTES = 4 * 1024
+WRITE_UNIT_BYTES = 1024
+
+# Most data a single query reads before handing back a page.
+MAX_PAGE_BYTES = 1024 * 1024
+
+# Most requests a batch write, and keys a batch get, may carry.
+MAX_BATCH_WRITES = 25
+MAX_BATCH_GETS = 100
+
+# Sorts after every string a range key could start with.
+HIGHEST_CHAR = "\U0010ffff"
+
+
+def error(code, message, operation, **extra):
+    """Build the ClientError botocore would raise for a failed call."""
+
+    response = {"Error": {"Code": code, "Message": message}}
+    response.update(extra)
+    return botocore.exceptions.ClientError(response, operation)
+
+
+def validation_error(message, operation):
+    return error("ValidationException", message, operation)
+
+
+# DynamoDB's service model, as the installed botocore knows it, loaded once.
+_service = {}
+
+
+def checked(operation):
+    """Refuse parameters the installed botocore doesn't know for an operation, as it would.
+
+    Otherwise the stand-in would take calls that fail against DynamoDB,
+    e.g. ones only newer botocore releases than Pipfile.lock's support.
+    """
+
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, **kwargs):
+            if "model" not in _service:
+                _service["model"] = botocore.session.get_session().get_service_model("dynamodb")
+            members = _service["model"].operation_model(operation).input_shape.members
+
+            unknown = [name for name in kwargs if name not in members]
+            if unknown:
+                raise botocore.exceptions.ParamValidationError(
+                    report='Unknown parameter in input: "{}", must be one of: {}'.format(
+                        unknown[0], ", ".join(members)))
+
+            return method(self, **kwargs)
+        return wrapper
+    return decorate
+
+
+# Types stored just as they're given.
+STORED_AS_IS = frozenset([str, decimal.Decimal, bool, bytes, type(None)])
+
+
+def store(value, operation="PutItem"):
+    """Copy a value in, with numbers as Decimals, refusing floats like boto3 does."""
+
+    kind = type(value)
+
+    if kind is str or kind is bool or value is None or kind is decimal.Decimal or kind is bytes:
+        return value
+
+    if kind is int:
+        return decimal.Decimal(value)
+
+    if kind is float:
+        raise TypeError("Float types are not supported. Use Decimal types instead.")
+
+    if kind is dict:
+        return {key: item if type(item) in STORED_AS_IS else store(item, operation)
+                for key, item in value.items()}
+
+    if kind is list:
+        return [store(item, operation) for item in value]
+
+    if kind is set:
+        return set(store(item, operation) for item in value)
+
+    raise TypeError("Unsupported type \"{}\" for value \"{}\"".format(kind, value))
+
+
+# Types that are safe to hand out without copying.
+IMMUTABLE = frozenset([str, decimal.Decimal, bool, bytes, type(None)])
+
+
+def clone(value):
+    """Copy a stored value out, so callers can't change what's stored."""
+
+    kind = type(value)
+
+    if kind is dict:
+        return {key: item if type(item) in IMMUTABLE else clone(item) for key, item in value.items()}
+
+    if kind is list:
+        return [clone(item) for item in value]
+
+    if kind is set:
+        return set(value)
+
+    return value
+
+
+def value_size(value):
+    """Work out a value's size as DynamoDB bills it."""
+
+    kind = type(value)
+
+    if kind is str:
+        return len(value.encode("utf-8"))
+
+    if kind is decimal.Decimal:
+        digits = len(str(value).lstrip("-").replace(".", "").strip("0")) or 1
+        return (digits + 1) // 2 + 1
+
+    if kind is bytes:
+        return len(value)
+
+    if kind is bool or value is None:
+        return 1
+
+    if kind is dict:
+        return 3 + sum(len(key.encode("utf-8")) + value_size(item) + 1 for key, item in value.items())
+
+    if kind is list:
+        return 3 + sum(value_size(item) + 1 for item in value)
+
+    if kind is set:
+        return sum(value_size(item) for item in value)
+
+    return len(str(value))
+
+
+# Attribute names repeat across items, so their sizes are worked out once.
+_name_sizes = {}
+
+
+def attribute_sizes(item):
+    """Work out each attribute's size, its name plus its value, as DynamoDB bills it."""
+
+    sizes = {}
+    for name, value in item.items():
+        name_size = _name_sizes.get(name)
+        if name_size is None:
+            name_size = _name_sizes[name] = value_size(name)
+
+        # Plain strings are most of what notes hold.
+        if type(value) is str:
+            sizes[name] = name_size + len(value.encode("utf-8"))
+        else:
+            sizes[name] = name_size + value_size(value)
+
+    return sizes
+
+
+def item_size(item):
+    """Work out an item's size: every attribute's name plus its value."""
+
+    return sum(attribute_sizes(item).values())
+
+
+def read_units(size, consistent=False):
+    """Read units for a given number of bytes, half price unless strongly consistent."""
+
+    units = max(1, -(-size // READ_UNIT_BYTES))
+    return float(units) if consistent else units / 2.0
+
+
+def write_units(size):
+    """Write units for a given number of bytes."""
+
+    return float(max(1, -(-size // WRITE_UNIT_BYTES)))
+
+
+# Expressions ---------------------------------------------------------------
+
+TOKEN = re.compile(r"\s*(?:(<>|<=|>=|=|<|>|\(|\)|,|\+|-)|(#[\w]+)|(:[\w]+)|([A-Za-z_][\w]*(?:\.[A-Za-z_][\w]*)*))")
+
+KEYWORDS = frozenset(["AND", "OR", "NOT", "BETWEEN", "IN"])
+
+
+def tokenize(expression):
+    """Split an expression into operators, #names, :values and words."""
+
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+
+    while position < len(expression):
+        match = TOKEN.match(expression, position)
+        if match is None:
+            raise ValueError("Invalid expression near: {}".format(expression[position:]))
+
+        op, name, value, word = match.groups()
+        if op is not None:
+            tokens.append(("op", op))
+        elif name is not None:
+            tokens.append(("name", name))
+        elif value is not None:
+            tokens.append(("value", value))
+        elif word.upper() in KEYWORDS:
+            tokens.append(("keyword", word.upper()))
+        else:
+            tokens.append(("word", word))
+
+        position = match.end()
+
+    return tokens
+
+
+class Resolver:
+    """Resolve #name and :value placeholders for one call."""
+
+    def __init__(self, names, values, operation):
+        self.names = names or {}
+        self.values = values or {}
+        self.operation = operation
+
+    def name(self, token):
+        kind, text = token
+        if kind == "word":
+            return text
+
+        if text not in self.names:
+            raise validation_error("An expression attribute name used in the document path is not "
+                                   "defined; attribute name: {}".format(text), self.operation)
+        return self.names[text]
+
+    def value(self, text):
+        if text not in self.values:
+            raise validation_error(
+                "An expression attribute value used in expression is not defined; "
+                "attribute value: {}".format(text), self.operation)
+        return store(self.values[text], self.operation)
+
+
+class Parser:
+    """Recursive descent over a token list, for conditions and updates."""
+
+    def __init__(self, tokens, resolver):
+        self.tokens = tokens
+        self.index = 0
+        self.resolver = resolver
+
+    def peek(self, offset=0):
+        index = self.index + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def take(self, kind=None, text=None):
+        token = self.peek()
+        if (kind is not None and token[0] != kind) or (text is not None and token[1] != text):
+            raise validation_error("Invalid expression: unexpected token {}".format(token[1]),
+                                   self.resolver.operation)
+        self.index += 1
+        return token
+
+    def done(self):
+        return self.index >= len(self.tokens)
+
+    # Conditions compile to functions of an item.
+
+    def condition(self):
+        test = self.conjunction()
+        while self.peek() == ("keyword", "OR"):
+            self.take()
+            left, right = test, self.conjunction()
+            test = (lambda left, right: lambda item: left(item) or right(item))(left, right)
+        return test
+
+    def conjunction(self):
+        test = self.negation()
+        while self.peek() == ("keyword", "AND"):
+            self.take()
+            left, right = test, self.negation()
+            test = (lambda left, right: lambda item: left(item) and right(item))(left, right)
+        return test
+
+    def negation(self):
+        if self.peek() == ("keyword", "NOT"):
+            self.take()
+            inner = self.negation()
+            return lambda item: not inner(item)
+        return self.comparison()
+
+    def comparison(self):
+        if self.peek() == ("op", "("):
+            self.take()
+            test = self.condition()
+            self.take("op", ")")
+            return test
+
+        kind, text = self.peek()
+        if kind == "word" and self.peek(1) == ("op", "(") and text != "size":
+            return self.function()
+
+        left = self.operand()
+        kind, text = self.take()
+
+        if (kind, text) == ("keyword", "BETWEEN"):
+            low = self.operand()
+            self.take("keyword", "AND")
+            high = self.operand()
+            return lambda item: compare(left(item), low(item), ">=") and compare(left(item), high(item), "<=")
+
+        if (kind, text) == ("keyword", "IN"):
+            self.take("op", "(")
+            options = [self.operand()]
+            while self.peek() == ("op", ","):
+                self.take()
+                options.append(self.operand())
+            self.take("op", ")")
+            return lambda item: any(left(item) == option(item) for option in options)
+
+        if kind != "op" or text not in ("=", "<>", "<", "<=", ">", ">="):
+            raise validation_error("Invalid condition operator: {}".format(text), self.resolver.operation)
+
+        right = self.operand()
+        return lambda item: compare(left(item), right(item), text)
+
+    def function(self):
+        name = self.take("word")[1]
+        self.take("op", "(")
+        path = self.path()
+        args = []
+        while self.peek() == ("op", ","):
+            self.take()
+            args.append(self.operand())
+        self.take("op", ")")
+
+        if name == "attribute_exists":
+            return lambda item: path in item
+        if name == "attribute_not_exists":
+            return lambda item: path not in item
+        if name == "begins_with":
+            return lambda item: isinstance(item.get(path), (str, bytes)) and item[path].startswith(args[0](item))
+        if name == "contains":
+            return lambda item: path in item and args[0](item) in item[path]
+        if name == "attribute_type":
+            return lambda item: path in item and type_code(item[path]) == args[0](item)
+
+        raise validation_error("Invalid function name; function: {}".format(name), self.resolver.operation)
+
+    def path(self):
+        kind, text = self.take()
+        if kind not in ("name", "word"):
+            raise validation_error("Invalid attribute path: {}".format(text), self.resolver.operation)
+        return self.resolver.name((kind, text))
+
+    def operand(self):
+        kind, text = self.peek()
+
+        if kind == "value":
+            self.take()
+            value = self.resolver.value(text)
+            return lambda item: value
+
+        if kind == "word" and text == "size" and self.peek(1) == ("op", "("):
+            self.take()
+            self.take("op", "(")
+            path = self.path()
+            self.take("op", ")")
+            return lambda item: decimal.Decimal(len(item[path])) if path in item else None
+
+        path = self.path()
+        return lambda item: item.get(path)
+
+    # Updates compile to functions that change an item in place.
+
+    def update(self):
+        actions = []
+        while not self.done():
+            clause = self.take("word")[1].upper()
+            while True:
+                actions.append(self.action(clause))
+                if self.peek() != ("op", ","):
+                    break
+                self.take()
+        return actions
+
+    def action(self, clause):
+        path = self.path()
+
+        if clause == "SET":
+            self.take("op", "=")
+            value = self.set_value()
+            return path, lambda item: item.__setitem__(path, value(item))
+
+        if clause == "REMOVE":
+            return path, lambda item: item.pop(path, None)
+
+        if clause == "ADD":
+            value = self.operand()
+            return path, lambda item: item.__setitem__(path, add(item.get(path), value(item)))
+
+        if clause == "DELETE":
+            value = self.operand()
+            return path, lambda item: item.__setitem__(path, item.get(path, set()) - value(item))
+
+        raise validation_error("Invalid UpdateExpression clause: {}".format(clause), self.resolver.operation)
+
+    def set_value(self):
+        left = self.set_operand()
+        if self.peek() in (("op", "+"), ("op", "-")):
+            sign = self.take()[1]
+            right = self.set_operand()
+            if sign == "+":
+                return lambda item: left(item) + right(item)
+            return lambda item: left(item) - right(item)
+        return left
+
+    def set_operand(self):
+        kind, text = self.peek()
+        if kind == "word" and text in ("if_not_exists", "list_append") and self.peek(1) == ("op", "("):
+            self.take()
+            self.take("op", "(")
+            first = self.operand() if text == "list_append" else None
+            path = None if first else self.path()
+            self.take("op", ",")
+            second = self.operand()
+            self.take("op", ")")
+
+            if text == "if_not_exists":
+                return lambda item: item[path] if path in item else second(item)
+            return lambda item: list(first(item)) + list(second(item))
+
+        return self.operand()
+
+
+def compare(left, right, operator):
+    """Compare two values as DynamoDB would; mismatched types never match."""
+
+    if left is None or right is None or (type(left) is not type(right)):
+        return operator == "<>" and not (left is None and right is None)
+
+    if operator == "=":
+        return left == right
+    if operator == "<>":
+        return left != right
+    if operator == "<":
+        return left < right
+    if operator == "<=":
+        return left <= right
+    if operator == ">":
+        return left > right
+    return left >= right
+
+
+def add(current, value):
+    if current is None:
+        return value
+    if isinstance(current, set):
+        return current | value
+    return current + value
+
+
+def type_code(value):
+    return next(iter(TypeSerializer().serialize(value)))
+
+
+# Tables -------------------------------------------------------------------
+
+class Index:
+    """A GSI: partition key -> sorted [(range key, table key)]."""
+
+    def __init__(self, name, hash_key, range_key, projection="ALL", non_key_attributes=()):
+        self.name = name
+        self.hash_key = hash_key
+        self.range_key = range_key
+        self.projection = projection
+        self.non_key_attributes = frozenset(non_key_attributes)
+        self.partitions = {}
+
+        # Attributes this index stores, or None for all of them; known
+        # once the index is bound to its table's key.
+        self.stored = None
+
+    def bind(self, table_key):
+        if self.projection == "ALL":
+            return
+
+        self.stored = frozenset([table_key, self.hash_key, self.range_key])
+        if self.projection == "INCLUDE":
+            self.stored = self.stored | self.non_key_attributes
+
+    def projected(self, item):
+        """Cut an item down to what this index stores."""
+
+        if self.stored is None:
+            return item
+
+        return {name: item[name] for name in self.stored if name in item}
+
+    def size(self, sizes):
+        """Work out the size of an item's copy in this index, from its attribute sizes."""
+
+        if self.stored is None:
+            return sum(sizes.values())
+
+        return sum(sizes[name] for name in self.stored if name in sizes)
+
+    def changed(self, old, new):
+        """Determine if an update changes what this index stores for an item."""
+
+        if self.stored is None:
+            return old != new
+
+        return any(old.get(name) != new.get(name) for name in self.stored)
+
+    def entry(self, item, table_key):
+        """The (partition, (range, table key)) an item is filed under, or None if sparse."""
+
+        if self.hash_key not in item or self.range_key not in item:
+            return None
+
+        return item[self.hash_key], (item[self.range_key], item[table_key])
+
+    def add(self, entry):
+        partition, position = entry
+        bisect.insort(self.partitions.setdefault(partition, []), position)
+
+    def remove(self, entry):
+        partition, position = entry
+        entries = self.partitions.get(partition)
+        index = bisect.bisect_left(entries, position)
+        del entries[index]
+        if not entries:
+            del self.partitions[partition]
+
+
+class Meta:
+    def __init__(self, client):
+        self.client = client
+
+
+class MemoryClient:
+    """The low-level client calls NoteModel makes, over any number of tables."""
+
+    def __init__(self):
+        self.tables = {}
+
+    def table(self, name, operation):
+        if name not in self.tables:
+            raise error("ResourceNotFoundException", "Requested resource not found", operation)
+        return self.tables[name]
+
+    @checked("BatchWriteItem")
+    def batch_write_item(self, RequestItems, ReturnConsumedCapacity="NONE"):
+        operation = "BatchWriteItem"
+
+        if sum(len(requests) for requests in RequestItems.values()) > MAX_BATCH_WRITES:
+            raise validation_error("Too many items requested for the BatchWriteItem call", operation)
+
+        consumed = []
+        for name, requests in RequestItems.items():
+            table = self.table(name, operation)
+
+            keys = [table.key_of(request.get("PutRequest", {}).get("Item") or
+                                 request.get("DeleteRequest", {}).get("Key"), operation)
+                    for request in requests]
+            if len(set(keys)) != len(keys):
+                raise validation_error("Provided list of item keys contains duplicates", operation)
+
+            units = Units()
+            with table.lock:
+                for request in requests:
+                    if "PutRequest" in request:
+                        table._put(request["PutRequest"]["Item"], operation, units)
+                    else:
+                        table._delete(request["DeleteRequest"]["Key"], operation, units)
+
+            if ReturnConsumedCapacity in ("TOTAL", "INDEXES"):
+                consumed.append(units.consumed(table.name, ReturnConsumedCapacity))
+
+        response = {"UnprocessedItems": {}}
+        if consumed:
+            response["ConsumedCapacity"] = consumed
+        return response
+
+    @checked("BatchGetItem")
+    def batch_get_item(self, RequestItems, ReturnConsumedCapacity="NONE"):
+        operation = "BatchGetItem"
+
+        if sum(len(request["Keys"]) for request in RequestItems.values()) > MAX_BATCH_GETS:
+            raise validation_error("Too many items requested for the BatchGetItem call", operation)
+
+        responses = {}
+        consumed = []
+        for name, request in RequestItems.items():
+            table = self.table(name, operation)
+
+            keys = [table.key_of(key, operation) for key in request["Keys"]]
+            if len(set(keys)) != len(keys):
+                raise validation_error("Provided list of item keys contains duplicates", operation)
+
+            project = table.projector(request.get("ProjectionExpression"),
+                                      request.get("ExpressionAttributeNames"), operation)
+            consistent = request.get("ConsistentRead", False)
+            units = Units()
+            found = []
+
+            with table.lock:
+                for key in keys:
+                    item = table.items.get(key)
+                    size = sum(table.sizes[key].values()) if item is not None else 0
+
+                    # Batch gets are billed per item, each rounded up.
+                    units.read(None, read_units(size, consistent))
+                    if item is not None:
+                        found.append(project(item))
+
+            responses[name] = found
+            if ReturnConsumedCapacity in ("TOTAL", "INDEXES"):
+                consumed.append(units.consumed(table.name, ReturnConsumedCapacity))
+
+        response = {"Responses": responses, "UnprocessedKeys": {}}
+        if consumed:
+            response["ConsumedCapacity"] = consumed
+        return response
+
+
+class Units:
+    """Capacity one call consumed, on the table and each index."""
+
+    def __init__(self):
+        self.table = 0.0
+        self.indexes = {}
+        self.kind = "Read"
+
+    def read(self, index, units):
+        self.kind = "Read"
+        if index is None:
+            self.table += units
+        else:
+            self.indexes[index] = self.indexes.get(index, 0.0) + units
+
+    def write(self, index, units):
+        self.kind = "Write"
+        if index is None:
+            self.table += units
+        elif units:
+            self.indexes[index] = self.indexes.get(index, 0.0) + units
+
+    def total(self):
+        return self.table + sum(self.indexes.values())
+
+    def consumed(self, table_name, mode):
+        total = self.total()
+        consumed = {"TableName": table_name, "CapacityUnits": total,
+                    self.kind + "CapacityUnits": total}
+
+        if mode == "INDEXES":
+            consumed["Table"] = {"CapacityUnits": self.table, self.kind + "CapacityUnits": self.table}
+            if self.indexes:
+                consumed["GlobalSecondaryIndexes"] = {
+                    name: {"CapacityUnits": units, self.kind + "CapacityUnits": units}
+                    for name, units in self.indexes.items()}
+
+        return consumed
+
+
+class MemoryTable:
+    """A DynamoDB table with a single hash key and any number of GSIs, held in memory."""
+
+    def __init__(self, name, hash_key, indexes=(), client=None):
+        self.name = name
+        self.table_name = name
+        self.hash_key = hash_key
+        self.indexes = dict((index.name, index) for index in indexes)
+        for index in indexes:
+            index.bind(hash_key)
+
+        # Items by key, and their attribute sizes, kept alongside so
+        # capacity is worked out without walking items again.
+        self.items = {}
+        self.sizes = {}
+        self.lock = threading.RLock()
+
+        # Running totals of the capacity every call has consumed, by
+        # "Table" or index name.
+        self.consumed = {"Table": {"Read": 0.0, "Write": 0.0}}
+        for index in indexes:
+            self.consumed[index.name] = {"Read": 0.0, "Write": 0.0}
+
+        self.client = client if client is not None else MemoryClient()
+        self.client.tables[name] = self
+        self.meta = Meta(self.client)
+
+    def key_of(self, key, operation):
+        """Pull the table key out of a Key or Item, checking it matches the schema."""
+
+        if not key or self.hash_key not in key:
+            raise validation_error("The provided key element does not match the schema", operation)
+
+        value = key[self.hash_key]
+        if not isinstance(value, str) or value == "":
+            raise validation_error("One or more parameter values are not valid. The AttributeValue for a "
+                                   "key attribute cannot contain an empty string value. Key: {}"
+                                   .format(self.hash_key), operation)
+
+        return value
+
+    def projector(self, expression, names, operation, index=None):
+        """Build a function that cuts items down to a ProjectionExpression."""
+
+        if not expression:
+            if index is None or index.stored is None:
+                return clone
+            return self._picker(index.stored)
+
+        resolver = Resolver(names, None, operation)
+        parser = Parser(tokenize(expression), resolver)
+        paths = [parser.path()]
+        while not parser.done():
+            parser.take("op", ",")
+            paths.append(parser.path())
+
+        if index is not None and index.stored is not None:
+            missing = [path for path in paths if path not in index.stored]
+            if missing:
+                raise validation_error("One or more parameter values were invalid: Global secondary index {} "
+                                       "does not project {}".format(index.name, ", ".join(missing)), operation)
+
+        return self._picker(paths)
+
+    def _picker(self, paths):
+        """Build a function that copies just some attributes out of items."""
+
+        def pick(item):
+            picked = {}
+            for path in paths:
+                if path in item:
+                    value = item[path]
+                    picked[path] = value if type(value) in IMMUTABLE else clone(value)
+            return picked
+
+        return pick
+
+    def condition(self, expression, names, values, operation):
+        """Build a function that tests items against a ConditionExpression."""
+
+        if isinstance(expression, ConditionBase):
+            built = ConditionExpressionBuilder().build_expression(expression)
+            expression = built.condition_expression
+            names = dict(names or {}, **built.attribute_name_placeholders)
+            values = dict(values or {}, **built.attribute_value_placeholders)
+
+        parser = Parser(tokenize(expression), Resolver(names, values, operation))
+        test = parser.condition()
+        if not parser.done():
+            raise validation_error("Invalid ConditionExpression: unexpected trailing tokens", operation)
+
+        return test
+
+    def _record(self, units):
+        kind = units.kind
+        self.consumed["Table"][kind] += units.table
+        for name, value in units.indexes.items():
+            self.consumed[name][kind] += value
+
+    def _file(self, old, new, old_sizes, new_sizes, units):
+        """Move an item's index entries from its old to its new version, billing the writes."""
+
+        for index in self.indexes.values():
+            before = index.entry(old, self.hash_key) if old is not None else None
+            after = index.entry(new, self.hash_key) if new is not None else None
+
+            # Same place in the index: only a write if what it stores changed.
+            if before is not None and before == after:
+                if index.changed(old, new):
+                    units.write(index.name, write_units(index.size(new_sizes)))
+                continue
+
+            if before is not None:
+                index.remove(before)
+                units.write(index.name, write_units(index.size(old_sizes)))
+
+            if after is not None:
+                index.add(after)
+                units.write(index.name, write_units(index.size(new_sizes)))
+
+    def _put(self, item, operation, units):
+        key = self.key_of(item, operation)
+        item = store(item, operation)
+
+        sizes = attribute_sizes(item)
+        size = sum(sizes.values())
+        if size > MAX_ITEM_BYTES:
+            raise validation_error("Item size has exceeded the maximum allowed size", operation)
+
+        old = self.items.get(key)
+        for index in self.indexes.values():
+            for name in (index.hash_key, index.range_key):
+                if name in item and (not isinstance(item[name], (str, decimal.Decimal, bytes)) or item[name] == ""):
+                    raise validation_error("One or more parameter values were invalid: Type mismatch "
+                                           "for Index Key {}".format(name), operation)
+
+        old_sizes = self.sizes.get(key)
+        self.items[key] = item
+        self.sizes[key] = sizes
+        self._file(old, item, old_sizes, sizes, units)
+        units.write(None, write_units(max(size, sum(old_sizes.values()) if old_sizes else 0)))
+
+        return old
+
+    def _delete(self, key, operation, units):
+        key = self.key_of(key, operation)
+
+        old = self.items.pop(key, None)
+        old_sizes = self.sizes.pop(key, None)
+        if old is not None:
+            self._file(old, None, old_sizes, None, units)
+        units.write(None, write_units(sum(old_sizes.values()) if old_sizes else 0))
+
+        return old
+
+    def load(self, items):
+        """Write many items at once, unconditionally and unbilled, to seed a test or benchmark."""
+
+        with self.lock:
+            for item in items:
+                key = self.key_of(item, "PutItem")
+                item = store(item)
+                self.items[key] = item
+                self.sizes[key] = attribute_sizes(item)
+
+            # One sort per partition beats an insort per item.
+            for index in self.indexes.values():
+                partitions = {}
+                for item in self.items.values():
+                    entry = index.entry(item, self.hash_key)
+                    if entry is not None:
+                        partitions.setdefault(entry[0], []).append(entry[1])
+                for entries in partitions.values():
+                    entries.sort()
+                index.partitions = partitions
+
+    def _check(self, condition, names, values, old, operation, return_on_failure):
+        if condition is None:
+            return
+
+        test = self.condition(condition, names, values, operation)
+        if not test(old or {}):
+            extra = {}
+            if return_on_failure == "ALL_OLD" and old is not None:
+                serializer = TypeSerializer()
+                extra["Item"] = {name: serializer.serialize(value) for name, value in old.items()}
+            raise error("ConditionalCheckFailedException", "The conditional request failed", operation, **extra)
+
+    def _respond(self, units, mode, response):
+        self._record(units)
+        if mode in ("TOTAL", "INDEXES"):
+            response["ConsumedCapacity"] = units.consumed(self.name, mode)
+        return response
+
+    @checked("PutItem")
+    def put_item(self, Item, ConditionExpression=None, ExpressionAttributeNames=None,
+                 ExpressionAttributeValues=None, ReturnValues="NONE", ReturnConsumedCapacity="NONE",
+                 ReturnValuesOnConditionCheckFailure="NONE"):
+        operation = "PutItem"
+        units = Units()
+
+        with self.lock:
+            old = self.items.get(self.key_of(Item, operation))
+            self._check(ConditionExpression, ExpressionAttributeNames, ExpressionAttributeValues,
+                        old, operation, ReturnValuesOnConditionCheckFailure)
+            self._put(Item, operation, units)
+
+        response = {}
+        if ReturnValues == "ALL_OLD" and old is not None:
+            response["Attributes"] = clone(old)
+
+        return self._respond(units, ReturnConsumedCapacity, response)
+
+    @checked("GetItem")
+    def get_item(self, Key, ProjectionExpression=None, ExpressionAttributeNames=None,
+                 ConsistentRead=False, ReturnConsumedCapacity="NONE"):
+        operation = "GetItem"
+        project = self.projector(ProjectionExpression, ExpressionAttributeNames, operation)
+        units = Units()
+
+        with self.lock:
+            key = self.key_of(Key, operation)
+            item = self.items.get(key)
+            units.read(None, read_units(sum(self.sizes[key].values()) if item else 0, ConsistentRead))
+
+            response = {}
+            if item is not None:
+                response["Item"] = project(item)
+
+        return self._respond(units, ReturnConsumedCapacity, response)
+
+    @checked("UpdateItem")
+    def update_item(self, Key, UpdateExpression=None, ConditionExpression=None,
+                    ExpressionAttributeNames=None, ExpressionAttributeValues=None,
+                    ReturnValues="NONE", ReturnConsumedCapacity="NONE",
+                    ReturnValuesOnConditionCheckFailure="NONE"):
+        operation = "UpdateItem"
+        units = Units()
+        key = self.key_of(Key, operation)
+
+        resolver = Resolver(ExpressionAttributeNames, ExpressionAttributeValues, operation)
+        actions = Parser(tokenize(UpdateExpression or ""), resolver).update()
+
+        paths = [path for path, _ in actions]
+        if self.hash_key in paths:
+            raise validation_error("One or more parameter values were invalid: Cannot update attribute {}. "
+                                   "This attribute is part of the key".format(self.hash_key), operation)
+
+        with self.lock:
+            old = self.items.get(key)
+            self._check(ConditionExpression, ExpressionAttributeNames, ExpressionAttributeValues,
+                        old, operation, ReturnValuesOnConditionCheckFailure)
+
+            # Work on a copy, so a failed action leaves the item as it was.
+            new = clone(old) if old is not None else {self.hash_key: key}
+            for _, apply in actions:
+                apply(new)
+
+            self._put(new, operation, units)
+
+        response = {}
+        if ReturnValues == "ALL_NEW":
+            response["Attributes"] = clone(new)
+        elif ReturnValues == "ALL_OLD" and old is not None:
+            response["Attributes"] = clone(old)
+        elif ReturnValues == "UPDATED_NEW":
+            response["Attributes"] = {path: clone(new[path]) for path in paths if path in new}
+        elif ReturnValues == "UPDATED_OLD" and old is not None:
+            response["Attributes"] = {path: clone(old[path]) for path in paths if path in old}
+
+        return self._respond(units, ReturnConsumedCapacity, response)
+
+    @checked("DeleteItem")
+    def delete_item(self, Key, ConditionExpression=None, ExpressionAttributeNames=None,
+                    ExpressionAttributeValues=None, ReturnValues="NONE", ReturnConsumedCapacity="NONE",
+                    ReturnValuesOnConditionCheckFailure="NONE"):
+        operation = "DeleteItem"
+        units = Units()
+
+        with self.lock:
+            old = self.items.get(self.key_of(Key, operation))
+            self._check(ConditionExpression, ExpressionAttributeNames, ExpressionAttributeValues,
+                        old, operation, ReturnValuesOnConditionCheckFailure)
+            self._delete(Key, operation, units)
+
+        response = {}
+        if ReturnValues == "ALL_OLD" and old is not None:
+            response["Attributes"] = clone(old)
+
+        return self._respond(units, ReturnConsumedCapacity, response)
+
+    @checked("Query")
+    def query(self, KeyConditionExpression, IndexName=None, ProjectionExpression=None,
+              FilterExpression=None, ExpressionAttributeNames=None, ExpressionAttributeValues=None,
+              ScanIndexForward=True, Limit=None, ExclusiveStartKey=None, ConsistentRead=False,
+              ReturnConsumedCapacity="NONE", Select=None):
+        operation = "Query"
+        names = dict(ExpressionAttributeNames or {})
+        values = dict(ExpressionAttributeValues or {})
+
+        if isinstance(KeyConditionExpression, ConditionBase):
+            built = ConditionExpressionBuilder().build_expression(KeyConditionExpression, is_key_condition=True)
+            KeyConditionExpression = built.condition_expression
+            names.update(built.attribute_name_placeholders)
+            values.update(built.attribute_value_placeholders)
+
+        index = None
+        if IndexName is not None:
+            if IndexName not in self.indexes:
+                raise validation_error("The table does not have the specified index: {}".format(IndexName),
+                                       operation)
+            index = self.indexes[IndexName]
+
+        hash_value, bounds = self._key_condition(KeyConditionExpression, names, values, index, operation)
+        project = self.projector(ProjectionExpression, names, operation, index)
+        keep = self.condition(FilterExpression, names, values, operation) if FilterExpression else None
+
+        units = Units()
+        with self.lock:
+            if index is None:
+                entries = [(None, hash_value)] if hash_value in self.items else []
+                start, stop = 0, len(entries)
+                if ExclusiveStartKey is not None:
+                    start = stop
+            else:
+                entries = index.partitions.get(hash_value, [])
+                start, stop = key_slice(entries, bounds)
+
+                # Pick up just past (or, going backwards, before) the last page.
+                if ExclusiveStartKey is not None:
+                    position = (ExclusiveStartKey[index.range_key], ExclusiveStartKey[self.hash_key])
+                    if ScanIndexForward:
+                        start = max(start, bisect.bisect_right(entries, position))
+                    else:
+                        stop = min(stop, bisect.bisect_left(entries, position))
+
+            order = range(start, stop) if ScanIndexForward else range(stop - 1, start - 1, -1)
+
+            items = []
+            evaluated = 0
+            scanned_bytes = 0
+            last = None
+
+            for position in order:
+                if Limit is not None and evaluated >= Limit:
+                    break
+                if scanned_bytes >= MAX_PAGE_BYTES:
+                    break
+
+                key = entries[position][1]
+                item = self.items[key]
+                scanned_bytes += index.size(self.sizes[key]) if index is not None else sum(self.sizes[key].values())
+                evaluated += 1
+                last = item
+
+                # Filters only see what the index stores; projecting cuts
+                # items down to it too.
+                if keep is None or keep(index.projected(item) if index is not None else item):
+                    items.append(project(item))
+            else:
+                last = None
+
+            units.read(IndexName, read_units(scanned_bytes, ConsistentRead))
+
+        response = {"Items": items, "Count": len(items), "ScannedCount": evaluated}
+        if Select == "COUNT":
+            del response["Items"]
+
+        # Only hand back a key to resume from when there's more to read.
+        if last is not None:
+            response["LastEvaluatedKey"] = self._resume_key(last, index)
+
+        return self._respond(units, ReturnConsumedCapacity, response)
+
+    def _resume_key(self, item, index):
+        key = {self.hash_key: item[self.hash_key]}
+        if index is not None:
+            key[index.hash_key] = item[index.hash_key]
+            key[index.range_key] = item[index.range_key]
+        return key
+
+    def _key_condition(self, expression, names, values, index, operation):
+        """Read a key condition into its partition value and range key bounds, if any."""
+
+        hash_key = index.hash_key if index is not None else self.hash_key
+        range_key = index.range_key if index is not None else None
+
+        resolver = Resolver(names, values, operation)
+        parser = Parser(tokenize(expression), resolver)
+        hash_value = bounds = None
+
+        def value():
+            return resolver.value(parser.take("value")[1])
+
+        while not parser.done():
+            if parser.peek() in (("op", "("), ("op", ")"), ("keyword", "AND")):
+                parser.take()
+                continue
+
+            if parser.peek() == ("word", "begins_with"):
+                parser.take()
+                parser.take("op", "(")
+                path = parser.path()
+                parser.take("op", ",")
+                bounds = ("begins_with", value(), None)
+                parser.take("op", ")")
+            else:
+                path = parser.path()
+                kind, operator = parser.take()
+
+                if (kind, operator) == ("keyword", "BETWEEN"):
+                    low = value()
+                    parser.take("keyword", "AND")
+                    bounds = ("BETWEEN", low, value())
+                elif path == hash_key and operator == "=":
+                    hash_value = value()
+                    continue
+                else:
+                    bounds = (operator, value(), None)
+
+            if path != range_key:
+                raise validation_error("Query key condition not supported", operation)
+
+        if hash_value is None:
+            raise validation_error("Query condition missed key schema element: {}".format(hash_key), operation)
+
+        return hash_value, bounds
+
+
+def key_slice(entries, bounds):
+    """Find the run of sorted (range key, table key) entries within range key bounds."""
+
+    if bounds is None:
+        return 0, len(entries)
+
+    operator, low, high = bounds
+
+    def before(value):
+        return bisect.bisect_left(entries, (value,))
+
+    def after(value):
+        return bisect.bisect_right(entries, (value, HIGHEST_CHAR))
+
+    if operator == "=":
+        return before(low), after(low)
+    if operator == "<":
+        return 0, before(low)
+    if operator == "<=":
+        return 0, after(low)
+    if operator == ">":
+        return after(low), len(entries)
+    if operator == ">=":
+        return before(low), len(entries)
+    if operator == "BETWEEN":
+        return before(low), after(high)
+
+    # begins_with: every string starting with the prefix sorts below this.
+    return before(low), before(low + HIGHEST_CHAR)
+
+
+def notes_table(name, user_index, notebook_index, client=None):
+    """Build a notes table shaped like the one serverless.yml declares."""
+
+    return MemoryTable(name, "noteId", [
+        Index(user_index, "userId", "noteId", "INCLUDE", ["text", "notebook"]),
+        Index(notebook_index, "notebook", "noteId", "INCLUDE", ["text", "userId"]),
+    ], client)
+
+
+# Tables by name, shared across a test session or benchmark run.
+_client = MemoryClient()
+
+
+def connect(settings):
+    """Stand in for connection._connect: a resource (none here) and the settings' table."""
+
+    table = _client.tables.get(settings.table)
+    if table is None:
+        table = notes_table(settings.table, settings.user_index, settings.notebook_index, _client)
+
+    return None, table
+
+
+def install():
+    """Send every connection the handlers make to in-memory tables."""
+
+    import functions.connection as conn
+
+    conn._connect = connect
+    conn.reset()
+    _state["installed"] = True
+
+
+def installed():
+    return _state["installed"]
+
+
+_state = {"installed": False}
+
+
+def pytest_configure(config):
+    """Install when loaded as a pytest plugin, with -p tests.memorydb."""
+
+    install()
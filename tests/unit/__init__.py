@@ -5,6 +5,9 @@ import boto3
 import botocore
 import yaml
 
+from functions.settings import get_settings
+from tests import memorydb
+
 
 @pytest.fixture
 def config():
@@ -37,6 +40,10 @@ def dynamodb_table(monkeypatch, config):
     monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
     monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
 
+    # Share the handlers' in-memory table when run with -p tests.memorydb.
+    if memorydb.installed():
+        return memorydb.connect(get_settings())[1]
+
     conn = boto3.resource(
         "dynamodb", os.environ["AWS_DEFAULT_REGION"], endpoint_url="http://localhost:8000")
     table = os.environ["DYNAMODB_TABLE"]
@@ -0,0 +1,128 @@
+import os
+import time
+import json
+
+import yaml
+import pytest
+import boto3
+
+from functions.handlers.batch import create_batch
+from functions.handlers.batch import read_batch
+from functions.handlers.read import read
+from tests.unit import config
+from tests.unit import http_event
+
+
+# Module scoped variables for simple unit testing.
+test_globals = {
+    "user_id": "azrael",
+    "notebook": "system",
+    "text": "Batch handler test"
+}
+
+
+def test_create_batch_returns_valid_response_structure_when_valid_data(monkeypatch, http_event, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+
+    notes = [{"userId": test_globals["user_id"], "notebook": test_globals["notebook"],
+              "text": "{} {}".format(test_globals["text"], i)} for i in range(3)]
+    http_event["body"] = json.dumps(notes)
+    response = create_batch(http_event, {})
+    payload = json.loads(response["body"])
+
+    assert "isBase64Encoded" in response and response["isBase64Encoded"] == False
+    assert "statusCode" in response and response["statusCode"] == 201
+    assert "headers" in response
+    assert "body" in response
+
+    assert len(payload["results"]) == 3
+    for index, result in enumerate(payload["results"]):
+        assert result["index"] == index
+        assert result["statusCode"] == 201
+        assert result["item"]["text"] == notes[index]["text"]
+
+        http_event["pathParameters"]["id"] = result["item"]["noteId"]
+        found = json.loads(read(http_event, {})["body"])
+
+        assert found["noteId"] == result["item"]["noteId"]
+
+
+def test_create_batch_returns_status_code_207_when_some_notes_invalid(monkeypatch, http_event, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+
+    notes = [{"userId": test_globals["user_id"], "notebook": test_globals["notebook"],
+              "text": test_globals["text"]},
+             {"userId": test_globals["user_id"], "badProp": test_globals["text"]},
+             "not a note"]
+    http_event["body"] = json.dumps(notes)
+    response = create_batch(http_event, {})
+    payload = json.loads(response["body"])
+
+    assert "statusCode" in response and response["statusCode"] == 207
+    assert [result["statusCode"] for result in payload["results"]] == [201, 400, 400]
+
+
+def test_create_batch_returns_status_code_500_when_aws_region_not_set(monkeypatch, http_event, config):
+    monkeypatch.delenv("AWS_DEFAULT_REGION", raising=False)
+    monkeypatch.delenv("DYNAMODB_TABLE", raising=False)
+
+    response = create_batch(http_event, {})
+
+    assert "statusCode" in response and response["statusCode"] == 500
+
+
+def test_create_batch_returns_status_code_400_when_request_body_not_a_batch(monkeypatch, http_event, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+
+    response = create_batch(http_event, {})
+
+    assert "statusCode" in response and response["statusCode"] == 400
+
+    http_event["body"] = "[]"
+    response = create_batch(http_event, {})
+
+    assert "statusCode" in response and response["statusCode"] == 400
+
+    http_event["body"] = bytes("some bytes", "utf8")
+    response = create_batch(http_event, {})
+
+    assert "statusCode" in response and response["statusCode"] == 400
+
+
+def test_read_batch_returns_valid_response_structure_when_valid_data(monkeypatch, http_event, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+
+    notes = [{"userId": test_globals["user_id"], "notebook": test_globals["notebook"],
+              "text": "{} {}".format(test_globals["text"], i)} for i in range(2)]
+    http_event["body"] = json.dumps(notes)
+    created = json.loads(create_batch(http_event, {})["body"])["results"]
+    note_ids = [created[1]["item"]["noteId"], "missing_badid", created[0]["item"]["noteId"]]
+
+    http_event["queryStringParameters"] = {"ids": ",".join(note_ids)}
+    response = read_batch(http_event, {})
+    payload = json.loads(response["body"])
+
+    assert "isBase64Encoded" in response and response["isBase64Encoded"] == False
+    assert "statusCode" in response and response["statusCode"] == 200
+
+    assert [item.get("noteId") for item in payload["items"]] == [note_ids[0], None, note_ids[2]]
+    assert payload["missing"] == ["missing_badid"]
+    assert payload["unprocessed"] == []
+
+
+def test_read_batch_returns_status_code_400_when_ids_not_set(monkeypatch, http_event, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+
+    response = read_batch(http_event, {})
+
+    assert "statusCode" in response and response["statusCode"] == 400
+
+    http_event["queryStringParameters"] = {"ids": " , ,"}
+    response = read_batch(http_event, {})
+
+    assert "statusCode" in response and response["statusCode"] == 400
@@ -0,0 +1,71 @@
+import os
+import json
+import subprocess
+import sys
+
+import pytest
+import yaml
+
+
+# Cold start target: each handler module imports without pulling in boto3,
+# botocore, smalluuid or orjson. Import time depends on the machine, so its budget
+# in milliseconds (50 on Lambda) is only checked when set in the environment.
+IMPORT_BUDGET_MS = os.environ.get("COLDSTART_IMPORT_BUDGET_MS")
+DEFERRED_MODULES = ["boto3", "botocore", "smalluuid", "orjson"]
+
+ROOT = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, os.pardir)
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": elapsed, "modules": [m for m in {deferred} if m in sys.modules]}}))
+"""
+
+
+def entry_points():
+    """Collect the handler modules named in serverless.yml."""
+
+    with open(os.path.join(ROOT, "serverless.yml"), "r") as configfile:
+        cfg = yaml.load(configfile, Loader=yaml.BaseLoader)
+
+    modules = set()
+    for function in cfg["functions"].values():
+        modules.add(function["handler"].rsplit(".", 1)[0].replace("/", "."))
+
+    # The optional single entry point, commented out in serverless.yml.
+    modules.add("functions.handlers.router")
+
+    return sorted(modules)
+
+
+def measure_import(module):
+    """Import a module in a fresh interpreter and report what it cost."""
+
+    env = dict(os.environ)
+    env.pop("DYNAMODB_PREWARM", None)
+
+    out = subprocess.check_output(
+        [sys.executable, "-W", "ignore", "-c",
+         PROBE.format(module=module, deferred=DEFERRED_MODULES)],
+        cwd=ROOT, env=env)
+
+    return json.loads(out.decode("utf-8").strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("module", entry_points())
+def test_handler_import_defers_heavy_modules(module):
+    result = measure_import(module)
+
+    assert result["modules"] == []
+
+
+@pytest.mark.skipif(not IMPORT_BUDGET_MS, reason="COLDSTART_IMPORT_BUDGET_MS not set")
+@pytest.mark.parametrize("module", entry_points())
+def test_handler_import_within_budget(module):
+
+    # Take the best of a few runs to smooth over noisy neighbours.
+    best = min(measure_import(module)["ms"] for _ in range(3))
+
+    assert best < float(IMPORT_BUDGET_MS), "{} imported in {:.1f} ms".format(module, best)
@@ -96,3 +96,28 @@ def test_create_returns_status_code_400_when_required_props_not_set(monkeypatch,
     response = create(http_event, {})
     
     assert "statusCode" in response and response["statusCode"] == 400
+
+
+def test_create_returns_status_code_413_when_request_body_too_large(monkeypatch, http_event, config, mocker):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+
+    # Rejected before a connection is ever opened.
+    get_model = mocker.patch("functions.connection.get_model")
+
+    http_event["body"] = "{ \"userId\": \"azrael\", \"notebook\": \"system\", \"text\": \"" + "x" * 5 * 1024 * 1024 + "\" }"
+    response = create(http_event, {})
+
+    assert "statusCode" in response and response["statusCode"] == 413
+    assert not get_model.called
+
+
+def test_create_returns_status_code_400_when_props_wrong_type(monkeypatch, http_event, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+
+    http_event["body"] = "{ \"userId\": \"azrael\", \"notebook\": [\"system\"], \"text\": \"Create handler test\" }"
+    response = create(http_event, {})
+
+    assert "statusCode" in response and response["statusCode"] == 400
+    assert "'notebook'" in json.loads(response["body"])["error"]
@@ -0,0 +1,114 @@
+import os
+import time
+import json
+
+import yaml
+import pytest
+import boto3
+
+from functions.handlers.batch import create_batch
+from functions.handlers.purge import purge_by_user
+from functions.handlers.purge import purge_by_notebook
+from functions.handlers.search import search_by_user
+from tests.unit import config
+from tests.unit import http_event
+
+
+# Module scoped variables for simple unit testing.
+test_globals = {
+    "user_id": "purge-handler-user",
+    "notebook": "purge-handler-notebook",
+    "text": "Purge handler test"
+}
+
+
+class LambdaContext:
+    """Stands in for the Lambda context, with a fixed amount of time left."""
+
+    def __init__(self, remaining_ms):
+        self.remaining_ms = remaining_ms
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining_ms
+
+
+def create_notes(http_event, count):
+    http_event["body"] = json.dumps([
+        {"userId": test_globals["user_id"], "notebook": test_globals["notebook"],
+         "text": "{} {}".format(test_globals["text"], i)} for i in range(count)])
+    create_batch(http_event, {})
+
+
+def test_purge_by_user_returns_valid_response_structure_when_valid_data(monkeypatch, http_event, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+    monkeypatch.setenv("DYNAMODB_WRITE_CAPACITY", "1000")
+
+    create_notes(http_event, 3)
+
+    http_event["pathParameters"]["id"] = test_globals["user_id"]
+    response = purge_by_user(http_event, LambdaContext(30000))
+    payload = json.loads(response["body"])
+
+    assert "isBase64Encoded" in response and response["isBase64Encoded"] == False
+    assert "statusCode" in response and response["statusCode"] == 200
+
+    assert payload["deleted"] == 3
+    assert payload["complete"] == True
+    assert payload["cursor"] is None
+
+    assert json.loads(search_by_user(http_event, {})["body"]) == []
+
+
+def test_purge_by_notebook_returns_cursor_when_deadline_reached(monkeypatch, http_event, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+    monkeypatch.setenv("DYNAMODB_WRITE_CAPACITY", "1000")
+
+    create_notes(http_event, 2)
+
+    http_event["pathParameters"]["id"] = test_globals["notebook"]
+    response = purge_by_notebook(http_event, LambdaContext(100))
+    payload = json.loads(response["body"])
+
+    assert "statusCode" in response and response["statusCode"] == 202
+    assert payload["deleted"] == 0
+    assert payload["complete"] == False
+    assert payload["cursor"]
+
+    http_event["queryStringParameters"] = {"cursor": payload["cursor"]}
+    response = purge_by_notebook(http_event, LambdaContext(30000))
+    payload = json.loads(response["body"])
+
+    assert "statusCode" in response and response["statusCode"] == 200
+    assert payload["deleted"] == 2 and payload["complete"] == True
+
+
+def test_purge_by_user_returns_status_code_400_when_cursor_not_valid(monkeypatch, http_event, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+
+    http_event["pathParameters"]["id"] = test_globals["user_id"]
+    http_event["queryStringParameters"] = {"cursor": "tampered.cursor.value"}
+    response = purge_by_user(http_event, {})
+
+    assert "statusCode" in response and response["statusCode"] == 400
+
+
+def test_purge_by_user_returns_status_code_400_when_request_id_not_set(monkeypatch, http_event, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+
+    http_event["pathParameters"]["id"] = None
+    response = purge_by_user(http_event, {})
+
+    assert "statusCode" in response and response["statusCode"] == 400
+
+
+def test_purge_by_notebook_returns_status_code_500_when_aws_region_not_set(monkeypatch, http_event, config):
+    monkeypatch.delenv("AWS_DEFAULT_REGION", raising=False)
+    monkeypatch.delenv("DYNAMODB_TABLE", raising=False)
+
+    response = purge_by_notebook(http_event, {})
+
+    assert "statusCode" in response and response["statusCode"] == 500
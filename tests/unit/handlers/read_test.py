@@ -114,3 +114,48 @@ def test_read_returns_status_code_400_when_request_id_not_set(monkeypatch, http_
     response = read(http_event, {})
 
     assert "statusCode" in response and response["statusCode"] == 400
+
+
+def test_read_returns_only_fields_asked_for(monkeypatch, http_event, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+
+    http_event["pathParameters"]["id"] = test_globals["note_id"]
+    http_event["queryStringParameters"] = {"fields": "notebook,updatedAt"}
+    response = read(http_event, {})
+    payload = json.loads(response["body"])
+
+    assert response["statusCode"] == 200
+    assert payload == {"noteId": test_globals["note_id"], "notebook": test_globals["notebook"],
+                       "updatedAt": test_globals["updated_at"]}
+
+    http_event["queryStringParameters"] = {"fields": "contentHash"}
+    response = read(http_event, {})
+
+    assert response["statusCode"] == 400
+
+
+def test_read_returns_status_code_304_when_etag_matches(monkeypatch, http_event, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+
+    created = json.loads(create(http_event, {})["body"])
+
+    http_event["pathParameters"]["id"] = created["noteId"]
+    response = read(http_event, {})
+    etag = response["headers"]["ETag"]
+
+    assert response["statusCode"] == 200
+    assert etag == '"{}-{}"'.format(created["noteId"], created["updatedAt"])
+
+    http_event["headers"] = {"if-none-match": etag}
+    response = read(http_event, {})
+
+    assert response["statusCode"] == 304
+    assert response["body"] == ""
+
+    http_event["headers"] = {"If-None-Match": '"{}-0"'.format(created["noteId"])}
+    response = read(http_event, {})
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"])["noteId"] == created["noteId"]
@@ -0,0 +1,65 @@
+import os
+import json
+
+import yaml
+import pytest
+
+from functions.handlers.router import route, ROUTES
+from tests.unit import config
+from tests.unit import http_event
+
+
+ROOT = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, os.pardir)
+
+
+def test_router_covers_every_route_in_serverless_config():
+    with open(os.path.join(ROOT, "serverless.yml"), "r") as configfile:
+        cfg = yaml.load(configfile, Loader=yaml.BaseLoader)
+
+    for function in cfg["functions"].values():
+        module, name = function["handler"].rsplit(".", 1)
+
+        for event in function["events"]:
+            resource = "/" + event["http"]["path"]
+            handler = ROUTES[resource][event["http"]["method"].upper()]
+
+            assert handler.__module__ == module.replace("/", ".")
+            assert handler.__name__ == name
+
+
+def test_router_returns_status_code_404_when_resource_unknown(http_event):
+    http_event["resource"] = "/notebooks"
+
+    response = route(http_event, {})
+
+    assert response["statusCode"] == 404
+
+
+def test_router_returns_status_code_405_when_method_not_allowed(http_event):
+    http_event["resource"] = "/notes/{id}"
+    http_event["httpMethod"] = "POST"
+
+    response = route(http_event, {})
+
+    assert response["statusCode"] == 405
+    assert response["headers"]["Allow"] == "DELETE, GET, PATCH, PUT"
+
+
+def test_router_dispatches_to_handlers_when_route_known(monkeypatch, http_event, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+
+    http_event["resource"] = "/notes"
+    http_event["httpMethod"] = "POST"
+    response = route(http_event, {})
+    created = json.loads(response["body"])
+
+    assert response["statusCode"] == 201
+
+    http_event["resource"] = "/notes/{id}"
+    http_event["httpMethod"] = "GET"
+    http_event["pathParameters"]["id"] = created["noteId"]
+    response = route(http_event, {})
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"]) == created
@@ -1,3 +1,5 @@
+import base64
+import gzip
 import os
 import time
 import json
@@ -6,6 +8,7 @@ import yaml
 import pytest
 import boto3
 
+from functions.handlers.create import create
 from functions.handlers.search import search_by_user
 from functions.handlers.search import search_by_notebook
 from tests.unit import config
@@ -191,3 +194,117 @@ def test_search_by_notebook_returns_status_code_400_when_request_id_not_set(monk
     response = search_by_notebook(http_event, {})
 
     assert "statusCode" in response and response["statusCode"] == 400
+
+
+def test_search_by_user_returns_next_cursor_when_more_items(monkeypatch, http_event, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+
+    create(http_event, {})
+    create(http_event, {})
+
+    http_event["pathParameters"]["id"] = test_globals["user_id"]
+    http_event["queryStringParameters"] = {"limit": "1"}
+    response = search_by_user(http_event, {})
+    first = json.loads(response["body"])
+
+    assert response["statusCode"] == 200
+    assert len(first) == 1
+    assert "X-Next-Cursor" in response["headers"]
+
+    http_event["queryStringParameters"] = {
+        "limit": "1", "cursor": response["headers"]["X-Next-Cursor"]}
+    response = search_by_user(http_event, {})
+    second = json.loads(response["body"])
+
+    assert response["statusCode"] == 200
+    assert len(second) == 1 and second[0]["noteId"] != first[0]["noteId"]
+
+
+def test_search_by_notebook_returns_status_code_400_when_paging_params_not_valid(monkeypatch, http_event, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+
+    http_event["pathParameters"]["id"] = test_globals["notebook"]
+    http_event["queryStringParameters"] = {"limit": "not a number"}
+    response = search_by_notebook(http_event, {})
+
+    assert "statusCode" in response and response["statusCode"] == 400
+
+    http_event["queryStringParameters"] = {"cursor": "tampered.cursor.value"}
+    response = search_by_notebook(http_event, {})
+
+    assert "statusCode" in response and response["statusCode"] == 400
+
+    # A cursor issued for a user's notes can't be replayed against a notebook.
+    http_event["pathParameters"]["id"] = test_globals["user_id"]
+    http_event["queryStringParameters"] = {"limit": "1"}
+    token = search_by_user(http_event, {})["headers"]["X-Next-Cursor"]
+
+    http_event["pathParameters"]["id"] = test_globals["notebook"]
+    http_event["queryStringParameters"] = {"cursor": token}
+    response = search_by_notebook(http_event, {})
+
+    assert "statusCode" in response and response["statusCode"] == 400
+
+
+def test_search_by_user_returns_only_fields_asked_for(monkeypatch, http_event, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+
+    http_event["pathParameters"]["id"] = test_globals["user_id"]
+    http_event["queryStringParameters"] = {"fields": "noteId,notebook"}
+    response = search_by_user(http_event, {})
+    payload = json.loads(response["body"])
+
+    assert response["statusCode"] == 200
+    assert payload and all(set(item) == {"noteId", "notebook"} for item in payload)
+
+    http_event["queryStringParameters"] = {"fields": "createdAt"}
+    response = search_by_user(http_event, {})
+
+    assert response["statusCode"] == 400
+
+
+def test_search_by_notebook_returns_status_code_304_when_etag_matches(monkeypatch, http_event, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+
+    http_event["pathParameters"]["id"] = "etag-notebook"
+    http_event["body"] = json.dumps({"userId": test_globals["user_id"], "notebook": "etag-notebook",
+                                     "text": test_globals["text"]})
+    create(http_event, {})
+
+    response = search_by_notebook(http_event, {})
+    etag = response["headers"]["ETag"]
+    count = len(json.loads(response["body"]))
+
+    http_event["headers"] = {"If-None-Match": etag}
+    response = search_by_notebook(http_event, {})
+
+    assert response["statusCode"] == 304
+    assert response["body"] == ""
+
+    create(http_event, {})
+    response = search_by_notebook(http_event, {})
+
+    assert response["statusCode"] == 200
+    assert response["headers"]["ETag"] != etag
+    assert len(json.loads(response["body"])) == count + 1
+
+
+def test_search_by_user_returns_compressed_body_when_accepted(monkeypatch, http_event, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+    monkeypatch.setattr("functions.beacon.COMPRESSION_MIN_BYTES", 1)
+
+    http_event["pathParameters"]["id"] = test_globals["user_id"]
+    plain = search_by_user(http_event, {})
+
+    http_event["headers"] = {"Accept": "application/json", "Accept-Encoding": "gzip, deflate"}
+    response = search_by_user(http_event, {})
+
+    assert response["statusCode"] == 200
+    assert response["isBase64Encoded"] == True
+    assert response["headers"]["Content-Encoding"] == "gzip"
+    assert gzip.decompress(base64.b64decode(response["body"])).decode("utf-8") == plain["body"]
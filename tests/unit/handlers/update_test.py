@@ -7,7 +7,7 @@ import pytest
 import boto3
 
 from functions.handlers.create import create
-from functions.handlers.update import update
+from functions.handlers.update import patch, update
 from tests.unit import config
 from tests.unit import http_event
 
@@ -38,6 +38,9 @@ def test_update_returns_valid_response_structure_when_valid_data(monkeypatch, ht
     test_globals["created_at"] = created["createdAt"]
     test_globals["updated_at"] = created["updatedAt"]
 
+    # Timestamps are in milliseconds; make sure the update lands in a later one.
+    time.sleep(0.002)
+
     data = {"userId": test_globals["user_id"], "notebook": test_globals["notebook"],
             "text": "Create handler test updated"}
 
@@ -63,6 +66,42 @@ def test_update_returns_valid_response_structure_when_valid_data(monkeypatch, ht
     test_globals["updated_at"] = payload["updatedAt"]
 
 
+def test_patch_returns_only_changed_properties_when_valid_data(monkeypatch, http_event, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+
+    http_event["pathParameters"]["id"] = test_globals["note_id"]
+    http_event["body"] = json.dumps({"text": "Patch handler test"})
+    response = patch(http_event, {})
+    payload = json.loads(response["body"])
+
+    assert response["statusCode"] == 200
+    assert set(payload) == {"noteId", "text", "updatedAt"}
+    assert payload["text"] == "Patch handler test"
+
+    http_event["queryStringParameters"] = {"returnValues": "NONE"}
+    response = patch(http_event, {})
+
+    assert json.loads(response["body"]) == {"noteId": test_globals["note_id"]}
+
+
+def test_patch_returns_status_code_400_when_request_not_valid(monkeypatch, http_event, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+
+    http_event["pathParameters"]["id"] = test_globals["note_id"]
+    http_event["body"] = json.dumps({"userId": "azrael"})
+    response = patch(http_event, {})
+
+    assert response["statusCode"] == 400
+
+    http_event["body"] = json.dumps({"text": "Never"})
+    http_event["queryStringParameters"] = {"returnValues": "ALL_OLD"}
+    response = patch(http_event, {})
+
+    assert response["statusCode"] == 400
+
+
 def test_update_returns_valid_response_structure_when_invalid_data(monkeypatch, http_event, config):
     monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
     monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
@@ -1,10 +1,13 @@
+import base64
+import gzip
 import os
 import json
+import zlib
 
 import yaml
 import pytest
 
-from functions.beacon import respond
+from functions.beacon import respond, respond_conditional, etag_for_item, choose_encoding
 
 
 def test_beacon_responds_with_valid_payload_when_valid_data(monkeypatch):
@@ -27,3 +30,76 @@ def test_beacon_responds_with_valid_payload_when_invalid_data(monkeypatch):
         respond(200, bytes("bad dictionary", "utf-8"))
         
     assert "is not JSON serializable" in str(exc.value)
+
+
+def test_beacon_etag_for_item_uses_id_and_update_time():
+    assert etag_for_item({"noteId": "abc", "updatedAt": 1536850636242}) == '"abc-1536850636242"'
+    assert etag_for_item({}) is None
+
+
+def test_beacon_responds_with_etag_when_client_copy_stale():
+    res = respond_conditional('"stale"', 200, [{"noteId": "abc"}], headers={"X-Next-Cursor": "c"})
+
+    assert res["statusCode"] == 200
+    assert res["headers"]["ETag"].startswith('"') and res["headers"]["ETag"] != '"stale"'
+    assert res["headers"]["X-Next-Cursor"] == "c"
+    assert json.loads(res["body"]) == [{"noteId": "abc"}]
+
+
+def test_beacon_responds_with_304_when_client_copy_current():
+    etag = respond_conditional(None, 200, [{"noteId": "abc"}])["headers"]["ETag"]
+
+    for header in [etag, "W/" + etag, '"other", ' + etag, "*"]:
+        res = respond_conditional(header, 200, [{"noteId": "abc"}])
+
+        assert res["statusCode"] == 304
+        assert res["body"] == ""
+        assert res["headers"]["ETag"] == etag
+
+
+def test_beacon_chooses_best_accepted_encoding():
+    assert choose_encoding(None) is None
+    assert choose_encoding("gzip, deflate, br") == "gzip"
+    assert choose_encoding("deflate;q=0.5, gzip;q=0") == "deflate"
+    assert choose_encoding("br, identity") is None
+    assert choose_encoding("*") == "gzip"
+
+
+def test_beacon_compresses_large_bodies_when_accepted(monkeypatch):
+    monkeypatch.setattr("functions.beacon.COMPRESSION_MIN_BYTES", 100)
+    payload = [{"noteId": str(i), "text": "Compress me"} for i in range(50)]
+
+    res = respond(200, payload, accept_encoding="gzip")
+
+    assert res["isBase64Encoded"] == True
+    assert res["headers"]["Content-Encoding"] == "gzip"
+    assert res["headers"]["Vary"] == "Accept-Encoding"
+    assert json.loads(gzip.decompress(base64.b64decode(res["body"]))) == payload
+
+    res = respond(200, payload, accept_encoding="deflate")
+
+    assert json.loads(zlib.decompress(base64.b64decode(res["body"]))) == payload
+
+
+def test_beacon_leaves_small_or_unaccepted_bodies_alone(monkeypatch):
+    monkeypatch.setattr("functions.beacon.COMPRESSION_MIN_BYTES", 100)
+
+    res = respond(200, {"test": "dictionary"}, accept_encoding="gzip")
+
+    assert res["isBase64Encoded"] == False
+    assert "Content-Encoding" not in res["headers"]
+
+    res = respond_conditional(None, 200, [{"text": "x" * 200}], accept_encoding="br")
+
+    assert res["isBase64Encoded"] == False
+    assert res["headers"]["Vary"] == "Accept-Encoding"
+
+
+def test_beacon_weakens_etag_when_compressed(monkeypatch):
+    monkeypatch.setattr("functions.beacon.COMPRESSION_MIN_BYTES", 100)
+
+    res = respond_conditional(None, 200, [{"text": "x" * 200}], accept_encoding="gzip")
+    etag = res["headers"]["ETag"]
+
+    assert etag.startswith('W/"')
+    assert respond_conditional(etag, 200, [{"text": "x" * 200}])["statusCode"] == 304
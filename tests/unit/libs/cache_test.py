@@ -0,0 +1,74 @@
+import time
+
+import pytest
+
+import functions.metrics as metrics
+from functions.cache import LRUCache, MISSING
+
+
+def test_cache_returns_value_and_counts_hits_and_misses():
+    cache = LRUCache(maxsize=2, ttl=60)
+
+    assert cache.get("a") is MISSING
+
+    cache.put("a", {"noteId": "a"})
+
+    assert cache.get("a") == {"noteId": "a"}
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1, "evictions": 0}
+
+
+def test_cache_evicts_least_recently_used_when_full():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.put("a", {"noteId": "a"})
+    cache.put("b", {"noteId": "b"})
+    cache.get("a")
+    cache.put("c", {"noteId": "c"})
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") != MISSING and cache.get("c") != MISSING
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_expires_entries_after_ttl():
+    cache = LRUCache(maxsize=2, ttl=0.05, negative_ttl=0.01)
+    cache.put("a", {"noteId": "a"})
+    cache.put("missing", {})
+
+    assert cache.get("missing") == {}
+
+    time.sleep(0.02)
+
+    assert cache.get("missing") is MISSING
+    assert cache.get("a") == {"noteId": "a"}
+
+    time.sleep(0.05)
+
+    assert cache.get("a") is MISSING
+
+
+def test_cache_invalidates_entries():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.put("a", {"noteId": "a"})
+    cache.invalidate("a")
+    cache.invalidate("never cached")
+
+    assert cache.get("a") is MISSING
+
+
+def test_cache_counts_toward_invocation_metrics(monkeypatch):
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    cache = LRUCache(maxsize=1, ttl=60)
+
+    @metrics.instrumented
+    def handler(event, context):
+        cache.get("a")
+        cache.put("a", {"noteId": "a"})
+        cache.get("a")
+        cache.put("b", {"noteId": "b"})
+
+    handler({}, {})
+    counts = metrics.last_invocation()["counts"]
+
+    assert counts["CacheHits"] == 1
+    assert counts["CacheMisses"] == 1
+    assert counts["CacheEvictions"] == 1
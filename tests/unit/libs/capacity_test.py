@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+import functions.metrics as metrics
+from functions.capacity import CapacityLedger, shares
+
+
+def test_capacity_recorded_by_operation_index_and_user():
+    ledger = CapacityLedger()
+
+    ledger.record("save", {
+        "TableName": "notes", "CapacityUnits": 3.0, "Table": {"CapacityUnits": 1.0},
+        "GlobalSecondaryIndexes": {"user-index": {"CapacityUnits": 1.0},
+                                   "notebook-index": {"CapacityUnits": 1.0}}}, "azrael")
+    ledger.record("save", {"TableName": "notes", "CapacityUnits": 1.0,
+                           "Table": {"CapacityUnits": 1.0}}, "azrael")
+
+    totals = ledger.snapshot()
+
+    assert totals["operations"] == {"save": 4.0}
+    assert totals["indexes"] == {"notes": 2.0, "user-index": 1.0, "notebook-index": 1.0}
+    assert totals["users"] == {"azrael": 4.0}
+
+
+def test_capacity_batch_split_across_users():
+    ledger = CapacityLedger()
+
+    ledger.record("save_batch", [{"TableName": "notes", "CapacityUnits": 9.0}],
+                  shares(["azrael", "azrael", "gargamel"]))
+
+    assert ledger.snapshot()["users"] == pytest.approx({"azrael": 6.0, "gargamel": 3.0})
+    assert ledger.top_users(1) == [("azrael", pytest.approx(6.0))]
+
+
+def test_capacity_keeps_only_heaviest_users():
+    ledger = CapacityLedger(max_users=2)
+
+    for units, user_id in [(3.0, "azrael"), (1.0, "gargamel"), (2.0, "papa")]:
+        ledger.record("save", {"TableName": "notes", "CapacityUnits": units}, user_id)
+    assert len(ledger.snapshot()["users"]) == 3
+
+    ledger.record("save", {"TableName": "notes", "CapacityUnits": 0.5}, "smurfette")
+
+    assert ledger.snapshot()["users"] == {"azrael": 3.0, "papa": 2.0}
+    assert ledger.snapshot()["operations"] == {"save": 6.5}
+
+
+def test_capacity_ignores_missing_consumed_capacity():
+    ledger = CapacityLedger()
+
+    ledger.record("read", None, "azrael")
+
+    assert ledger.snapshot() == {"operations": {}, "indexes": {}, "users": {}}
+
+
+def test_capacity_emitted_with_invocation_metrics(monkeypatch, capsys):
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    ledger = CapacityLedger()
+
+    @metrics.instrumented
+    def handler(event, context):
+        ledger.record("read", {"TableName": "notes", "CapacityUnits": 0.5,
+                               "Table": {"CapacityUnits": 0.5}}, "azrael")
+        return {"statusCode": 200, "body": "{}"}
+
+    handler({}, None)
+    handler({}, None)
+
+    first, second = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+    assert first["CapacityUnits"] == 0.5
+    assert first["OperationCapacity"] == {"read": 0.5}
+    assert first["IndexCapacity"] == {"notes": 0.5}
+    assert second["UserCapacity"] == {"azrael": 0.5}
+    assert ledger.snapshot()["users"] == {"azrael": 1.0}
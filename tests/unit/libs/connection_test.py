@@ -0,0 +1,64 @@
+import pytest
+
+import functions.connection as conn
+import functions.settings as settings
+from functions.models.note import NoteModel
+from tests.unit import config
+
+
+@pytest.fixture
+def local_settings(monkeypatch, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+    monkeypatch.setenv("DYNAMODB_HOST", config["aws"]["dynamodb"]["localHost"])
+
+    return settings.get_settings()
+
+
+def test_connection_reuses_table_and_model_when_settings_unchanged(local_settings):
+    conn.reset()
+
+    first = conn.get_model(local_settings)
+    second = conn.get_model(local_settings)
+
+    assert isinstance(first, NoteModel)
+    assert first is second
+    assert conn.get_table(local_settings) is first.table
+
+
+def test_connection_rebuilds_when_settings_changed(local_settings):
+    conn.reset()
+
+    first = conn.get_model(local_settings)
+    second = conn.get_model(local_settings._replace(table=local_settings.table + "-Other"))
+
+    assert first is not second
+    assert second.table.name == local_settings.table + "-Other"
+
+
+def test_connection_rebuilds_after_reset(local_settings):
+    first = conn.get_model(local_settings)
+    conn.reset()
+    second = conn.get_model(local_settings)
+
+    assert first is not second
+
+
+def test_connection_passes_index_names_to_model(local_settings):
+    conn.reset()
+
+    model = conn.get_model(local_settings._replace(
+        user_index="User-Test-Index", notebook_index="Notebook-Test-Index"))
+
+    assert model.user_index == "User-Test-Index"
+    assert model.notebook_index == "Notebook-Test-Index"
+
+
+def test_connection_client_profile_built_from_settings(local_settings):
+    client_config = conn.client_config(local_settings._replace(
+        max_attempts=5, connect_timeout=0.5, read_timeout=1.5, max_pool_connections=16))
+
+    # botocore 1.12 only knows legacy retries, counted after the first attempt.
+    assert client_config.retries == {"max_attempts": 4}
+    assert (client_config.connect_timeout, client_config.read_timeout) == (0.5, 1.5)
+    assert client_config.max_pool_connections == 16
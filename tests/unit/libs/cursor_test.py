@@ -0,0 +1,36 @@
+import pytest
+
+import functions.cursor as cursor
+import functions.exceptions as ex
+
+
+SECRET = "unit-test-cursor-secret-of-decent-length"
+
+
+def test_cursor_round_trips_last_evaluated_key():
+    last_key = {"noteId": "abc", "userId": "azrael"}
+    token = cursor.encode(last_key, "user:azrael", SECRET)
+
+    assert isinstance(token, str)
+    assert cursor.decode(token, "user:azrael", SECRET) == last_key
+
+
+def test_cursor_raises_exception_when_tampered():
+    token = cursor.encode({"noteId": "abc"}, "user:azrael", SECRET)
+    head, body, sig = token.split(".")
+
+    with pytest.raises(ex.RequestCursorInvalidException):
+        cursor.decode(".".join([head, body, sig[::-1]]), "user:azrael", SECRET)
+
+    with pytest.raises(ex.RequestCursorInvalidException):
+        cursor.decode(token, "user:azrael", SECRET[::-1])
+
+    with pytest.raises(ex.RequestCursorInvalidException):
+        cursor.decode("not a cursor", "user:azrael", SECRET)
+
+
+def test_cursor_raises_exception_when_used_for_another_search():
+    token = cursor.encode({"noteId": "abc"}, "user:azrael", SECRET)
+
+    with pytest.raises(ex.RequestCursorInvalidException):
+        cursor.decode(token, "user:someone", SECRET)
@@ -1,3 +1,6 @@
+import io
+import json
+import queue
 import logging
 
 import pytest
@@ -17,3 +20,94 @@ def test_logger_returns_valid_named_logger(monkeypatch):
     assert logger.hasHandlers() == True
     
     assert logger.isEnabledFor(logging.INFO) == True
+
+
+def test_logger_configured_once_when_set_up_repeatedly():
+    first = log.setup_custom_logger("notes")
+    second = log.setup_custom_logger("notes")
+
+    ours = [handler for handler in second.handlers if isinstance(handler.formatter, log.JsonFormatter)]
+
+    assert second is first
+    assert len(ours) == 1
+    assert second.propagate == False
+
+
+def test_json_formatter_emits_fields_and_truncates_text():
+    text = "x" * (log.TEXT_PREVIEW_CHARS + 10)
+    record = logging.makeLogRecord({
+        "name": "notes", "levelno": logging.INFO, "levelname": "INFO",
+        "msg": "Note created: %s", "args": ("abc",),
+        "note": {"noteId": "abc", "text": text}})
+
+    entry = json.loads(log.JsonFormatter().format(record))
+
+    assert entry["message"] == "Note created: abc"
+    assert entry["level"] == "INFO" and entry["logger"] == "notes"
+    assert entry["note"]["noteId"] == "abc"
+    assert entry["note"]["text"] == "x" * log.TEXT_PREVIEW_CHARS + "...[{} chars]".format(len(text))
+
+
+def test_json_formatter_drops_text_when_preview_off(monkeypatch):
+    monkeypatch.setattr(log, "TEXT_PREVIEW_CHARS", 0)
+
+    assert log.redact([{"text": "secret"}]) == [{"text": "[6 chars]"}]
+
+
+def test_sampling_filter_samples_only_given_levels():
+    rates = log.parse_sample_rates("info=0, DEBUG=1")
+    sampler = log.SamplingFilter(rates)
+
+    assert rates == {logging.INFO: 0.0, logging.DEBUG: 1.0}
+    assert sampler.filter(logging.makeLogRecord({"levelno": logging.INFO})) == False
+    assert sampler.filter(logging.makeLogRecord({"levelno": logging.DEBUG})) == True
+    assert sampler.filter(logging.makeLogRecord({"levelno": logging.ERROR})) == True
+
+
+def test_queue_handler_drops_and_counts_records_when_full():
+    handler = log.DroppingQueueHandler(queue.Queue(1))
+
+    for _ in range(3):
+        handler.handle(logging.makeLogRecord({"msg": "chatty"}))
+
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 2
+
+
+def test_queued_records_written_and_drops_reported_by_flush(monkeypatch, mocker):
+    monkeypatch.setattr(log, "_state", {"handler": None, "listener": None, "output": None, "reported": 0})
+
+    stream = io.StringIO()
+    output = logging.StreamHandler(stream)
+    output.setFormatter(log.JsonFormatter())
+
+    handler = log._start_listener(output)
+
+    # A record the listener can't handle mustn't stop it.
+    output.handle = mocker.Mock(side_effect=ValueError("bad record"))
+    handler.handle(logging.makeLogRecord({"msg": "Bad record"}))
+    log.flush()
+
+    del output.handle
+    handler.dropped = 2
+    handler.handle(logging.makeLogRecord({
+        "name": "notes", "levelno": logging.INFO, "levelname": "INFO",
+        "msg": "Note found: %s", "args": ("abc",)}))
+    log.flush()
+
+    lines = [json.loads(line)["message"] for line in stream.getvalue().splitlines()]
+
+    assert lines == ["Note found: abc", "Log queue full, dropped records: 2"]
+
+
+def test_flushed_handler_flushes_even_when_it_raises(mocker):
+    flush = mocker.patch.object(log, "flush")
+
+    @log.flushed
+    def handler(event, context):
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        handler({}, {})
+
+    assert flush.called
@@ -0,0 +1,139 @@
+from decimal import Decimal
+
+import botocore.exceptions
+import botocore.session
+import pytest
+from boto3.dynamodb.conditions import Key
+
+from tests.memorydb import MemoryTable, Index, notes_table
+
+
+@pytest.fixture
+def table():
+    table = notes_table("Notes", "User-Index", "Notebook-Index")
+    for number in range(5):
+        table.put_item(Item={"noteId": "note-{}".format(number), "userId": "azrael",
+                             "notebook": "system", "text": "Note {}".format(number), "createdAt": number})
+    return table
+
+
+def test_memorydb_stores_numbers_as_decimals_and_refuses_floats(table):
+    item = table.get_item(Key={"noteId": "note-1"})["Item"]
+
+    assert item["createdAt"] == Decimal(1)
+    with pytest.raises(TypeError):
+        table.put_item(Item={"noteId": "float", "createdAt": 1.5})
+
+
+def test_memorydb_update_honours_condition_and_return_values(table):
+    updated = table.update_item(
+        Key={"noteId": "note-1"},
+        UpdateExpression="SET #note_text = :text, createdAt = createdAt + :one REMOVE notebook",
+        ExpressionAttributeNames={"#note_text": "text"},
+        ExpressionAttributeValues={":text": "Changed", ":one": 1},
+        ConditionExpression="attribute_exists(noteId)",
+        ReturnValues="ALL_NEW")["Attributes"]
+
+    assert updated["text"] == "Changed" and updated["createdAt"] == Decimal(2)
+    assert "notebook" not in updated
+
+    with pytest.raises(botocore.exceptions.ClientError) as raised:
+        table.update_item(Key={"noteId": "missing"}, UpdateExpression="SET #note_text = :text",
+                          ExpressionAttributeNames={"#note_text": "text"},
+                          ExpressionAttributeValues={":text": "Never"},
+                          ConditionExpression="attribute_exists(noteId)")
+
+    assert raised.value.response["Error"]["Code"] == "ConditionalCheckFailedException"
+    assert "missing" not in table.items
+
+
+def test_memorydb_refuses_parameters_botocore_does_not_know(table):
+    with pytest.raises(botocore.exceptions.ParamValidationError):
+        table.put_item(Item={"noteId": "note-1"}, NotAParameter="ALL_OLD")
+
+
+def test_memorydb_condition_failure_returns_old_item_when_asked(table):
+    if "ReturnValuesOnConditionCheckFailure" not in botocore.session.get_session().get_service_model(
+            "dynamodb").operation_model("PutItem").input_shape.members:
+        pytest.skip("installed botocore predates ReturnValuesOnConditionCheckFailure")
+
+    with pytest.raises(botocore.exceptions.ClientError) as raised:
+        table.put_item(Item={"noteId": "note-1"}, ConditionExpression="attribute_not_exists(noteId)",
+                       ReturnValuesOnConditionCheckFailure="ALL_OLD")
+
+    assert raised.value.response["Item"]["text"] == {"S": "Note 1"}
+
+
+def test_memorydb_query_pages_through_index_in_key_order(table):
+    table.put_item(Item={"noteId": "note-x", "userId": "gargamel", "notebook": "system", "text": "Other"})
+
+    first = table.query(IndexName="User-Index", KeyConditionExpression=Key("userId").eq("azrael"), Limit=3)
+    rest = table.query(IndexName="User-Index", KeyConditionExpression=Key("userId").eq("azrael"),
+                       ExclusiveStartKey=first["LastEvaluatedKey"])
+    backwards = table.query(IndexName="User-Index", KeyConditionExpression=Key("userId").eq("azrael"),
+                            ScanIndexForward=False, Limit=2)
+
+    assert [item["noteId"] for item in first["Items"]] == ["note-0", "note-1", "note-2"]
+    assert [item["noteId"] for item in rest["Items"]] == ["note-3", "note-4"]
+    assert "LastEvaluatedKey" not in rest
+    assert [item["noteId"] for item in backwards["Items"]] == ["note-4", "note-3"]
+
+    # The index only projects keys, text and notebook.
+    assert "createdAt" not in first["Items"][0]
+
+
+def test_memorydb_query_range_conditions(table):
+    def note_ids(condition):
+        items = table.query(IndexName="User-Index", KeyConditionExpression=condition)["Items"]
+        return [item["noteId"] for item in items]
+
+    user = Key("userId").eq("azrael")
+
+    assert note_ids(user & Key("noteId").between("note-1", "note-3")) == ["note-1", "note-2", "note-3"]
+    assert note_ids(user & Key("noteId").gt("note-3")) == ["note-4"]
+    assert note_ids(user & Key("noteId").begins_with("note-2")) == ["note-2"]
+
+
+def test_memorydb_query_refuses_attributes_index_does_not_project(table):
+    with pytest.raises(botocore.exceptions.ClientError) as raised:
+        table.query(IndexName="User-Index", KeyConditionExpression=Key("userId").eq("azrael"),
+                    ProjectionExpression="noteId, createdAt")
+
+    assert raised.value.response["Error"]["Code"] == "ValidationException"
+
+
+def test_memorydb_batches_go_through_client(table):
+    client = table.meta.client
+    client.batch_write_item(RequestItems={"Notes": [
+        {"PutRequest": {"Item": {"noteId": "batch-1", "userId": "azrael", "notebook": "batch", "text": "B"}}},
+        {"DeleteRequest": {"Key": {"noteId": "note-0"}}}]})
+
+    found = client.batch_get_item(RequestItems={"Notes": {"Keys": [{"noteId": "batch-1"}, {"noteId": "note-0"}]}})
+
+    assert [item["noteId"] for item in found["Responses"]["Notes"]] == ["batch-1"]
+    with pytest.raises(botocore.exceptions.ClientError):
+        client.batch_get_item(RequestItems={"Notes": {"Keys": [{"noteId": "a"}, {"noteId": "a"}]}})
+
+
+def test_memorydb_consumed_capacity_counts_index_writes(table):
+    put = table.put_item(Item={"noteId": "sized", "userId": "azrael", "notebook": "system",
+                               "text": "x" * 3000}, ReturnConsumedCapacity="INDEXES")["ConsumedCapacity"]
+    read = table.get_item(Key={"noteId": "sized"}, ConsistentRead=True,
+                          ReturnConsumedCapacity="TOTAL")["ConsumedCapacity"]
+
+    assert put["Table"]["CapacityUnits"] == 3.0
+    assert put["GlobalSecondaryIndexes"] == {"User-Index": {"CapacityUnits": 3.0, "WriteCapacityUnits": 3.0},
+                                             "Notebook-Index": {"CapacityUnits": 3.0, "WriteCapacityUnits": 3.0}}
+    assert put["CapacityUnits"] == 9.0
+    assert read == {"TableName": "Notes", "CapacityUnits": 1.0, "ReadCapacityUnits": 1.0}
+    assert table.consumed["User-Index"]["Write"] >= 3.0
+
+
+def test_memorydb_sparse_index_skips_items_without_its_key():
+    table = MemoryTable("Sparse", "noteId", [Index("Flagged-Index", "flag", "noteId")])
+    table.put_item(Item={"noteId": "a", "flag": "yes"})
+    table.put_item(Item={"noteId": "b"})
+
+    items = table.query(IndexName="Flagged-Index", KeyConditionExpression=Key("flag").eq("yes"))["Items"]
+
+    assert items == [{"noteId": "a", "flag": "yes"}]
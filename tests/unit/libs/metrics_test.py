@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+import functions.metrics as metrics
+import functions.validator as val
+from functions.beacon import respond
+from tests.unit import http_event
+
+
+@metrics.instrumented
+def handler(event, context):
+    note_id = val.check_id(event)
+    metrics.count("Items", 1)
+
+    with metrics.phase("DynamoDB"):
+        item = {"noteId": note_id}
+
+    return respond(200, item)
+
+
+class LambdaContext:
+    aws_request_id = "c6af9ac6-7b61-11e6-9a41-93e812345678"
+
+
+def test_metrics_emits_nothing_when_disabled(monkeypatch, http_event, capsys):
+    monkeypatch.setattr(metrics, "ENABLED", False)
+    http_event["pathParameters"]["id"] = "abc"
+
+    assert metrics.phase("DynamoDB") is metrics._NO_PHASE
+    assert handler(http_event, LambdaContext())["statusCode"] == 200
+    assert capsys.readouterr().out == ""
+
+
+def test_metrics_emits_embedded_metric_format_when_enabled(monkeypatch, http_event, capsys):
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    monkeypatch.setitem(metrics._state, "cold", True)
+    http_event["pathParameters"]["id"] = "abc"
+
+    response = handler(http_event, LambdaContext())
+    handler(http_event, LambdaContext())
+
+    first, second = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    names = [metric["Name"] for metric in first["_aws"]["CloudWatchMetrics"][0]["Metrics"]]
+
+    assert first["Handler"] == "handler"
+    assert first["RequestId"] == LambdaContext.aws_request_id
+    assert first["StatusCode"] == 200
+    assert (first["ColdStart"], second["ColdStart"]) == (1, 0)
+    assert first["Items"] == 1
+    assert first["ResponseBytes"] == len(response["body"])
+
+    for name in ["TotalTime", "ValidationTime", "DynamoDBTime", "ResponseTime"]:
+        assert name in names and first[name] >= 0
+
+    assert first["TotalTime"] >= first["ValidationTime"] + first["DynamoDBTime"]
+
+
+def test_metrics_emitted_even_when_handler_raises(monkeypatch, capsys):
+    monkeypatch.setattr(metrics, "ENABLED", True)
+
+    @metrics.instrumented
+    def broken(event, context):
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        broken({}, {})
+
+    document = json.loads(capsys.readouterr().out)
+
+    assert document["Handler"] == "broken"
+    assert document["StatusCode"] is None
+
+
+def test_metrics_last_invocation_copies_measurements(monkeypatch, http_event, capsys):
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    http_event["pathParameters"]["id"] = "abc"
+
+    handler(http_event, LambdaContext())
+    last = metrics.last_invocation()
+    last["counts"]["Items"] = 99
+
+    assert set(["Total", "Validation", "DynamoDB", "Response"]) <= set(last["timings"])
+    assert metrics.last_invocation()["counts"]["Items"] == 1
@@ -0,0 +1,79 @@
+import json
+from decimal import Decimal
+
+import pytest
+
+import functions.serializer as serializer
+from functions.decimalencoder import DecimalEncoder
+from functions.serializer import dumps, to_native
+
+
+def test_serializer_to_native_keeps_whole_numbers_as_ints():
+    native = to_native(Decimal("1536850636242"))
+
+    assert native == 1536850636242
+    assert isinstance(native, int)
+
+
+def test_serializer_to_native_keeps_fractions():
+    assert to_native(Decimal("4.75")) == 4.75
+    assert to_native(Decimal("-0.5")) == -0.5
+
+
+def test_serializer_dumps_keeps_fractions_a_float_holds_exactly():
+    payload = {"ratio": Decimal("0.1"), "price": Decimal("123456789.012345")}
+
+    assert dumps(payload, sort_keys=True) == '{"price":123456789.012345,"ratio":0.1}'
+
+
+def test_serializer_dumps_keeps_long_fractions_exact_with_fragments():
+    if serializer.c_encoder() is None or serializer.Fragment is None:
+        pytest.skip("needs orjson 3.9 or later")
+
+    assert dumps({"big": Decimal("0.12345678901234567890123")}) == '{"big":0.12345678901234567890123}'
+
+
+def test_serializer_to_native_turns_sets_into_sorted_lists():
+    assert to_native({"b", "a"}) == ["a", "b"]
+
+
+def test_serializer_dumps_converts_nested_dynamodb_types():
+    payload = {"tags": {"b", "a"}, "meta": {"scores": [Decimal("2"), Decimal("0.5")]}}
+
+    assert json.loads(dumps(payload)) == {"tags": ["a", "b"], "meta": {"scores": [2, 0.5]}}
+
+
+def test_serializer_dumps_matches_stdlib_output():
+    payload = [{"noteId": "abc", "count": Decimal("3"), "ratio": Decimal("0.25"), "big": Decimal("1" * 38)}]
+
+    assert json.loads(dumps(payload)) == json.loads(json.dumps(payload, cls=DecimalEncoder))
+    assert json.loads(dumps(payload))[0]["big"] == int("1" * 38)
+
+
+def test_serializer_dumps_without_c_encoder(monkeypatch):
+    monkeypatch.setattr(serializer, "encoder", None)
+
+    assert dumps({"b": Decimal("1.5"), "a": 1, "é": [2]}, sort_keys=True) == '{"a":1,"b":1.5,"é":[2]}'
+
+
+def test_serializer_dumps_writes_the_same_text_with_either_encoder(monkeypatch):
+    if serializer.c_encoder() is None:
+        pytest.skip("needs orjson")
+
+    payload = [{"noteId": "abc", "text": "café", "count": Decimal("3"), "ratio": Decimal("0.25"),
+                "tags": {"b", "a"}}]
+    fast = dumps(payload, sort_keys=True)
+    monkeypatch.setattr(serializer, "encoder", None)
+
+    assert dumps(payload, sort_keys=True) == fast
+
+
+def test_serializer_dumps_rejects_unserializable_types():
+    with pytest.raises(TypeError) as exc:
+        dumps({"body": b"bytes"})
+
+    assert "is not JSON serializable" in str(exc.value)
+
+
+def test_decimal_encoder_no_longer_truncates_fractions():
+    assert json.loads(json.dumps({"rating": Decimal("4.75")}, cls=DecimalEncoder)) == {"rating": 4.75}
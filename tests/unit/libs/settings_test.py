@@ -0,0 +1,88 @@
+import pytest
+
+import functions.exceptions as ex
+import functions.settings as settings
+from tests.unit import config
+
+
+def test_settings_loaded_once_when_env_unchanged(monkeypatch, config, mocker):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+    settings.reset()
+
+    load = mocker.spy(settings, "load")
+    first = settings.get_settings()
+    second = settings.get_settings()
+
+    assert first is second
+    assert load.call_count == 1
+
+
+def test_settings_reloaded_when_env_changed(monkeypatch, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+    monkeypatch.delenv("DYNAMODB_GSI_USERID_NOTEID", raising=False)
+
+    first = settings.get_settings()
+    monkeypatch.setenv("DYNAMODB_GSI_USERID_NOTEID", "Stoic-Athena-Notes-UserIdNoteId-Test-Index")
+    second = settings.get_settings()
+
+    assert first.user_index == config["aws"]["dynamodb"]["gsiuseridnoteid"]
+    assert second.user_index == "Stoic-Athena-Notes-UserIdNoteId-Test-Index"
+
+
+def test_settings_read_from_env(monkeypatch, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+    monkeypatch.setenv("DYNAMODB_HOST", "https://dynamodb.us-west-2.amazonaws.com")
+    monkeypatch.setenv("DYNAMODB_GSI_NOTEBOOK_NOTEID", "Stoic-Athena-Notes-NotebookNoteId-Prod-Index")
+    monkeypatch.setenv("DYNAMODB_WRITE_CAPACITY", "5")
+    monkeypatch.setenv("NOTE_CACHE_SIZE", "128")
+    monkeypatch.setenv("NOTE_CACHE_TTL", "10")
+
+    loaded = settings.get_settings()
+
+    assert loaded.region == config["aws"]["region"]
+    assert loaded.table == config["aws"]["dynamodb"]["table"]
+    assert loaded.host == "https://dynamodb.us-west-2.amazonaws.com"
+    assert loaded.notebook_index == "Stoic-Athena-Notes-NotebookNoteId-Prod-Index"
+    assert loaded.write_capacity == 5.0
+    assert loaded.cache_size == 128
+    assert (loaded.cache_ttl, loaded.cache_negative_ttl) == (10.0, 10.0)
+
+
+def test_settings_raise_and_cache_nothing_when_invalid(monkeypatch, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.delenv("DYNAMODB_TABLE", raising=False)
+
+    for _ in range(2):
+        with pytest.raises(ex.DynamoDbTableNotSetException):
+            settings.get_settings()
+
+
+def test_settings_never_reloaded_when_frozen(monkeypatch, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+    monkeypatch.setattr(settings, "FROZEN", True)
+    settings.reset()
+
+    first = settings.get_settings()
+    monkeypatch.setenv("DYNAMODB_TABLE", "Some-Other-Table")
+
+    assert settings.get_settings() is first
+
+    settings.reset()
+
+
+def test_settings_client_profile_defaults(monkeypatch, config):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", config["aws"]["region"])
+    monkeypatch.setenv("DYNAMODB_TABLE", config["aws"]["dynamodb"]["table"])
+    for name in ["DYNAMODB_MAX_ATTEMPTS", "DYNAMODB_CONNECT_TIMEOUT",
+                 "DYNAMODB_READ_TIMEOUT", "DYNAMODB_MAX_POOL_CONNECTIONS"]:
+        monkeypatch.delenv(name, raising=False)
+
+    loaded = settings.get_settings()
+
+    assert loaded.max_attempts == 3
+    assert (loaded.connect_timeout, loaded.read_timeout) == (1.0, 2.0)
+    assert loaded.max_pool_connections == 10
@@ -0,0 +1,24 @@
+import time
+
+import pytest
+
+from functions.throttle import TokenBucket
+
+
+def test_token_bucket_allows_burst_up_to_capacity():
+    bucket = TokenBucket(10)
+
+    assert bucket.delay(10) == 0
+    assert bucket.delay(20) > 0
+
+
+def test_token_bucket_paces_to_rate():
+    bucket = TokenBucket(100)
+
+    start = time.monotonic()
+    for _ in range(3):
+        bucket.take(50)
+    elapsed = time.monotonic() - start
+
+    # 150 units at 100/s, with the first 100 already in the bucket.
+    assert 0.4 <= elapsed < 1.0
@@ -1,3 +1,4 @@
+import base64
 import os
 import time
 
@@ -107,3 +108,173 @@ def test_is_timestamp_returns_true_when_valid_timestamp():
 def test_is_timestamp_returns_false_when_invalid_timestamp():
     
     assert val.is_timestamp(24) == False
+
+
+def test_limit_returned_when_valid_limit(http_event):
+    http_event["queryStringParameters"] = {"limit": "25"}
+
+    assert val.check_limit(http_event) == 25
+
+
+def test_limit_none_when_not_set(http_event):
+    assert val.check_limit(http_event) is None
+
+    http_event["queryStringParameters"] = None
+
+    assert val.check_limit(http_event) is None
+
+
+def test_raises_exception_when_limit_not_valid(http_event):
+    for limit in ["0", "-5", "abc", str(val.MAX_PAGE_LIMIT + 1)]:
+        http_event["queryStringParameters"] = {"limit": limit}
+
+        with pytest.raises(ex.RequestLimitInvalidException) as exc:
+            val.check_limit(http_event)
+
+        assert "'limit'" in str(exc.value)
+
+
+def test_cursor_returned_when_set(http_event):
+    http_event["queryStringParameters"] = {"cursor": "abc.def.ghi"}
+
+    assert val.check_cursor(http_event) == "abc.def.ghi"
+
+    http_event["queryStringParameters"] = {"cursor": ""}
+
+    assert val.check_cursor(http_event) is None
+
+
+def test_raises_exception_when_batch_not_valid():
+    for data in [{"userId": "azrael"}, [], [{}] * (val.MAX_BATCH_SIZE + 1)]:
+        with pytest.raises(ex.RequestBatchInvalidException) as exc:
+            val.check_batch(data)
+
+        assert "list" in str(exc.value)
+
+    val.check_batch([{}])
+
+
+def test_ids_returned_when_valid_ids(http_event):
+    http_event["queryStringParameters"] = {"ids": "a, b,,c"}
+
+    assert val.check_ids(http_event) == ["a", "b", "c"]
+
+
+def test_raises_exception_when_ids_not_valid(http_event):
+    for params in [None, {}, {"ids": ""}, {"ids": ",".join(["x"] * (val.MAX_BATCH_IDS + 1))}]:
+        http_event["queryStringParameters"] = params
+
+        with pytest.raises(ex.RequestIdsInvalidException) as exc:
+            val.check_ids(http_event)
+
+        assert "'ids'" in str(exc.value)
+
+
+def test_json_parsed_when_body_base64_encoded(http_event):
+    body = http_event["body"]
+    http_event["body"] = base64.b64encode(body.encode("utf-8")).decode("ascii")
+    http_event["isBase64Encoded"] = True
+
+    assert val.check_json(http_event)["userId"] == "azrael"
+
+
+def test_request_parsed_and_validated_when_valid_body(http_event):
+    data = val.check_request(http_event, val.NOTE_SCHEMA)
+
+    assert data == {"userId": "azrael", "notebook": "system", "text": "Create handler test"}
+
+
+def test_raises_exception_when_request_body_too_large(http_event, mocker):
+    http_event["body"] = "{\"text\": \"" + "x" * val.MAX_NOTE_BYTES + "\"}"
+    loads = mocker.patch("json.loads")
+
+    with pytest.raises(ex.RequestBodyTooLargeException) as exc:
+        val.check_request(http_event, val.NOTE_SCHEMA)
+
+    assert "larger than" in str(exc.value)
+    assert not loads.called
+
+
+def test_raises_exception_when_request_body_none(http_event):
+    http_event["body"] = None
+
+    with pytest.raises(ex.RequestBodyNotSetException):
+        val.check_request(http_event, val.NOTE_SCHEMA)
+
+
+def test_raises_exception_when_properties_wrong_type_or_length():
+    bad = [
+        {"userId": 42, "notebook": "system", "text": "text"},
+        {"userId": "azrael", "notebook": "", "text": "text"},
+        {"userId": "azrael", "notebook": "system", "text": None},
+        {"userId": "azrael", "notebook": "system", "text": "é" * (val.MAX_TEXT_BYTES // 2 + 1)},
+    ]
+
+    for data in bad:
+        with pytest.raises(ex.RequestPropertiesInvalidException) as exc:
+            val.NOTE_SCHEMA(data)
+
+        assert "must be a string" in str(exc.value)
+
+
+def test_raises_exception_when_schema_properties_not_found():
+    for data in [[], {"userId": "azrael", "notebook": "system"}]:
+        with pytest.raises(ex.RequiredPropertiesNotSetException) as exc:
+            val.NOTE_SCHEMA(data)
+
+        assert "(userId, notebook, text)" in str(exc.value)
+
+
+def test_patch_schema_checks_only_properties_present():
+    assert val.PATCH_SCHEMA({"text": "x"}) == {"text": "x"}
+
+    for data in [{}, {"userId": "azrael"}, []]:
+        with pytest.raises(ex.RequiredPropertiesNotSetException) as exc:
+            val.PATCH_SCHEMA(data)
+
+        assert "at least one of (notebook, text)" in str(exc.value)
+
+    with pytest.raises(ex.RequestPropertiesInvalidException):
+        val.PATCH_SCHEMA({"notebook": ""})
+
+
+def test_return_values_returned_when_valid(http_event):
+    assert val.check_return_values(http_event) == "UPDATED_NEW"
+
+    http_event["queryStringParameters"] = {"returnValues": "NONE"}
+
+    assert val.check_return_values(http_event) == "NONE"
+
+    http_event["queryStringParameters"] = {"returnValues": "ALL_OLD"}
+
+    with pytest.raises(ex.RequestReturnValuesInvalidException) as exc:
+        val.check_return_values(http_event)
+
+    assert "'returnValues'" in str(exc.value)
+
+
+def test_fields_returned_in_allow_list_order_with_note_id(http_event):
+    assert val.check_fields(http_event, val.SEARCH_FIELDS) is None
+
+    http_event["queryStringParameters"] = {"fields": "notebook, userId,notebook"}
+
+    assert val.check_fields(http_event, val.SEARCH_FIELDS) == ["noteId", "userId", "notebook"]
+
+    http_event["queryStringParameters"] = {"fields": "notebook,createdAt"}
+
+    with pytest.raises(ex.RequestFieldsInvalidException) as exc:
+        val.check_fields(http_event, val.SEARCH_FIELDS)
+
+    assert "'fields'" in str(exc.value)
+    assert val.check_fields(http_event, val.READ_FIELDS) == ["noteId", "notebook", "createdAt"]
+
+
+def test_accept_encoding_returned_only_when_json_accepted_first(http_event):
+    http_event["headers"] = {"accept": "application/json, */*", "Accept-Encoding": "gzip"}
+    assert val.check_accept_encoding(http_event) == "gzip"
+
+    http_event["headers"] = {"Accept": "*/*", "Accept-Encoding": "gzip"}
+    assert val.check_accept_encoding(http_event) is None
+
+    http_event["headers"] = {"Accept-Encoding": "gzip"}
+    assert val.check_accept_encoding(http_event) is None
@@ -35,3 +35,83 @@ def test_create_returns_valid_structure_when_valid_data(dynamodb_table):
 
     assert "createdAt" in item and val.is_now(int(item["createdAt"]))
     assert "updatedAt" in item and val.is_now(int(item["updatedAt"]))
+
+
+# @mock_dynamodb2
+def test_save_batch_returns_items_in_request_order_when_valid_data(dynamodb_table):
+    model = NoteModel(dynamodb_table)
+    notes = [{"userId": test_globals["user_id"], "notebook": test_globals["notebook"],
+              "text": "Batch note {}".format(i)} for i in range(30)]
+
+    items, unprocessed = model.save_batch(notes)
+
+    assert unprocessed == set()
+    assert [item["text"] for item in items] == [note["text"] for note in notes]
+    assert len(set(item["noteId"] for item in items)) == 30
+
+    for item in items:
+        assert model.read(item["noteId"])["text"] == item["text"]
+
+
+# @mock_dynamodb2
+def test_save_batch_retries_unprocessed_items(dynamodb_table, monkeypatch):
+    model = NoteModel(dynamodb_table)
+    client = dynamodb_table.meta.client
+    write = client.batch_write_item
+    calls = []
+
+    def flaky_write(RequestItems, **kwargs):
+        calls.append(RequestItems)
+        requests = RequestItems[dynamodb_table.name]
+
+        # Throttle the back half of the first call only.
+        if len(calls) == 1:
+            write(RequestItems={dynamodb_table.name: requests[:1]})
+            return {"UnprocessedItems": {dynamodb_table.name: requests[1:]}}
+
+        return write(RequestItems=RequestItems, **kwargs)
+
+    monkeypatch.setattr(client, "batch_write_item", flaky_write)
+    monkeypatch.setattr("functions.models.note.backoff", lambda attempt: 0)
+
+    items, unprocessed = model.save_batch([
+        {"userId": test_globals["user_id"], "notebook": test_globals["notebook"],
+         "text": "Retried note {}".format(i)} for i in range(3)])
+
+    assert len(calls) == 2
+    assert len(calls[1][dynamodb_table.name]) == 2
+    assert unprocessed == set()
+
+
+# @mock_dynamodb2
+def test_save_batch_gives_up_after_max_attempts(dynamodb_table, monkeypatch):
+    model = NoteModel(dynamodb_table)
+    client = dynamodb_table.meta.client
+
+    def throttled_write(RequestItems, **kwargs):
+        return {"UnprocessedItems": RequestItems}
+
+    monkeypatch.setattr(client, "batch_write_item", throttled_write)
+    monkeypatch.setattr("functions.models.note.backoff", lambda attempt: 0)
+
+    items, unprocessed = model.save_batch([
+        {"userId": test_globals["user_id"], "notebook": test_globals["notebook"],
+         "text": "Never written"}])
+
+    assert unprocessed == set([items[0]["noteId"]])
+
+
+# @mock_dynamodb2
+def test_save_records_consumed_capacity_for_user(dynamodb_table):
+    model = NoteModel(dynamodb_table)
+    item = model.save(user_id="capacity-user", notebook=test_globals["notebook"],
+                      text=test_globals["text"])
+    model.save_batch([{"userId": "capacity-user", "notebook": test_globals["notebook"],
+                       "text": "Capacity note {}".format(i)} for i in range(3)])
+
+    totals = model.capacity.snapshot()
+
+    assert totals["operations"]["save"] > 0 and totals["operations"]["save_batch"] > 0
+    assert totals["indexes"][dynamodb_table.name] > 0
+    assert totals["users"]["capacity-user"] == pytest.approx(
+        totals["operations"]["save"] + totals["operations"]["save_batch"])
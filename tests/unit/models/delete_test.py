@@ -57,3 +57,92 @@ def test_delete_returns_valid_structure_when_invalid_data(dynamodb_table):
 
     assert "createdAt" not in item
     assert "updatedAt" not in item
+
+
+# @mock_dynamodb2
+def test_delete_batch_removes_every_item(dynamodb_table):
+    model = NoteModel(dynamodb_table)
+    created, _ = model.save_batch([
+        {"userId": test_globals["user_id"], "notebook": test_globals["notebook"],
+         "text": "Bulk delete note {}".format(i)} for i in range(60)])
+    note_ids = [item["noteId"] for item in created]
+
+    unprocessed = model.delete_batch(note_ids)
+    items, _ = model.read_batch(note_ids)
+
+    assert unprocessed == set()
+    assert items == [{}] * 60
+
+
+# @mock_dynamodb2
+def test_purge_by_user_deletes_all_notes_for_user(dynamodb_table):
+    model = NoteModel(dynamodb_table)
+    model.save_batch([{"userId": "purged-user", "notebook": test_globals["notebook"],
+                       "text": "Purged note {}".format(i)} for i in range(5)])
+
+    deleted, resume_key, complete = model.purge_by_user("purged-user")
+
+    assert deleted == 5
+    assert resume_key is None and complete == True
+    assert model.search_by_user("purged-user") == []
+
+
+# @mock_dynamodb2
+def test_purge_by_notebook_stops_and_resumes_when_told_to(dynamodb_table):
+    model = NoteModel(dynamodb_table)
+    model.save_batch([{"userId": test_globals["user_id"], "notebook": "purged-notebook",
+                       "text": "Purged note {}".format(i)} for i in range(5)])
+    pages = []
+
+    class Limiter:
+        rate = 2
+
+        def delay(self, units):
+            return 0
+
+        def take(self, units):
+            pass
+
+    def stop_after_two_pages(wait):
+        pages.append(wait)
+        return len(pages) > 2
+
+    deleted, resume_key, complete = model.purge_by_notebook(
+        "purged-notebook", limiter=Limiter(), should_stop=stop_after_two_pages)
+
+    assert deleted == 4
+    assert complete == False and resume_key is not None
+
+    deleted, resume_key, complete = model.purge_by_notebook(
+        "purged-notebook", start_key=resume_key)
+
+    assert deleted == 1 and complete == True
+    assert model.search_by_notebook("purged-notebook") == []
+
+
+# @mock_dynamodb2
+def test_purge_by_user_records_capacity_for_user(dynamodb_table):
+    model = NoteModel(dynamodb_table)
+    model.save_batch([{"userId": "capacity-purged-user", "notebook": test_globals["notebook"],
+                       "text": "Purged note {}".format(i)} for i in range(3)])
+    model.capacity.reset()
+
+    model.purge_by_user("capacity-purged-user")
+    totals = model.capacity.snapshot()
+
+    assert totals["operations"]["purge_by_user"] > 0
+    assert totals["users"]["capacity-purged-user"] == pytest.approx(totals["operations"]["purge_by_user"])
+
+
+# @mock_dynamodb2
+def test_purge_by_notebook_records_capacity_for_each_user(dynamodb_table):
+    model = NoteModel(dynamodb_table)
+    model.save_batch([{"userId": "capacity-owner-{}".format(i % 2), "notebook": "capacity-notebook",
+                       "text": "Purged note {}".format(i)} for i in range(4)])
+    model.capacity.reset()
+
+    model.purge_by_notebook("capacity-notebook")
+    totals = model.capacity.snapshot()
+
+    assert set(totals["users"]) == {"capacity-owner-0", "capacity-owner-1"}
+    assert sum(totals["users"].values()) == pytest.approx(totals["operations"]["purge_by_notebook"])
@@ -5,6 +5,7 @@ import pytest
 from pytest_mock import mocker
 # from moto import mock_dynamodb2
 
+from functions.cache import LRUCache
 from functions.models.note import NoteModel
 from tests.unit import dynamodb_table
 from tests.unit import config
@@ -57,3 +58,96 @@ def test_read_returns_valid_structure_when_invalid_data(dynamodb_table):
 
     assert "createdAt" not in item
     assert "updatedAt" not in item
+
+
+# @mock_dynamodb2
+def test_read_batch_returns_items_in_request_order_when_valid_data(dynamodb_table):
+    model = NoteModel(dynamodb_table)
+    created, _ = model.save_batch([
+        {"userId": test_globals["user_id"], "notebook": test_globals["notebook"],
+         "text": "Multi-get note {}".format(i)} for i in range(3)])
+    note_ids = [item["noteId"] for item in reversed(created)]
+    note_ids.insert(1, "missing_badid")
+    note_ids.append(note_ids[0])
+
+    items, unprocessed = model.read_batch(note_ids)
+
+    assert unprocessed == set()
+    assert len(items) == len(note_ids)
+    assert items[1] == {}
+    for note_id, item in zip(note_ids, items):
+        if note_id != "missing_badid":
+            assert item["noteId"] == note_id
+
+
+# @mock_dynamodb2
+def test_read_batch_splits_large_requests_into_chunks(dynamodb_table, monkeypatch):
+    model = NoteModel(dynamodb_table)
+    client = dynamodb_table.meta.client
+    get = client.batch_get_item
+    sizes = []
+
+    def counting_get(RequestItems, **kwargs):
+        sizes.append(len(RequestItems[dynamodb_table.name]["Keys"]))
+        return get(RequestItems=RequestItems, **kwargs)
+
+    monkeypatch.setattr(client, "batch_get_item", counting_get)
+
+    note_ids = ["chunked_badid_{}".format(i) for i in range(250)]
+    items, unprocessed = model.read_batch(note_ids)
+
+    assert sorted(sizes) == [50, 100, 100]
+    assert items == [{}] * 250
+
+
+# @mock_dynamodb2
+def test_read_serves_repeat_reads_from_cache(dynamodb_table, monkeypatch):
+    model = NoteModel(dynamodb_table, LRUCache(maxsize=16, ttl=60))
+    created = model.save(user_id=test_globals["user_id"], notebook=test_globals["notebook"],
+                         text=test_globals["text"])
+    calls = []
+    get_item = dynamodb_table.get_item
+
+    def counting_get_item(**kwargs):
+        calls.append(kwargs)
+        return get_item(**kwargs)
+
+    monkeypatch.setattr(dynamodb_table, "get_item", counting_get_item)
+
+    first = model.read(created["noteId"])
+    second = model.read(created["noteId"])
+    missing = [model.read("cached_badid"), model.read("cached_badid")]
+
+    assert first == second and first["noteId"] == created["noteId"]
+    assert missing == [{}, {}]
+    assert len(calls) == 2
+    assert model.cache.stats()["hits"] == 2
+
+
+# @mock_dynamodb2
+def test_read_cache_invalidated_by_update_and_delete(dynamodb_table):
+    model = NoteModel(dynamodb_table, LRUCache(maxsize=16, ttl=60))
+    created = model.save(user_id=test_globals["user_id"], notebook=test_globals["notebook"],
+                         text=test_globals["text"])
+    model.read(created["noteId"])
+
+    model.update(created["noteId"], {"notebook": test_globals["notebook"], "text": "Cache updated"})
+
+    assert model.read(created["noteId"])["text"] == "Cache updated"
+
+    model.delete(created["noteId"])
+
+    assert model.read(created["noteId"]) == {}
+
+
+# @mock_dynamodb2
+def test_read_returns_only_fields_asked_for(dynamodb_table):
+    for cache in (None, LRUCache(maxsize=16, ttl=60)):
+        model = NoteModel(dynamodb_table, cache)
+        created = model.save(user_id=test_globals["user_id"], notebook=test_globals["notebook"],
+                             text=test_globals["text"])
+
+        item = model.read(created["noteId"], ["noteId", "notebook"])
+
+        assert item == {"noteId": created["noteId"], "notebook": created["notebook"]}
+        assert model.read(created["noteId"] + "_badid", ["noteId"]) == {}
@@ -48,3 +48,98 @@ def test_search_by_notebook_returns_valid_structure_when_valid_data(dynamodb_tab
 
         assert "createdAt" not in item
         assert "updatedAt" not in item
+
+
+# @mock_dynamodb2
+def test_search_by_user_page_returns_last_key_when_more_items(dynamodb_table):
+    model = NoteModel(dynamodb_table)
+    for _ in range(3):
+        model.save(user_id=test_globals["user_id"], notebook=test_globals["notebook"],
+                   text=test_globals["text"])
+
+    items, last_key = model.search_by_user_page(test_globals["user_id"], limit=2)
+
+    assert len(items) == 2
+    assert last_key is not None and "noteId" in last_key
+
+    more, _ = model.search_by_user_page(test_globals["user_id"], limit=2, start_key=last_key)
+
+    assert len(more) >= 1
+    assert not set(i["noteId"] for i in items) & set(i["noteId"] for i in more)
+
+
+# @mock_dynamodb2
+def test_search_by_notebook_page_returns_no_last_key_when_exhausted(dynamodb_table):
+    model = NoteModel(dynamodb_table)
+    items, last_key = model.search_by_notebook_page(test_globals["notebook"] + "_badid")
+
+    assert items == []
+    assert last_key is None
+
+
+# @mock_dynamodb2
+def test_iter_by_user_yields_every_page_lazily(dynamodb_table):
+    model = NoteModel(dynamodb_table)
+    for _ in range(3):
+        model.save(user_id=test_globals["user_id"], notebook=test_globals["notebook"],
+                   text=test_globals["text"])
+
+    items = model.iter_by_user(test_globals["user_id"], page_size=1)
+
+    assert not isinstance(items, list)
+
+    streamed = [item["noteId"] for item in items]
+    everything = [item["noteId"] for item in model.search_by_user(test_globals["user_id"])]
+
+    assert len(streamed) >= 3
+    assert streamed == everything
+
+
+# @mock_dynamodb2
+def test_iter_by_notebook_stops_at_max_items(dynamodb_table):
+    model = NoteModel(dynamodb_table)
+    for _ in range(3):
+        model.save(user_id=test_globals["user_id"], notebook=test_globals["notebook"],
+                   text=test_globals["text"])
+
+    items = list(model.iter_by_notebook(test_globals["notebook"], page_size=2, max_items=3))
+
+    assert len(items) == 3
+    for item in items:
+        assert item["notebook"] == test_globals["notebook"]
+
+
+# @mock_dynamodb2
+def test_search_queries_index_names_given_to_model(dynamodb_table, mocker):
+    model = NoteModel(dynamodb_table, user_index="User-Test-Index", notebook_index="Notebook-Test-Index")
+    query = mocker.patch.object(dynamodb_table, "query", return_value={"Items": []})
+
+    model.search_by_user(test_globals["user_id"])
+    model.search_by_notebook(test_globals["notebook"])
+
+    assert [call[1]["IndexName"] for call in query.call_args_list] == ["User-Test-Index", "Notebook-Test-Index"]
+
+
+# @mock_dynamodb2
+def test_search_records_consumed_capacity_by_operation(dynamodb_table):
+    model = NoteModel(dynamodb_table)
+    model.search_by_user(test_globals["user_id"])
+    model.search_by_notebook_page(test_globals["notebook"], 1)
+
+    operations = model.capacity.snapshot()["operations"]
+
+    assert set(operations) == {"search_by_user", "search_by_notebook"}
+    assert all(units > 0 for units in operations.values())
+
+
+# @mock_dynamodb2
+def test_search_pages_return_only_fields_asked_for(dynamodb_table):
+    model = NoteModel(dynamodb_table)
+    model.save(user_id=test_globals["user_id"], notebook=test_globals["notebook"], text=test_globals["text"])
+
+    by_user, _ = model.search_by_user_page(test_globals["user_id"], fields=["noteId", "notebook"])
+    by_notebook, _ = model.search_by_notebook_page(test_globals["notebook"], fields=["noteId", "notebook"])
+
+    assert by_user and by_notebook
+    for item in by_user + by_notebook:
+        assert set(item) == {"noteId", "notebook"}
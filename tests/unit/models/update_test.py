@@ -5,6 +5,7 @@ import pytest
 from pytest_mock import mocker
 # from moto import mock_dynamodb2
 
+from functions.cache import LRUCache
 from functions.models.note import NoteModel
 from tests.unit import dynamodb_table
 from tests.unit import config
@@ -33,7 +34,10 @@ def test_update_returns_valid_structure_when_valid_data(dynamodb_table):
     test_globals["text"] = created["text"]
     test_globals["created_at"] = created["createdAt"]
     test_globals["updated_at"] = created["updatedAt"]
-    
+
+    # Timestamps are in milliseconds; make sure the update lands in a later one.
+    time.sleep(0.002)
+
     data = {"userId": test_globals["user_id"], "notebook": test_globals["notebook"],
             "text": "Testing if structure is valid updated"}
     
@@ -66,3 +70,154 @@ def test_update_returns_valid_structure_when_invalid_data(dynamodb_table):
 
     assert "createdAt" not in item
     assert "updatedAt" not in item
+
+
+# @mock_dynamodb2
+def test_patch_writes_only_properties_present(dynamodb_table):
+    model = NoteModel(dynamodb_table)
+    created = model.save(user_id="azrael", notebook="system", text="Patch me")
+
+    item = model.patch(created["noteId"], {"text": "Patched"})
+    stored = model.read(created["noteId"])
+
+    assert set(item) == {"noteId", "text", "updatedAt"}
+    assert item["text"] == "Patched"
+    assert stored["notebook"] == "system" and stored["text"] == "Patched"
+
+    assert model.patch(created["noteId"], {"notebook": "other"}, "NONE") == {"noteId": created["noteId"]}
+    assert model.read(created["noteId"])["notebook"] == "other"
+
+    assert model.patch(created["noteId"] + "_badid", {"text": "Never"}) == {}
+
+
+# @mock_dynamodb2
+def test_patch_skips_attributes_cache_says_are_unchanged(dynamodb_table, monkeypatch):
+    model = NoteModel(dynamodb_table, LRUCache(maxsize=16, ttl=60))
+    created = model.save(user_id="azrael", notebook="system", text="Patch me")
+    model.read(created["noteId"])
+
+    calls = []
+    update_item = dynamodb_table.update_item
+
+    def recording_update_item(**kwargs):
+        calls.append(kwargs)
+        return update_item(**kwargs)
+
+    monkeypatch.setattr(dynamodb_table, "update_item", recording_update_item)
+
+    model.patch(created["noteId"], {"notebook": "system", "text": "Patched"})
+
+    assert calls[0]["UpdateExpression"] == "SET #note_text = :text, updatedAt = :updatedAt, contentHash = :hash"
+    assert calls[0]["ConditionExpression"] == ("attribute_exists(noteId) AND #notebook = :notebook AND "
+                                              "(attribute_not_exists(contentHash) OR contentHash <> :hash)")
+
+    # A stale cache fails the condition, and the write goes again in full.
+    model.read(created["noteId"])
+    update_item(Key={"noteId": created["noteId"]}, UpdateExpression="SET notebook = :notebook",
+                ExpressionAttributeValues={":notebook": "elsewhere"})
+    calls.clear()
+
+    item = model.patch(created["noteId"], {"notebook": "system"}, "UPDATED_NEW")
+
+    assert len(calls) == 2
+    assert calls[1]["UpdateExpression"] == "SET #notebook = :notebook, updatedAt = :updatedAt REMOVE contentHash"
+    assert item["notebook"] == "system"
+
+
+# @mock_dynamodb2
+def test_patch_skips_write_when_content_unchanged_without_cache(dynamodb_table):
+    model = NoteModel(dynamodb_table)
+    created = model.save(user_id="azrael", notebook="system", text="Autosaved")
+    time.sleep(0.002)
+
+    item = model.patch(created["noteId"], {"notebook": "system", "text": "Autosaved"})
+
+    assert item == {"noteId": created["noteId"]}
+    assert model.read(created["noteId"])["updatedAt"] == created["updatedAt"]
+    assert model.patch(created["noteId"] + "_badid", {"notebook": "system", "text": "Autosaved"}) == {}
+
+
+# @mock_dynamodb2
+def test_patch_keeps_content_hash_when_it_writes_no_content(dynamodb_table):
+    model = NoteModel(dynamodb_table, LRUCache(maxsize=16, ttl=60))
+    created = model.save(user_id="azrael", notebook="system", text="Unchanged")
+    model.read(created["noteId"])
+    time.sleep(0.002)
+
+    patched = model.patch(created["noteId"], {"text": "Unchanged"})
+    time.sleep(0.002)
+
+    # The hash still matches, so an identical PUT is skipped.
+    item = model.update(created["noteId"], {"notebook": "system", "text": "Unchanged"})
+
+    assert item["updatedAt"] == patched["updatedAt"]
+
+
+# @mock_dynamodb2
+def test_update_skips_write_when_content_unchanged(dynamodb_table):
+    model = NoteModel(dynamodb_table)
+    created = model.save(user_id="azrael", notebook="system", text="Autosaved")
+    time.sleep(0.002)
+
+    item = model.update(created["noteId"], {"notebook": "system", "text": "Autosaved"})
+
+    assert item == created
+
+    # Notes written before content hashes are updated as always.
+    dynamodb_table.update_item(Key={"noteId": created["noteId"]}, UpdateExpression="REMOVE contentHash")
+
+    item = model.update(created["noteId"], {"notebook": "system", "text": "Autosaved"})
+
+    assert item["updatedAt"] > created["updatedAt"]
+    assert "contentHash" in dynamodb_table.get_item(Key={"noteId": created["noteId"]})["Item"]
+
+
+# @mock_dynamodb2
+def test_content_hash_never_handed_back(dynamodb_table):
+    model = NoteModel(dynamodb_table)
+    created = model.save(user_id="azrael", notebook="system", text="Private")
+    time.sleep(0.002)
+
+    items = [created, model.read(created["noteId"]),
+             model.update(created["noteId"], {"notebook": "system", "text": "Private"}),
+             model.update(created["noteId"], {"notebook": "system", "text": "Changed"}),
+             model.patch(created["noteId"], {"notebook": "other", "text": "Patched"})]
+    items.extend(model.save_batch([{"userId": "azrael", "notebook": "system", "text": "Batched"}])[0])
+    items.extend(model.read_batch([created["noteId"]])[0])
+
+    assert all("contentHash" not in item for item in items)
+
+
+# @mock_dynamodb2
+def test_update_writes_after_patch_changed_content(dynamodb_table):
+    model = NoteModel(dynamodb_table)
+    created = model.save(user_id="azrael", notebook="system", text="Before")
+
+    model.patch(created["noteId"], {"text": "After"})
+    item = model.update(created["noteId"], {"notebook": "system", "text": "Before"})
+
+    assert item["text"] == "Before"
+    assert model.update(created["noteId"], {"notebook": "system", "text": "Before"})["updatedAt"] == \
+        item["updatedAt"]
+
+
+# @mock_dynamodb2
+def test_patch_records_capacity_for_user_the_cache_knows(dynamodb_table):
+    model = NoteModel(dynamodb_table)
+    created = model.save(user_id="capacity-patcher", notebook="system", text="Patch me")
+    model.capacity.reset()
+
+    model.patch(created["noteId"], {"text": "Patched"})
+    totals = model.capacity.snapshot()
+
+    assert totals["operations"]["patch"] > 0
+    assert totals["users"] == {}
+
+    model = NoteModel(dynamodb_table, LRUCache(maxsize=16, ttl=60))
+    model.read(created["noteId"])
+    model.capacity.reset()
+
+    model.patch(created["noteId"], {"text": "Patched again"})
+    totals = model.capacity.snapshot()
+
+    assert totals["users"] == {"capacity-patcher": pytest.approx(totals["operations"]["patch"])}
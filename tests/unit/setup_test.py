@@ -5,8 +5,13 @@ from pytest_mock import mocker
 
 from tests.unit import dynamodb_table
 from tests.unit import config
+from tests import memorydb
 
 # @mock_dynamodb2
 def test_setup_dependencies_when_tests_started(dynamodb_table):
 
+    if memorydb.installed():
+        assert isinstance(dynamodb_table, memorydb.MemoryTable)
+        return
+
     assert str(type(dynamodb_table)) == "<class 'boto3.resources.factory.dynamodb.Table'>"